@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+
+def build_document(path: str, paragraphs: int) -> None:
+    """
+    Write a large DOCX file with body paragraphs and a table every 50 paragraphs.
+
+    Args:
+        path (str): Where to save the document.
+        paragraphs (int): Number of body paragraphs.
+    """
+    import docx
+
+    document = docx.Document()
+    sentence = "The quick brown fox jumps over the lazy dog while the essay continues. "
+    for i in range(paragraphs):
+        document.add_paragraph(f"Paragraph {i}. " + sentence * 4)
+        if i % 50 == 49:
+            table = document.add_table(rows=3, cols=3)
+            for cell in table._cells:
+                cell.text = "cell"
+    document.save(path)
+
+
+def run_extractor(extractor: str, path: str) -> dict[str, float]:
+    """
+    Extract a document once and report the time taken and peak memory.
+
+    Args:
+        extractor (str): 'stream' or 'python-docx'.
+        path (str): Path to the DOCX file.
+
+    Returns:
+        Dict[str, float]: Seconds taken, characters extracted and the growth in
+        peak RSS during extraction, in MB.
+    """
+    import docx
+
+    from gradebotguru.docx_reader import iter_docx_paragraphs
+
+    # Both extractors are imported first so the baseline is the same for each.
+    baseline_mb = _peak_rss_mb()
+    started = time.perf_counter()
+    if extractor == "stream":
+        text = "\n".join(iter_docx_paragraphs(path))
+    else:
+        text = "\n".join(p.text for p in docx.Document(path).paragraphs)
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": seconds,
+        "characters": len(text),
+        "peak_rss_mb": _peak_rss_mb() - baseline_mb,
+    }
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process so far, in MB."""
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def benchmark(path: str, repeats: int) -> None:
+    """
+    Compare the extractors, each run in a fresh interpreter so peak memory is isolated.
+
+    Args:
+        path (str): Path to the DOCX file.
+        repeats (int): Number of runs per extractor; the fastest is reported.
+    """
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    with zipfile.ZipFile(path) as package:
+        xml_mb = package.getinfo("word/document.xml").file_size / (1024 * 1024)
+    print(f"{path}: {size_mb:.1f} MB on disk, {xml_mb:.1f} MB of document XML")
+    for extractor in ("stream", "python-docx"):
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", extractor, path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            runs.append(json.loads(output))
+        best = min(runs, key=lambda run: run["seconds"])
+        print(
+            f"{extractor:>12}: {best['seconds']:.3f}s, "
+            f"{xml_mb / best['seconds']:.1f} MB XML/s, "
+            f"{best['characters']} chars, peak RSS +{best['peak_rss_mb']:.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark streaming DOCX extraction against python-docx."
+    )
+    parser.add_argument("path", nargs="?", help="DOCX file to extract.")
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        default=20000,
+        help="Paragraphs in the generated document when no path is given.",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per extractor.")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_extractor(args.run, args.path)))
+    elif args.path:
+        benchmark(args.path, args.repeats)
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "benchmark.docx")
+            build_document(path, args.paragraphs)
+            benchmark(path, args.repeats)
@@ -0,0 +1,67 @@
+import argparse
+import glob
+import os
+import time
+
+from gradebotguru.response_parser import parse_response
+
+CORPUS = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "responses")
+
+
+def load_corpus(corpus: str) -> list[str]:
+    """
+    Read the LLM responses in a corpus directory.
+
+    Args:
+        corpus (str): Directory of ``.txt`` responses.
+
+    Returns:
+        List[str]: The responses, in file name order, with line endings kept.
+    """
+    responses = []
+    for path in sorted(glob.glob(os.path.join(corpus, "*.txt"))):
+        with open(path, "rb") as file:
+            responses.append(file.read().decode("utf-8"))
+    return responses
+
+
+def benchmark(responses: list[str], seconds: float, repeats: int) -> None:
+    """
+    Parse the responses repeatedly and report the best throughput.
+
+    Args:
+        responses (List[str]): The responses to parse.
+        seconds (float): Minimum duration of each run.
+        repeats (int): Number of runs; the fastest is reported.
+    """
+    size_mb = sum(len(response.encode("utf-8")) for response in responses) / 1e6
+    best = 0.0
+    for _ in range(repeats):
+        parsed = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            for response in responses:
+                parse_response(response)
+            parsed += 1
+        best = max(best, parsed / (time.perf_counter() - started))
+    print(
+        f"{len(responses)} responses: {best * len(responses):,.0f} responses/s, "
+        f"{best * size_mb:.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark LLM response parsing.")
+    parser.add_argument(
+        "corpus",
+        nargs="?",
+        default=CORPUS,
+        help="Directory of .txt responses (default: the test corpus).",
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=1.0, help="Minimum duration of each run."
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Number of runs.")
+    args = parser.parse_args()
+
+    benchmark(load_corpus(args.corpus), args.seconds, args.repeats)
@@ -2,6 +2,7 @@
 GradeBot Guru: AI-powered grading assistant for fast, accurate, and insightful feedback.
 """
 
+from .batch import BatchRun, grade_submissions
 from .config import load_config
 from .grader import grade_submission
 from .llm_interface.factory import create_llms
@@ -16,6 +17,8 @@ __email__ = "michael@borck.me"
 __all__ = [
     "main",
     "grade_submission",
+    "grade_submissions",
+    "BatchRun",
     "load_config",
     "load_rubric",
     "load_submissions",
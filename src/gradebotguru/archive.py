@@ -0,0 +1,219 @@
+import logging
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from typing import IO, TYPE_CHECKING, Any
+
+from gradebotguru.submission_loader import TEXT_EXTENSIONS, read_submission
+
+if TYPE_CHECKING:
+    from gradebotguru.duplicates import DuplicateIndex
+
+# Members larger than this are spooled to a temporary file instead of memory.
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Canvas: lastfirst[_LATE]_<user id>_<submission id>_<original file name>
+CANVAS_PATTERN = re.compile(
+    r"^[a-z]+(?P<late>_late)?_(?P<user>\d+)_(?P<submission>\d+)_(?P<file>.+)$",
+    re.IGNORECASE,
+)
+# Moodle: one folder per student, "<Full Name>_<participant id>_assignsubmission_file_"
+MOODLE_PATTERN = re.compile(
+    r"^.+_(?P<user>\d+)_assignsubmission_[a-z]+_?$", re.IGNORECASE
+)
+# Canvas appends -1, -2, ... to the names of resubmitted files.
+RESUBMISSION_SUFFIX = re.compile(r"-(?P<attempt>\d+)(?=\.[^.]+$)")
+
+
+def is_archive(path: str) -> bool:
+    """
+    Check whether a submissions path is a ZIP archive rather than a directory.
+
+    Args:
+        path (str): The submissions path.
+
+    Returns:
+        bool: True if the path is a ZIP file.
+    """
+    return os.path.isfile(path) and zipfile.is_zipfile(path)
+
+
+def submission_id_from_path(member_path: str) -> str:
+    """
+    Map an archive member path to a stable submission ID.
+
+    Canvas and Moodle exports are recognised and mapped to
+    ``<LMS user id>/<original file name>``, so the ID stays the same when a
+    student resubmits or the export is regenerated. Other paths are used as
+    they are, relative to the archive root.
+
+    Args:
+        member_path (str): The member's path inside the archive.
+
+    Returns:
+        str: The submission ID.
+
+    Examples:
+        >>> submission_id_from_path("smithjane_LATE_12345_67890_essay-1.docx")
+        '12345/essay.docx'
+        >>> submission_id_from_path("Jane Smith_4021_assignsubmission_file_/essay.pdf")
+        '4021/essay.pdf'
+        >>> submission_id_from_path("group-a/jane/essay.txt")
+        'group-a/jane/essay.txt'
+    """
+    parts = [part for part in member_path.replace("\\", "/").split("/") if part]
+    for position, folder in enumerate(parts[:-1]):
+        match = MOODLE_PATTERN.match(folder)
+        if match:
+            return "/".join([match["user"], *parts[position + 1 :]])
+    match = CANVAS_PATTERN.match(parts[-1])
+    if match:
+        filename = RESUBMISSION_SUFFIX.sub("", match["file"])
+        return "/".join([*parts[:-1], match["user"], filename])
+    return "/".join(parts)
+
+
+def submission_attempt(member_path: str) -> tuple[int, int, int]:
+    """
+    Rank a Canvas resubmission so the latest one can be picked explicitly.
+
+    Later attempts carry a higher ``-N`` suffix, a late submission follows
+    the on-time ones, and Canvas numbers each submitted file in upload
+    order. Other members all rank the same.
+
+    Args:
+        member_path (str): The member's path inside the archive.
+
+    Returns:
+        Tuple[int, int, int]: The attempt suffix, late marker and Canvas file
+        number; higher is more recent.
+
+    Examples:
+        >>> submission_attempt("smithjane_12345_67890_essay.docx")
+        (0, 0, 67890)
+        >>> submission_attempt("smithjane_LATE_12345_67891_essay-2.docx")
+        (2, 1, 67891)
+    """
+    name = member_path.replace("\\", "/").rsplit("/", 1)[-1]
+    match = CANVAS_PATTERN.match(name)
+    if not match:
+        return (0, 0, 0)
+    suffix = RESUBMISSION_SUFFIX.search(match["file"])
+    return (
+        int(suffix["attempt"]) if suffix else 0,
+        1 if match["late"] else 0,
+        int(match["submission"]),
+    )
+
+
+def iter_archive(
+    source: str | IO[bytes],
+    limits: dict[str, Any] | None = None,
+    prefix: str = "",
+    backends: dict[str, str] | None = None,
+) -> Iterator[tuple[str, str, str, dict[str, Any]]]:
+    """
+    Extract the submissions in a ZIP archive without unpacking it to disk.
+
+    Members are streamed straight into ``read_submission``. Text files are
+    decoded directly from the archive; PDF and DOCX files, which need random
+    access, are copied to a spooled temporary file that stays in memory up
+    to ``SPOOL_MAX_SIZE``. Folders and nested ZIP files are walked
+    recursively, and unsupported files are skipped.
+
+    Args:
+        source (str | IO[bytes]): Path to the archive, or a seekable binary stream.
+        limits (Optional[Dict[str, Any]]): Extraction limits, see ``collect_text``.
+        prefix (str): Path of a nested archive within its parent.
+        backends (Optional[Dict[str, str]]): Backend name per file extension, see
+            ``get_backend``.
+
+    Yields:
+        Tuple[str, str, str, Dict[str, Any]]: The submission ID, the member path,
+        the extracted text and its extraction metadata.
+    """
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            member_path = posixpath.join(prefix, info.filename)
+            name = posixpath.basename(info.filename)
+            if info.is_dir() or _is_metadata(info.filename):
+                continue
+            extension = os.path.splitext(name)[1].lower()
+            with archive.open(info) as member:
+                if extension in TEXT_EXTENSIONS:
+                    stream: IO[bytes] = member
+                    spool = None
+                else:
+                    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+                    shutil.copyfileobj(member, spool)
+                    spool.seek(0)
+                    stream = spool
+                try:
+                    if extension == ".zip":
+                        yield from iter_archive(stream, limits, member_path, backends)
+                        continue
+                    text, metadata = read_submission(stream, name, limits, backends)
+                except ValueError as e:
+                    logging.warning(f"Skipping unsupported file: {member_path} - {e}")
+                    continue
+                finally:
+                    if spool is not None:
+                        spool.close()
+            yield submission_id_from_path(member_path), member_path, text, metadata
+
+
+def load_archive(
+    path: str,
+    duplicate_index: "DuplicateIndex | None" = None,
+    limits: dict[str, Any] | None = None,
+    extraction: dict[str, dict[str, Any]] | None = None,
+    backends: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """
+    Load all submissions in a ZIP archive, mirroring ``load_submissions``.
+
+    Args:
+        path (str): Path to the archive.
+        duplicate_index (Optional[DuplicateIndex]): Index each submission is added to.
+        limits (Optional[Dict[str, Any]]): Extraction limits, see ``collect_text``.
+        extraction (Optional[Dict[str, Dict[str, Any]]]): Filled with the extraction
+            metadata of each submission.
+        backends (Optional[Dict[str, str]]): Backend name per file extension, see
+            ``get_backend``.
+
+    Returns:
+        Dict[str, str]: Submission text keyed by submission ID.
+    """
+    submissions: dict[str, str] = {}
+    members: dict[str, str] = {}
+    for submission_id, member_path, text, metadata in iter_archive(
+        path, limits, backends=backends
+    ):
+        previous = members.get(submission_id)
+        if previous is not None:
+            # Keep the latest resubmission, whatever the archive order.
+            newer = submission_attempt(member_path) >= submission_attempt(previous)
+            logging.warning(
+                f"{member_path} and {previous} both map to "
+                f"{submission_id}; keeping {member_path if newer else previous}."
+            )
+            if not newer:
+                continue
+        submissions[submission_id] = text
+        members[submission_id] = member_path
+        if extraction is not None:
+            extraction[submission_id] = {**metadata, "archive_member": member_path}
+    if duplicate_index is not None:
+        for submission_id, text in submissions.items():
+            duplicate_index.add(submission_id, text)
+    return submissions
+
+
+def _is_metadata(member_path: str) -> bool:
+    """Tell whether a member is operating-system clutter rather than a submission."""
+    name = posixpath.basename(member_path)
+    return member_path.startswith("__MACOSX/") or name.startswith(".")
@@ -0,0 +1,225 @@
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sized
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from gradebotguru.deadline import propagate_deadline
+from gradebotguru.grader import grade_submission
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.stats import percentile
+
+
+class BatchRun:
+    """
+    Submissions being graded concurrently, iterated as results complete.
+
+    Created by ``grade_submissions``. Submissions are read from the input
+    only as workers become free, so a generator of submissions is never
+    loaded into memory all at once. Iterating the run grades the
+    submissions; afterwards ``summary`` describes the run.
+
+    Attributes:
+        summary (Dict[str, Any]): 'submissions', 'graded', 'failed', 'seconds',
+            'throughput' (graded submissions per second), 'latency'
+            (per-submission p50/p95/p99 in seconds) and 'errors' (messages keyed
+            by submission ID). Updated as the run progresses.
+    """
+
+    def __init__(
+        self,
+        submissions: Iterable[tuple[str, str]],
+        grade: Callable[..., dict[str, Any]],
+        grading_options: dict[str, Any],
+        max_workers: int,
+        max_pending: int,
+        on_result: Callable[[dict[str, Any]], None] | None,
+        on_error: Callable[[str, Exception], None] | None,
+        progress: Callable[[int, int | None], None] | None,
+        total: int | None,
+    ) -> None:
+        self.summary: dict[str, Any] = {
+            "submissions": 0,
+            "graded": 0,
+            "failed": 0,
+            "seconds": 0.0,
+            "throughput": 0.0,
+            "latency": {},
+            "errors": {},
+        }
+        self._submissions = submissions
+        self._grade = grade
+        self._grading_options = grading_options
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._on_result = on_result
+        self._on_error = on_error
+        self._progress = progress
+        self._total = total
+        self._started = False
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        if self._started:
+            raise RuntimeError("A batch run can only be iterated once")
+        self._started = True
+        return self._results()
+
+    def run(self) -> dict[str, Any]:
+        """
+        Grade every submission without iterating the results.
+
+        Returns:
+            Dict[str, Any]: The run summary.
+        """
+        for _ in self:
+            pass
+        return self.summary
+
+    def _results(self) -> Iterator[dict[str, Any]]:
+        """Grade the submissions, yielding each result as it completes."""
+        items = iter(self._submissions)
+        pending: dict[Future[tuple[dict[str, Any], float]], str] = {}
+        latencies: list[float] = []
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        grade = propagate_deadline(self._timed_grade)
+
+        def fill() -> None:
+            while len(pending) < self._max_pending:
+                try:
+                    submission_id, text = next(items)
+                except StopIteration:
+                    return
+                pending[executor.submit(grade, submission_id, text)] = submission_id
+                self.summary["submissions"] += 1
+
+        try:
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    submission_id = pending.pop(future)
+                    try:
+                        result, seconds = future.result()
+                    except Exception as e:
+                        self.summary["failed"] += 1
+                        self.summary["errors"][submission_id] = str(e)
+                        if self._on_error is not None:
+                            self._on_error(submission_id, e)
+                        else:
+                            logging.warning(f"Grading {submission_id} failed: {e}")
+                        result = None
+                    else:
+                        self.summary["graded"] += 1
+                        latencies.append(seconds)
+                    self._update(latencies, started)
+                    if self._progress is not None:
+                        completed = self.summary["graded"] + self.summary["failed"]
+                        self._progress(completed, self._total)
+                    if result is not None:
+                        if self._on_result is not None:
+                            self._on_result(result)
+                        yield result
+                fill()
+        finally:
+            # Stopping early, e.g. breaking out of the loop, abandons the rest.
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._update(latencies, started)
+
+    def _timed_grade(
+        self, submission_id: str, text: str
+    ) -> tuple[dict[str, Any], float]:
+        started = time.perf_counter()
+        result = self._grade(
+            submission_id=submission_id, submission=text, **self._grading_options
+        )
+        return result, time.perf_counter() - started
+
+    def _update(self, latencies: list[float], started: float) -> None:
+        seconds = time.perf_counter() - started
+        self.summary["seconds"] = seconds
+        self.summary["throughput"] = len(latencies) / seconds if seconds else 0.0
+        self.summary["latency"] = {
+            f"p{q}": percentile(latencies, q) for q in (50, 95, 99)
+        }
+
+
+def grade_submissions(
+    submissions: Mapping[str, str] | Iterable[tuple[str, str]],
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    aggregation_method: str,
+    max_workers: int = 4,
+    max_pending: int | None = None,
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+    on_error: Callable[[str, Exception], None] | None = None,
+    progress: Callable[[int, int | None], None] | None = None,
+    grade: Callable[..., dict[str, Any]] = grade_submission,
+    **grading_options: Any,
+) -> BatchRun:
+    """
+    Grade many submissions concurrently, yielding results as they complete.
+
+    Each submission is graded by ``grade_submission`` with the same options,
+    ``max_workers`` at a time. Results come back in the order they finish,
+    not the order given. A submission that fails is reported to
+    ``on_error`` (or logged) and counted in the summary; the others carry on.
+
+    Args:
+        submissions (Mapping[str, str] | Iterable[Tuple[str, str]]): Submission
+            texts keyed by submission ID, e.g. from ``load_submissions``, or an
+            iterable of (submission ID, text) pairs, which may be a generator.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        llms (List[BaseLLM]): List of LLM providers.
+        num_repeats (int): Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+        aggregation_method (str): The method to aggregate grades.
+        max_workers (int): Submissions graded at once.
+        max_pending (Optional[int]): Submissions read ahead of the workers;
+            default twice ``max_workers``.
+        on_result (Optional[Callable[[Dict[str, Any]], None]]): Called with each
+            result as it completes.
+        on_error (Optional[Callable[[str, Exception], None]]): Called with the
+            submission ID and exception of each failed submission.
+        progress (Optional[Callable[[int, Optional[int]], None]]): Called with the
+            number of submissions finished and the total, if known.
+        grade (Callable[..., Dict[str, Any]]): Grades one submission; default
+            ``grade_submission``.
+        **grading_options: Further keyword arguments for ``grade``, e.g.
+            ``prompt_template``, ``quorum`` or ``deadline``.
+
+    Returns:
+        BatchRun: Iterate it for the results; its ``summary`` has the counts,
+        errors, throughput and latency.
+
+    Examples:
+        >>> run = grade_submissions(
+        ...     load_submissions("essays/"), rubric, llms, 1, False, "simple_average"
+        ... )  # doctest: +SKIP
+        >>> for result in run:  # doctest: +SKIP
+        ...     print(result["submission_id"], result["grade"])
+        >>> run.summary["throughput"]  # doctest: +SKIP
+    """
+    total = len(submissions) if isinstance(submissions, Sized) else None
+    pairs = submissions.items() if isinstance(submissions, Mapping) else submissions
+    options = {
+        "rubric": rubric,
+        "llms": llms,
+        "num_repeats": num_repeats,
+        "repeat_each_provider": repeat_each_provider,
+        "aggregation_method": aggregation_method,
+        **grading_options,
+    }
+    return BatchRun(
+        pairs,
+        grade,
+        options,
+        max_workers=max_workers,
+        max_pending=max_pending or 2 * max_workers,
+        on_result=on_result,
+        on_error=on_error,
+        progress=progress,
+        total=total,
+    )
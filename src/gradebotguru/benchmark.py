@@ -0,0 +1,215 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any
+
+from gradebotguru.submission_loader import (
+    DEFAULT_BACKENDS,
+    EXTRACTION_BACKENDS,
+    get_backend,
+)
+
+
+def corpus_files(corpus: str) -> dict[str, list[str]]:
+    """
+    Find the files in a sample corpus that have extraction backends, by extension.
+
+    Args:
+        corpus (str): Directory to search recursively.
+
+    Returns:
+        Dict[str, List[str]]: Sorted file paths keyed by extension.
+    """
+    files: dict[str, list[str]] = {}
+    for root, _, names in os.walk(corpus):
+        for name in names:
+            extension = os.path.splitext(name)[1].lower()
+            if extension in EXTRACTION_BACKENDS:
+                files.setdefault(extension, []).append(os.path.join(root, name))
+    return {extension: sorted(paths) for extension, paths in sorted(files.items())}
+
+
+def run_backend(
+    extension: str, backend: str, files: list[str], repeats: int = 3
+) -> dict[str, Any]:
+    """
+    Extract every file with one backend and measure it.
+
+    Args:
+        extension (str): The file extension, e.g. '.pdf'.
+        backend (str): The backend name.
+        files (List[str]): The files to extract.
+        repeats (int): Number of passes over the files; the fastest is reported.
+
+    Returns:
+        Dict[str, Any]: Seconds for the fastest pass, pages and bytes extracted,
+        growth in peak RSS in MB, and the extracted texts.
+    """
+    extract = get_backend(f"file{extension}", {extension: backend})
+    baseline_mb = _peak_rss_mb()
+    best = float("inf")
+    texts: list[str] = []
+    pages = 0
+    for _ in range(repeats):
+        texts, pages = [], 0
+        started = time.perf_counter()
+        for path in files:
+            text, metadata = extract(path, None)
+            texts.append(text)
+            pages += metadata["pages_read"]
+        best = min(best, time.perf_counter() - started)
+    return {
+        "seconds": best,
+        "pages": pages,
+        "bytes": sum(os.path.getsize(path) for path in files),
+        "peak_rss_mb": _peak_rss_mb() - baseline_mb,
+        "texts": texts,
+    }
+
+
+def benchmark_backends(
+    corpus: str, repeats: int = 3, formats: list[str] | None = None
+) -> list[dict[str, Any]]:
+    """
+    Benchmark every extraction backend on a sample corpus.
+
+    Each backend runs in a fresh interpreter so its peak memory is measured
+    in isolation. Text agreement is the share of words that match the text
+    from the format's default backend, as a check that a faster backend
+    still extracts the right text.
+
+    Args:
+        corpus (str): Directory of sample submissions.
+        repeats (int): Passes over the corpus per backend.
+        formats (Optional[List[str]]): Extensions to benchmark; all if None.
+
+    Returns:
+        List[Dict[str, Any]]: One row per format and backend, with 'format',
+        'backend', 'files', 'pages_per_sec' (PDF only, otherwise None),
+        'mb_per_sec', 'peak_rss_mb', 'agreement' and 'error'.
+    """
+    wanted = {f".{name.lower().lstrip('.')}" for name in formats or []}
+    rows = []
+    for extension, files in corpus_files(corpus).items():
+        if wanted and extension not in wanted:
+            continue
+        reference = None
+        backends = sorted(
+            EXTRACTION_BACKENDS[extension],
+            key=lambda name: name != DEFAULT_BACKENDS[extension],
+        )
+        for backend in backends:
+            row: dict[str, Any] = {
+                "format": extension,
+                "backend": backend,
+                "files": len(files),
+            }
+            rows.append(row)
+            child = subprocess.run(
+                [sys.executable, "-m", "gradebotguru.benchmark", extension, backend]
+                + [str(repeats)]
+                + files,
+                capture_output=True,
+                text=True,
+            )
+            if child.returncode:
+                row["error"] = _child_error(child)
+                continue
+            result = json.loads(child.stdout)
+            if reference is None:
+                reference = result["texts"]
+            megabytes = result["bytes"] / (1024 * 1024)
+            seconds = result["seconds"] or 1e-9
+            row.update(
+                {
+                    # Only PDF backends read pages; DOCX counts paragraphs and
+                    # text formats whole files, which are not comparable.
+                    "pages_per_sec": (
+                        result["pages"] / seconds if extension == ".pdf" else None
+                    ),
+                    "mb_per_sec": megabytes / seconds,
+                    "peak_rss_mb": result["peak_rss_mb"],
+                    "agreement": _agreement(reference, result["texts"]),
+                    "error": None,
+                }
+            )
+    return rows
+
+
+def format_benchmark(rows: list[dict[str, Any]]) -> str:
+    """
+    Render benchmark rows as a text table.
+
+    Args:
+        rows (List[Dict[str, Any]]): Output of ``benchmark_backends``.
+
+    Returns:
+        str: The table.
+
+    Examples:
+        >>> print(format_benchmark([{"format": ".pdf", "backend": "pypdf", "files": 2,
+        ...     "pages_per_sec": 50.0, "mb_per_sec": 1.25, "peak_rss_mb": 12.0,
+        ...     "agreement": 1.0, "error": None}]))
+        format  backend       files  pages/s     MB/s  peak RSS  agreement
+        .pdf    pypdf             2     50.0     1.25    +12 MB     100.0%
+        >>> print(format_benchmark([{"format": ".txt", "backend": "text", "files": 2,
+        ...     "pages_per_sec": None, "mb_per_sec": 8.0, "peak_rss_mb": 1.0,
+        ...     "agreement": 1.0, "error": None}]).splitlines()[1])
+        .txt    text              2        -     8.00     +1 MB     100.0%
+    """
+    lines = [
+        f"{'format':<7} {'backend':<12} {'files':>6} {'pages/s':>8} {'MB/s':>8} "
+        f"{'peak RSS':>9} {'agreement':>10}"
+    ]
+    for row in rows:
+        prefix = f"{row['format']:<7} {row['backend']:<12} {row['files']:>6}"
+        if row.get("error"):
+            lines.append(f"{prefix}  failed: {row['error']}")
+            continue
+        pages = row["pages_per_sec"]
+        pages_column = "-" if pages is None else f"{pages:.1f}"
+        lines.append(
+            f"{prefix} {pages_column:>8} {row['mb_per_sec']:>8.2f} "
+            f"{'+' + format(row['peak_rss_mb'], '.0f') + ' MB':>9} "
+            f"{row['agreement']:>10.1%}"
+        )
+    return "\n".join(lines)
+
+
+def _child_error(child: subprocess.CompletedProcess[str]) -> str:
+    """The last line of a failed benchmark process's error output."""
+    lines = child.stderr.strip().splitlines()
+    if lines:
+        return lines[-1]
+    # A process killed by the OS, e.g. for running out of memory, prints nothing.
+    if child.returncode < 0:
+        return f"killed by signal {-child.returncode}"
+    return f"exited with code {child.returncode}"
+
+
+def _agreement(reference: list[str], texts: list[str]) -> float:
+    """Share of words matching the reference texts, compared as bags of words."""
+    matched = total = 0
+    for expected, actual in zip(reference, texts, strict=True):
+        expected_words = Counter(expected.split())
+        actual_words = Counter(actual.split())
+        matched += sum((expected_words & actual_words).values())
+        total += max(sum(expected_words.values()), sum(actual_words.values()))
+    return matched / total if total else 1.0
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process so far, in MB."""
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+if __name__ == "__main__":
+    # Child process used by benchmark_backends: <extension> <backend> <repeats> <files...>
+    extension, backend, repeats, *paths = sys.argv[1:]
+    print(json.dumps(run_backend(extension, backend, paths, int(repeats))))
@@ -0,0 +1,233 @@
+import re
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from gradebotguru.deadline import propagate_deadline
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.prompts import generate_prompt
+
+# Rough characters-per-token ratio for English prose, used to estimate tokens
+# without loading a provider-specific tokenizer.
+CHARS_PER_TOKEN = 4
+
+# Context windows of common models, used when a provider does not configure one,
+# e.g. for models served through an OpenAI-compatible API.
+MODEL_CONTEXT_LENGTHS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "llama3": 8192,
+    "llama3.1": 131072,
+    "mistral": 32768,
+}
+DEFAULT_CONTEXT_LENGTH = 2048  # Ollama's default num_ctx
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The approximate token count.
+
+    Examples:
+        >>> estimate_tokens("abcd" * 10)
+        10
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def context_length(llm: BaseLLM) -> int:
+    """
+    Get the context window of the model behind an LLM provider.
+
+    A ``context_length`` set in the provider configuration wins; otherwise
+    the longest matching model-name prefix in ``MODEL_CONTEXT_LENGTHS`` is
+    used, falling back to ``DEFAULT_CONTEXT_LENGTH``. Ollama runs every
+    model at ``DEFAULT_CONTEXT_LENGTH`` unless ``num_ctx`` is sent, so its
+    models are only given a longer window when one is configured.
+
+    Args:
+        llm (BaseLLM): The LLM provider.
+
+    Returns:
+        int: The context length in tokens.
+    """
+    configured = getattr(llm, "context_length", None)
+    if configured:
+        return int(configured)
+    info = llm.get_model_info()
+    if info.get("provider") == "Ollama":
+        return DEFAULT_CONTEXT_LENGTH
+    model = str(info.get("model_name", "")).split(":")[0]
+    matches = [name for name in MODEL_CONTEXT_LENGTHS if model.startswith(name)]
+    if matches:
+        return MODEL_CONTEXT_LENGTHS[max(matches, key=len)]
+    return DEFAULT_CONTEXT_LENGTH
+
+
+def chunk_budget(
+    llm: BaseLLM,
+    rubric: Mapping[str, Mapping[str, Any]],
+    prompt_template: str,
+    output_reserve: float = 0.25,
+) -> int:
+    """
+    Work out how many submission tokens fit in one prompt for a provider.
+
+    The budget is the model's context length minus the tokens used by the
+    prompt around the submission and a share reserved for the response.
+
+    Args:
+        llm (BaseLLM): The LLM provider.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        prompt_template (str): Custom prompt template for LLMs.
+        output_reserve (float): Fraction of the context kept free for the response.
+
+    Returns:
+        int: Maximum submission tokens per prompt, never less than 256.
+    """
+    window = context_length(llm)
+    overhead = estimate_tokens(generate_prompt(rubric, "", prompt_template))
+    return max(256, int(window * (1 - output_reserve)) - overhead)
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Split text into sections of at most ``max_tokens`` estimated tokens.
+
+    Sections break at paragraph boundaries where possible, then at sentence
+    boundaries, and only split words apart as a last resort.
+
+    Args:
+        text (str): The submission text.
+        max_tokens (int): Maximum estimated tokens per section.
+
+    Returns:
+        List[str]: The sections in order.
+
+    Examples:
+        >>> split_into_chunks("one two.\\n\\nthree four.", 3)
+        ['one two.', 'three four.']
+        >>> split_into_chunks("short", 100)
+        ['short']
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces: list[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                pieces.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if sentence:
+                pieces.append(sentence)
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks or [""]
+
+
+def generate_evidence_prompt(
+    rubric: Mapping[str, Mapping[str, Any]], section: str, index: int, total: int
+) -> str:
+    """
+    Generate the map-step prompt that extracts evidence from one section.
+
+    Args:
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        section (str): One section of the submission.
+        index (int): The 1-based position of the section.
+        total (int): The number of sections.
+
+    Returns:
+        str: The prompt for the LLM.
+    """
+    criteria = "\n".join(
+        f"- {criterion}: {details.get('description', '')}"
+        for criterion, details in rubric.items()
+    )
+    return (
+        "You are an AI assistant helping to evaluate a long student submission "
+        f"that has been split into {total} sections.\n\n"
+        f"Rubric criteria:\n{criteria}\n\n"
+        f"Section {index} of {total}:\n\n{section}\n\n"
+        "For each criterion, list concise evidence from this section only: "
+        "strengths, weaknesses and brief quotes. Do not assign grades. "
+        "Write 'No evidence' for criteria this section does not address."
+    )
+
+
+def map_reduce_response(
+    llm: BaseLLM,
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    prompt_template: str,
+    max_tokens: int,
+    max_workers: int = 4,
+    _depth: int = 0,
+) -> str:
+    """
+    Grade a submission that is too long for one prompt.
+
+    The map step extracts per-criterion evidence from each section
+    concurrently. The reduce step grades the combined evidence notes with
+    the normal grading prompt, so the response has the format that
+    ``parse_response`` expects.
+
+    Args:
+        llm (BaseLLM): The LLM provider.
+        submission (str): The student submission text.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        prompt_template (str): Custom prompt template for LLMs.
+        max_tokens (int): Maximum submission tokens per prompt.
+        max_workers (int): Maximum sections evaluated at once.
+
+    Returns:
+        str: The raw response of the reduce step.
+    """
+    sections = split_into_chunks(submission, max_tokens)
+    prompts = [
+        generate_evidence_prompt(rubric, section, index, len(sections))
+        for index, section in enumerate(sections, start=1)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        notes = list(executor.map(propagate_deadline(llm.get_response), prompts))
+
+    evidence = "\n\n".join(
+        f"Evidence from section {index} of {len(notes)}:\n{note.strip()}"
+        for index, note in enumerate(notes, start=1)
+    )
+    # Notes can still exceed the window for very long submissions; condense once more.
+    if estimate_tokens(evidence) > max_tokens and len(sections) > 1 and _depth < 2:
+        return map_reduce_response(
+            llm, evidence, rubric, prompt_template, max_tokens, max_workers, _depth + 1
+        )
+
+    summary = (
+        "The submission was too long to include in full. These are evidence notes "
+        f"extracted from each of its {len(sections)} sections:\n\n{evidence}"
+    )
+    return llm.get_response(generate_prompt(rubric, summary, prompt_template))
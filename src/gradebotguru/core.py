@@ -1,5 +1,6 @@
 import logging
 import os
+from collections.abc import Mapping
 from typing import Any
 
 from gradebotguru.grader import grade_submission
@@ -46,7 +47,7 @@ def load_and_grade_submissions(
     Good job!
     ----------------------------------------
     """
-    rubric: dict[str, dict[str, Any]] = load_rubric(rubric_path)
+    rubric: Mapping[str, Mapping[str, Any]] = load_rubric(rubric_path)
 
     for filename in os.listdir(submissions_path):
         file_path = os.path.join(submissions_path, filename)
@@ -0,0 +1,154 @@
+import contextvars
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_current: contextvars.ContextVar["Deadline | None"] = contextvars.ContextVar(
+    "gradebotguru_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when grading runs past its deadline."""
+
+
+class Deadline:
+    """
+    A point in time by which grading must finish.
+
+    Args:
+        seconds (float): Time allowed from now.
+
+    Examples:
+        >>> deadline = Deadline(60)
+        >>> deadline.expired()
+        False
+        >>> deadline.timeout(5.0)
+        5.0
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, or 0.0 once the deadline has passed."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """
+        Raise if the deadline has passed.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed.
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"Grading deadline of {self.seconds:g}s exceeded")
+
+    def timeout(self, limit: float | None = None) -> float:
+        """
+        The timeout to give a request started now.
+
+        Args:
+            limit (Optional[float]): The request's own timeout, if any.
+
+        Returns:
+            float: The smaller of ``limit`` and the time left.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed.
+        """
+        self.check()
+        remaining = self.remaining()
+        return remaining if limit is None else min(limit, remaining)
+
+
+@contextmanager
+def deadline_after(seconds: float | None) -> Iterator["Deadline | None"]:
+    """
+    Set a deadline for the grading done inside the ``with`` block.
+
+    Provider calls read it through ``current_deadline``. A deadline set
+    inside another one never extends it.
+
+    Args:
+        seconds (Optional[float]): Time allowed, or None to keep the current deadline.
+
+    Yields:
+        Optional[Deadline]: The deadline in force.
+    """
+    outer = _current.get()
+    if seconds is None:
+        yield outer
+        return
+    deadline = Deadline(seconds)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Deadline | None:
+    """The deadline of the grading in progress, if any."""
+    return _current.get()
+
+
+def check_deadline() -> None:
+    """
+    Raise if the grading in progress has run past its deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed.
+    """
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def request_timeout(limit: float | None = None) -> float | None:
+    """
+    The timeout for a provider request started now.
+
+    Args:
+        limit (Optional[float]): The provider's configured timeout, if any.
+
+    Returns:
+        Optional[float]: ``limit`` capped by the time left before the deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed.
+    """
+    deadline = _current.get()
+    return limit if deadline is None else deadline.timeout(limit)
+
+
+def propagate_deadline(call: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap a function so it runs under the caller's deadline in worker threads.
+
+    Threads started by ``ThreadPoolExecutor`` do not inherit context
+    variables, so calls submitted to one are wrapped with this.
+
+    Args:
+        call (Callable): The function to run in another thread.
+
+    Returns:
+        Callable: The function, running with the deadline in force now.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        # A context can only be entered by one thread at a time.
+        return context.copy().run(call, *args, **kwargs)
+
+    return run
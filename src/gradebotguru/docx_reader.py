@@ -0,0 +1,110 @@
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Iterator
+from typing import IO
+
+WORD_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W = f"{{{WORD_NAMESPACE}}}"
+FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+# Parts read after the main document, in this order. Headers and footers are
+# read once each, not once per page.
+NOTE_PARTS = ("word/footnotes.xml", "word/endnotes.xml")
+HEADER_FOOTER_PATTERN = re.compile(r"^word/(header|footer)\d*\.xml$")
+
+
+def iter_docx_paragraphs(source: str | IO[bytes]) -> Iterator[str]:
+    """
+    Stream the text of a DOCX file paragraph by paragraph.
+
+    The XML parts are read straight out of the package with an incremental
+    parser, so no python-docx object model is built and memory stays flat
+    for large documents. Unlike python-docx's ``Document.paragraphs`` this
+    covers tables (one line per row, cells separated by tabs), footnotes,
+    endnotes, headers and footers. Deleted tracked changes are skipped.
+
+    Args:
+        source (str | IO[bytes]): Path to the DOCX file, or a seekable binary stream.
+
+    Yields:
+        str: The text of each non-empty paragraph or table row, in order.
+
+    Raises:
+        zipfile.BadZipFile: If the source is not a ZIP package.
+        KeyError: If the package has no ``word/document.xml``.
+        xml.etree.ElementTree.ParseError: If a part is not well-formed XML.
+    """
+    with zipfile.ZipFile(source) as package:
+        names = set(package.namelist())
+        parts = ["word/document.xml"]
+        parts += [name for name in NOTE_PARTS if name in names]
+        parts += sorted(
+            name
+            for name in names
+            if HEADER_FOOTER_PATTERN.match(posixpath.normpath(name))
+        )
+        for part in parts:
+            with package.open(part) as xml_file:
+                yield from _iter_part(xml_file)
+
+
+def _iter_part(xml_file: IO[bytes]) -> Iterator[str]:
+    """Yield paragraph and table-row text from one WordprocessingML part."""
+    # Open elements, and the runs of each open paragraph, the cells of each
+    # open table row and the paragraphs of each open cell. Paragraphs nest
+    # through text boxes and tables through cells.
+    open_elements: list[ET.Element] = []
+    paragraphs: list[list[str]] = []
+    rows: list[list[str]] = []
+    cells: list[list[str]] = []
+    fallback_depth = 0
+    for event, element in ET.iterparse(xml_file, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            open_elements.append(element)
+            if tag == FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == f"{W}p":
+                paragraphs.append([])
+            elif tag == f"{W}tr":
+                rows.append([])
+            elif tag == f"{W}tc":
+                cells.append([])
+            continue
+
+        open_elements.pop()
+        if tag == FALLBACK:
+            fallback_depth -= 1
+            continue
+        if fallback_depth:
+            # Fallback content repeats the preferred choice for older readers.
+            continue
+        text = None
+        if tag == f"{W}t" and paragraphs:
+            paragraphs[-1].append(element.text or "")
+        elif tag == f"{W}tab" and paragraphs:
+            paragraphs[-1].append("\t")
+        elif tag in (f"{W}br", f"{W}cr") and paragraphs:
+            paragraphs[-1].append("\n")
+        elif tag == f"{W}p" and paragraphs:
+            text = "".join(paragraphs.pop()).strip()
+        elif tag == f"{W}tc" and rows and cells:
+            rows[-1].append(" ".join(cells.pop()))
+        elif tag == f"{W}tr" and rows:
+            text = "\t".join(rows.pop()).strip()
+
+        if text is None:
+            continue
+        if cells:
+            if text:
+                cells[-1].append(text)
+            continue
+        if text:
+            yield text
+        # Drop finished paragraphs and tables so memory stays flat.
+        if open_elements and not paragraphs:
+            open_elements[-1].clear()
@@ -0,0 +1,236 @@
+import hashlib
+import logging
+import re
+import zlib
+from typing import Any
+
+import numpy as np
+
+# Mersenne prime used for the universal hash family of the MinHash permutations.
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalise_text(text: str) -> str:
+    """
+    Normalise extracted text so format differences do not hide duplicates.
+
+    Case, punctuation and whitespace are ignored, so the same essay extracted
+    from a .docx and a .pdf normalises to the same string.
+
+    Args:
+        text (str): The extracted submission text.
+
+    Returns:
+        str: Lower-case words separated by single spaces.
+
+    Examples:
+        >>> normalise_text("Hello,   World!\\nThis is  a TEST.")
+        'hello world this is a test'
+    """
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+class DuplicateIndex:
+    """
+    MinHash/LSH index that clusters exact and near-duplicate submissions.
+
+    Exact duplicates share the same normalised text. Near duplicates share at
+    least one LSH band and have an estimated Jaccard similarity of word
+    shingles of at least ``threshold``.
+
+    Args:
+        threshold (float): Minimum estimated similarity for a near duplicate.
+        num_perm (int): Number of MinHash permutations.
+        bands (int): Number of LSH bands; must divide ``num_perm``.
+        shingle_size (int): Number of words per shingle.
+        seed (int): Seed for the permutation coefficients.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._signatures: dict[str, np.ndarray] = {}
+        self._exact: dict[str, str] = {}
+        self._canonical: dict[str, str] = {}
+        self._buckets: dict[tuple[int, bytes], list[str]] = {}
+
+    def add(self, submission_id: str, text: str) -> None:
+        """
+        Add a submission to the index.
+
+        Submissions with no text, e.g. image-only PDFs or failed extractions,
+        are not indexed, so they are never matched with each other.
+
+        Args:
+            submission_id (str): The ID of the student submission.
+            text (str): The extracted submission text.
+        """
+        normalised = normalise_text(text)
+        if not normalised:
+            logging.warning(f"{submission_id} has no text; not checking duplicates.")
+            return
+        digest = hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+        self._canonical[submission_id] = self._exact.setdefault(digest, submission_id)
+
+        signature = self._signature(normalised)
+        self._signatures[submission_id] = signature
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            self._buckets.setdefault(key, []).append(submission_id)
+
+    def canonical(self, submission_id: str) -> str:
+        """
+        Return the first submission indexed with the same normalised text.
+
+        Args:
+            submission_id (str): The ID of the student submission.
+
+        Returns:
+            str: The ID whose grading result an exact duplicate can reuse; the
+            submission's own ID if it is not an exact duplicate.
+        """
+        return self._canonical.get(submission_id, submission_id)
+
+    def near_duplicates(self, submission_id: str) -> list[tuple[str, float]]:
+        """
+        List other submissions that are near duplicates of a submission.
+
+        Exact duplicates are included with a similarity of 1.0.
+
+        Args:
+            submission_id (str): The ID of the student submission.
+
+        Returns:
+            List[Tuple[str, float]]: Matching IDs and estimated similarities,
+            most similar first; empty if the submission was not indexed.
+        """
+        signature = self._signatures.get(submission_id)
+        if signature is None:
+            return []
+        candidates: set[str] = set()
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            candidates.update(self._buckets.get(key, []))
+        candidates.discard(submission_id)
+
+        matches = []
+        for other in candidates:
+            if self.canonical(other) == self.canonical(submission_id):
+                similarity = 1.0
+            else:
+                similarity = float(np.mean(signature == self._signatures[other]))
+            if similarity >= self.threshold:
+                matches.append((other, round(similarity, 3)))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def clusters(self) -> list[list[str]]:
+        """
+        Group indexed submissions into clusters of exact and near duplicates.
+
+        Returns:
+            List[List[str]]: Clusters with more than one member, in index order.
+        """
+        parent = {submission_id: submission_id for submission_id in self._signatures}
+
+        def find(item: str) -> str:
+            while parent[item] != item:
+                parent[item] = parent[parent[item]]
+                item = parent[item]
+            return item
+
+        for submission_id in self._signatures:
+            for other, _ in self.near_duplicates(submission_id):
+                parent[find(other)] = find(submission_id)
+
+        groups: dict[str, list[str]] = {}
+        for submission_id in self._signatures:
+            groups.setdefault(find(submission_id), []).append(submission_id)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def _signature(self, normalised: str) -> np.ndarray:
+        """Compute the MinHash signature of the word shingles of a text."""
+        words = normalised.split()
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {
+            " ".join(words[i : i + size]) for i in range(max(1, len(words) - size + 1))
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        signature: np.ndarray = permuted.min(axis=0)
+        return signature
+
+
+def reuse_duplicate_result(
+    index: DuplicateIndex, submission_id: str, results: dict[str, dict[str, Any]]
+) -> dict[str, Any] | None:
+    """
+    Reuse the grading result of an exact duplicate that was already graded.
+
+    Args:
+        index (DuplicateIndex): The index the submission was added to.
+        submission_id (str): The ID of the student submission.
+        results (Dict[str, Dict[str, Any]]): Results graded so far, keyed by ID.
+
+    Returns:
+        Optional[Dict[str, Any]]: A copy of the duplicate's result marked with
+        'duplicate_of', or None if the submission needs grading.
+    """
+    canonical = index.canonical(submission_id)
+    if canonical == submission_id or canonical not in results:
+        return None
+    logging.info(f"{submission_id} is an exact duplicate of {canonical}.")
+    shared = {k: v for k, v in results[canonical].items() if k != "near_duplicates"}
+    return {
+        **shared,
+        "submission_id": submission_id,
+        "duplicate_of": canonical,
+    }
+
+
+def flag_near_duplicates(
+    index: DuplicateIndex, submission_id: str, results: dict[str, dict[str, Any]]
+) -> None:
+    """
+    Record near duplicates on a result, and on the results of its matches.
+
+    Flags are written in both directions so a pair is flagged no matter which
+    submission was graded first.
+
+    Args:
+        index (DuplicateIndex): The index the submission was added to.
+        submission_id (str): The ID of a graded submission present in ``results``.
+        results (Dict[str, Dict[str, Any]]): Results graded so far, keyed by ID.
+    """
+    matches = index.near_duplicates(submission_id)
+    if not matches:
+        return
+    logging.warning(
+        f"{submission_id} is similar to {', '.join(other for other, _ in matches)}; "
+        "flagged for review."
+    )
+    for other, similarity in matches:
+        for source, target in ((submission_id, other), (other, submission_id)):
+            if source not in results:
+                continue
+            flags = results[source].setdefault("near_duplicates", [])
+            if all(flag["submission_id"] != target for flag in flags):
+                flags.append({"submission_id": target, "similarity": similarity})
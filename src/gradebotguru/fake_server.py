@@ -0,0 +1,300 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from gradebotguru.chunking import estimate_tokens
+
+# Rubric criteria as rendered into grading prompts by Rubric.prompt_fragment.
+CRITERION_PATTERN = re.compile(
+    r"- (?P<name>[^:\n]+?):[^\n]*?\(Max Points: (?P<max>\d+(?:\.\d+)?)\)"
+)
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+def parse_latency(spec: str) -> tuple[str, list[float]]:
+    """
+    Parse a latency distribution written as ``name:param[:param]``.
+
+    Supported distributions, with times in seconds, are ``fixed:<seconds>``,
+    ``uniform:<low>:<high>``, ``exponential:<mean>`` and
+    ``lognormal:<median>:<sigma>``.
+
+    Args:
+        spec (str): The distribution, e.g. "lognormal:0.8:0.5".
+
+    Returns:
+        Tuple[str, List[float]]: The distribution name and its parameters.
+
+    Raises:
+        ValueError: If the distribution or its parameters are invalid.
+
+    Examples:
+        >>> parse_latency("uniform:0.2:1.5")
+        ('uniform', [0.2, 1.5])
+    """
+    name, *params = spec.split(":")
+    expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+    if name not in expected:
+        raise ValueError(
+            f"Unknown latency distribution: {name} "
+            f"(available: {', '.join(LATENCY_DISTRIBUTIONS)})"
+        )
+    if len(params) != expected[name]:
+        raise ValueError(f"{name} latency takes {expected[name]} parameter(s): {spec}")
+    return name, [float(param) for param in params]
+
+
+def canned_response(prompt: str, rng: random.Random) -> str:
+    """
+    Build a plausible response to a prompt.
+
+    Grading prompts get a grade between half and full marks for every rubric
+    criterion they list, in the format ``parse_response`` expects. Other
+    prompts, such as feedback summaries, get a short paragraph.
+
+    Args:
+        prompt (str): The prompt sent to the server.
+        rng (random.Random): Source of the grades.
+
+    Returns:
+        str: The response text.
+    """
+    criteria = CRITERION_PATTERN.findall(prompt)
+    if not criteria:
+        return "The submission is clear and well organised, with room to develop the argument further."
+    lines = []
+    for name, max_points in criteria:
+        grade = round(rng.uniform(0.5, 1.0) * float(max_points))
+        lines += [
+            f"Criterion: {name.strip()}",
+            f"Grade: {grade}",
+            "Feedback: Addresses the criterion with some supporting detail.",
+            "",
+        ]
+    lines.append("Overall: A solid submission that meets most of the rubric.")
+    return "\n".join(lines)
+
+
+class FakeLLMServer:
+    """
+    A local stand-in for OpenAI and Ollama endpoints, for load testing.
+
+    Serves ``POST /v1/chat/completions`` (OpenAI, including ``n``) and
+    ``POST /api/chat`` and ``/api/generate`` (Ollama) with canned grading
+    responses. Each request waits for a latency drawn from the configured
+    distribution. Failures can be injected as HTTP 500 and 429 responses,
+    and a tokens-per-minute limit answers 429 once the estimated prompt and
+    completion tokens exceed it, like a provider's rate limiter.
+
+    Args:
+        host (str): Interface to listen on.
+        port (int): Port to listen on; 0 picks a free port.
+        latency (str): Latency distribution, see ``parse_latency``.
+        error_rate (float): Share of requests answered with HTTP 500.
+        throttle_rate (float): Share of requests answered with HTTP 429.
+        tokens_per_minute (Optional[int]): Token-rate limit, or None for no limit.
+        seed (Optional[int]): Seed for latencies, failures and grades.
+
+    Attributes:
+        stats (Dict[str, int]): Counts of 'requests', 'ok', 'errors' and 'throttled'.
+
+    Examples:
+        >>> with FakeLLMServer(latency="fixed:0") as server:
+        ...     server.url.startswith("http://127.0.0.1:")
+        True
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        tokens_per_minute: int | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.tokens_per_minute = tokens_per_minute
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(tokens_per_minute or 0)
+        self._refilled = time.monotonic()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """The server's base URL, e.g. 'http://127.0.0.1:8080'."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        """Serve requests from the calling thread until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def respond(self, path: str, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        """
+        Produce the status and JSON body for a request, after its simulated latency.
+
+        Args:
+            path (str): The request path.
+            body (Dict[str, Any]): The decoded JSON request.
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: The HTTP status and response body.
+        """
+        if path == "/api/generate" and "prompt" not in body:
+            # Ollama's load/unload request, e.g. keep_alive=0.
+            return 200, {"model": body.get("model", ""), "response": "", "done": True}
+        messages = body.get("messages") or [{"content": body.get("prompt", "")}]
+        prompt = str(messages[-1].get("content", ""))
+        samples = int(body.get("n", 1)) if path.startswith("/v1/") else 1
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self._sample_latency()
+            roll = self._rng.random()
+            texts = [canned_response(prompt, self._rng) for _ in range(samples)]
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = sum(estimate_tokens(text) for text in texts)
+
+        status, error = 200, ""
+        if roll < self.error_rate:
+            status, error = 500, "Injected server error"
+        elif roll < self.error_rate + self.throttle_rate:
+            status, error = 429, "Injected rate limit"
+        elif not self._take_tokens(prompt_tokens + completion_tokens):
+            status, error = 429, "Token rate limit exceeded"
+        time.sleep(delay)
+        with self._lock:
+            key = {200: "ok", 429: "throttled"}.get(status, "errors")
+            self.stats[key] += 1
+        if status != 200:
+            return status, {"error": {"message": error, "type": "fake_server_error"}}
+
+        model = body.get("model", "fake-model")
+        if path.startswith("/v1/"):
+            return 200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": index,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                    for index, text in enumerate(texts)
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        ollama = {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "done": True,
+            "done_reason": "stop",
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": completion_tokens,
+        }
+        if path == "/api/generate":
+            return 200, {**ollama, "response": texts[0]}
+        return 200, {**ollama, "message": {"role": "assistant", "content": texts[0]}}
+
+    def _sample_latency(self) -> float:
+        """Draw a latency in seconds from the configured distribution."""
+        name, params = self.latency
+        if name == "fixed":
+            return params[0]
+        if name == "uniform":
+            return self._rng.uniform(params[0], params[1])
+        if name == "exponential":
+            return self._rng.expovariate(1 / params[0]) if params[0] else 0.0
+        return params[0] * self._rng.lognormvariate(0, params[1])
+
+    def _take_tokens(self, tokens: int) -> bool:
+        """Spend tokens from the per-minute budget, refilled continuously."""
+        if not self.tokens_per_minute:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.tokens_per_minute,
+                self._tokens + (now - self._refilled) * self.tokens_per_minute / 60,
+            )
+            self._refilled = now
+            if tokens > self._tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+
+def _make_handler(server: FakeLLMServer) -> type[BaseHTTPRequestHandler]:
+    """Build the request handler class bound to a fake server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            path = self.path.split("?")[0].rstrip("/")
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send(400, {"error": {"message": "Invalid JSON"}})
+                return
+            if path not in ("/v1/chat/completions", "/api/chat", "/api/generate"):
+                self._send(404, {"error": {"message": f"Unknown endpoint {path}"}})
+                return
+            self._send(*server.respond(path, body))
+
+        def _send(self, status: int, payload: dict[str, Any]) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logging.debug(f"Fake server: {format % args}")
+
+    return Handler
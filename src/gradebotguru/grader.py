@@ -1,11 +1,35 @@
+import logging
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from statistics import median
 from typing import Any
 
+from gradebotguru.chunking import (
+    chunk_budget,
+    estimate_tokens,
+    map_reduce_response,
+    split_into_chunks,
+)
+from gradebotguru.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    deadline_after,
+    propagate_deadline,
+)
 from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.llm_interface.circuit_breaker import ProviderUnavailableError
 from gradebotguru.prompts import generate_prompt
 from gradebotguru.response_parser import parse_response
+from gradebotguru.rubric import compile_rubric
 from gradebotguru.text_analysis import analyze_sentiment, analyze_style
 
+REPEAT_STRATEGIES = ("sequential", "batched")
+# Largest spread of total grades, in percentage points of the rubric total,
+# at which a quorum of evaluations counts as agreeing.
+DEFAULT_QUORUM_TOLERANCE = 10.0
+
 
 def summarize(feedback: list[str], llm: BaseLLM) -> str:
     """
@@ -16,18 +40,24 @@ def summarize(feedback: list[str], llm: BaseLLM) -> str:
         llm (BaseLLM): The best LLM provider.
 
     Returns:
-        str: Summarized feedback.
+        str: Summarized feedback, or the feedback joined together if the
+        provider is unavailable.
     """
     feedback_summary = " ".join(feedback)
     summary_prompt = f'Summarize this feedback into one concise paragraph as if you are talking directly to the student, so use "you" instead of "the student": {feedback_summary}'
-    summary = llm.generate_text(summary_prompt)
+    check_deadline()
+    try:
+        summary = llm.generate_text(summary_prompt)
+    except ProviderUnavailableError as e:
+        logging.warning(f"Could not summarize feedback: {e}")
+        return feedback_summary
     return summary
 
 
 def grade_submission(
     submission_id: str,
     submission: str,
-    rubric: dict[str, dict[str, Any]],
+    rubric: Mapping[str, Mapping[str, Any]],
     llms: list[BaseLLM],
     num_repeats: int,
     repeat_each_provider: bool,
@@ -35,6 +65,10 @@ def grade_submission(
     bias_adjustments: dict[str, float] | None = None,
     prompt_template: str = "Grade the following student submission based on the rubric provided. The rubric is as follows: \n\n {rubric}. \n\n The student submission is as follows: \n\n {submission}.",
     summarize_feedback: bool = False,
+    chunked: bool = False,
+    repeat_strategy: str = "sequential",
+    quorum: Mapping[str, float] | None = None,
+    deadline: float | None = None,
 ) -> dict[str, Any]:
     """
     Grade a student submission using multiple LLM providers and repeats.
@@ -50,16 +84,131 @@ def grade_submission(
         bias_adjustments (Optional[Dict[str, float]]): Bias adjustments for specific providers.
         prompt_template (str): Custom prompt template for LLMs.
         summarize_feedback (bool): Whether to summarize feedback from all LLMs.
+        chunked (bool): Whether to grade submissions that exceed a model's context
+            window section by section.
+        repeat_strategy (str): How repeats are requested, see ``run_evaluations``.
+        quorum (Optional[Dict[str, float]]): Finalize once enough evaluations
+            agree, see ``evaluate_quorum``. Default is to wait for all of them.
+        deadline (Optional[float]): Seconds allowed for grading the submission,
+            including every provider call, retry and feedback summary. Default
+            is no deadline.
 
     Returns:
-        Dict[str, Any]: Aggregated grading results and individual responses.
+        Dict[str, Any]: Aggregated grading results and individual responses, with
+        the quorum outcome under 'quorum' when one was requested.
+
+    Raises:
+        DeadlineExceeded: If grading did not finish within the deadline.
     """
-    all_individual_responses = []
-    all_grades = []
-    providers_info = set()
+    with deadline_after(deadline):
+        return _grade_submission(
+            submission_id,
+            submission,
+            rubric,
+            llms,
+            num_repeats,
+            repeat_each_provider,
+            aggregation_method,
+            bias_adjustments,
+            prompt_template,
+            summarize_feedback,
+            chunked,
+            repeat_strategy,
+            quorum,
+        )
+
+
+def _grade_submission(
+    submission_id: str,
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    aggregation_method: str,
+    bias_adjustments: dict[str, float] | None,
+    prompt_template: str,
+    summarize_feedback: bool,
+    chunked: bool,
+    repeat_strategy: str,
+    quorum: Mapping[str, float] | None,
+) -> dict[str, Any]:
+    """Grade a submission under the deadline set by ``grade_submission``."""
+    if quorum:
+        individual_responses, quorum_report = evaluate_quorum(
+            submission,
+            rubric,
+            llms,
+            num_repeats,
+            repeat_each_provider,
+            prompt_template,
+            quorum,
+            chunked,
+        )
+    else:
+        individual_responses = evaluate_submission(
+            submission,
+            rubric,
+            llms,
+            num_repeats,
+            repeat_each_provider,
+            prompt_template,
+            bias_adjustments,
+            chunked,
+            repeat_strategy,
+        )
+
+    result = finalize_submission(
+        submission_id,
+        submission,
+        rubric,
+        individual_responses,
+        llms,
+        num_repeats,
+        repeat_each_provider,
+        aggregation_method,
+        summarize_feedback,
+    )
+    if quorum:
+        result["quorum"] = quorum_report
+    return result
+
+
+def evaluate_submission(
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    prompt_template: str,
+    bias_adjustments: dict[str, float] | None = None,
+    chunked: bool = False,
+    repeat_strategy: str = "sequential",
+) -> list[dict[str, Any]]:
+    """
+    Run the evaluation step for a submission across all LLM providers.
 
+    Args:
+        submission (str): The student submission text.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        llms (List[BaseLLM]): List of LLM providers.
+        num_repeats: Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+        prompt_template (str): Custom prompt template for LLMs.
+        bias_adjustments (Optional[Dict[str, float]]): Bias adjustments for specific providers.
+        chunked (bool): Whether to grade over-long submissions section by section.
+        repeat_strategy (str): How repeats are requested, see ``run_evaluations``.
+
+    Returns:
+        List[Dict[str, Any]]: Individual responses ordered by provider, then iteration.
+        Providers that are unavailable are left out.
+
+    Raises:
+        ProviderUnavailableError: If no provider answered.
+    """
+    all_individual_responses = []
     for llm in llms:
-        individual_responses, provider_grades = run_evaluations(
+        individual_responses, _ = run_evaluations(
             llm,
             submission,
             rubric,
@@ -67,17 +216,203 @@ def grade_submission(
             repeat_each_provider,
             prompt_template,
             bias_adjustments,
+            chunked,
+            repeat_strategy,
         )
         all_individual_responses.extend(individual_responses)
-        all_grades.extend(provider_grades)
-        for response in individual_responses:
-            provider_info_str = " ".join(
-                f"{k}: {v}" for k, v in response["provider_info"].items()
-            )
-            providers_info.add(provider_info_str)
+    if llms and not all_individual_responses:
+        raise ProviderUnavailableError("No LLM provider answered")
+    return all_individual_responses
+
+
+def evaluate_quorum(
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    prompt_template: str,
+    quorum: Mapping[str, float],
+    chunked: bool = False,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    Evaluate a submission until a quorum of evaluations agree.
+
+    Every provider and repeat is requested at once. As soon as ``size`` of
+    the returned evaluations have total grades within ``tolerance``
+    percentage points of the rubric total of each other, those are used and
+    the rest are dropped: outliers already returned are discarded, and the
+    others are cancelled if not yet started, or ignored if already running.
+    Otherwise every evaluation is used, as with ``evaluate_submission``.
+    Repeats are always separate requests.
+
+    Args:
+        submission (str): The student submission text.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        llms (List[BaseLLM]): List of LLM providers.
+        num_repeats: Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+        prompt_template (str): Custom prompt template for LLMs.
+        quorum (Dict[str, float]): 'size', the evaluations needed (default a
+            majority), and 'tolerance' (default ``DEFAULT_QUORUM_TOLERANCE``).
+        chunked (bool): Whether to grade over-long submissions section by section.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any]]: The evaluations used, ordered
+        by provider, then iteration, and a report of the quorum 'size', whether
+        it was 'reached' and the 'dropped_evaluations' (provider information
+        and iteration of each evaluation not used, with the 'error' of those
+        whose provider was unavailable and 'outlier' set on those discarded
+        for disagreeing with the quorum).
+
+    Raises:
+        ProviderUnavailableError: If no provider answered.
+    """
+    repeats = num_repeats if repeat_each_provider else 1
+    tasks = [(llm, i + 1) for llm in llms for i in range(repeats)]
+    size = min(int(quorum.get("size", len(tasks) // 2 + 1)), len(tasks))
+    tolerance = quorum.get("tolerance", DEFAULT_QUORUM_TOLERANCE)
+    max_total = compile_rubric(rubric).max_total
+
+    finished: dict[int, dict[str, Any]] = {}
+    errors: dict[int, str] = {}
+    agreeing: list[int] | None = None
+    executor = ThreadPoolExecutor(max_workers=len(tasks) or 1)
+    try:
+        futures = {
+            executor.submit(
+                propagate_deadline(run_evaluation),
+                llm,
+                submission,
+                rubric,
+                prompt_template,
+                iteration,
+                chunked,
+            ): index
+            for index, (llm, iteration) in enumerate(tasks)
+        }
+        deadline = current_deadline()
+        timeout = deadline.remaining() if deadline is not None else None
+        for future in as_completed(futures, timeout=timeout):
+            try:
+                finished[futures[future]] = future.result()
+            except ProviderUnavailableError as e:
+                logging.warning(f"Skipping unavailable provider: {e}")
+                errors[futures[future]] = str(e)
+                continue
+            if len(finished) >= size and len(finished) + len(errors) < len(tasks):
+                agreeing = _find_quorum(
+                    finished, size, tolerance * (max_total or 100) / 100
+                )
+                if agreeing is not None:
+                    break
+    except (TimeoutError, FuturesTimeoutError) as e:
+        if isinstance(e, DeadlineExceeded):
+            raise
+        # as_completed stopped waiting because the deadline passed. Before
+        # Python 3.11 it raises its own TimeoutError, not the builtin.
+        raise DeadlineExceeded("Grading deadline exceeded waiting for a quorum") from e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if tasks and not finished:
+        raise ProviderUnavailableError("No LLM provider answered")
+    used = sorted(finished) if agreeing is None else sorted(agreeing)
+    dropped = []
+    for index, (llm, iteration) in enumerate(tasks):
+        if index not in used:
+            evaluation = {"provider_info": llm.get_model_info(), "iteration": iteration}
+            if index in errors:
+                evaluation["error"] = errors[index]
+            elif index in finished:
+                evaluation["outlier"] = True
+            dropped.append(evaluation)
+    report = {
+        "size": size,
+        "reached": agreeing is not None,
+        "dropped_evaluations": dropped,
+    }
+    return [finished[index] for index in used], report
+
+
+def _find_quorum(
+    finished: Mapping[int, dict[str, Any]], size: int, max_spread: float
+) -> list[int] | None:
+    """
+    Find ``size`` evaluations whose total grades are within ``max_spread`` points.
+
+    The totals are sorted and a window of ``size`` is slid along them, so an
+    early outlier does not keep the others from forming a quorum. The tightest
+    window is chosen.
+
+    Args:
+        finished (Dict[int, Dict[str, Any]]): Evaluations returned so far, by task.
+        size (int): The evaluations needed.
+        max_spread (float): The largest difference in total grade allowed.
+
+    Returns:
+        Optional[List[int]]: The tasks of the agreeing evaluations, or None.
+
+    Examples:
+        >>> def evaluation(grade):
+        ...     return {"criteria": [{"name": "Content", "grade": grade}]}
+        >>> finished = {0: evaluation(2), 1: evaluation(8), 2: evaluation(7.5)}
+        >>> sorted(_find_quorum(finished, 2, 1.0))
+        [1, 2]
+        >>> _find_quorum(finished, 3, 1.0) is None
+        True
+    """
+    totals = sorted(
+        (sum(criterion["grade"] for criterion in response["criteria"]), index)
+        for index, response in finished.items()
+    )
+    best = None
+    for start in range(len(totals) - size + 1):
+        spread = totals[start + size - 1][0] - totals[start][0]
+        if spread <= max_spread and (best is None or spread < best[0]):
+            best = (spread, start)
+    if best is None:
+        return None
+    return [index for _, index in totals[best[1] : best[1] + size]]
+
+
+def finalize_submission(
+    submission_id: str,
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    individual_responses: list[dict[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    aggregation_method: str,
+    summarize_feedback: bool = False,
+) -> dict[str, Any]:
+    """
+    Aggregate individual responses into the final result for a submission.
+
+    Args:
+        submission_id (str): The ID of the student submission.
+        submission (str): The student submission text.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        individual_responses (List[Dict[str, Any]]): Responses from the evaluation step.
+        llms (List[BaseLLM]): List of LLM providers.
+        num_repeats: Number of times the grading process was repeated.
+        repeat_each_provider (bool): Whether grading was repeated for each provider.
+        aggregation_method (str): The method to aggregate grades.
+        summarize_feedback (bool): Whether to summarize feedback from all LLMs.
+
+    Returns:
+        Dict[str, Any]: Aggregated grading results and individual responses.
+    """
+    providers_info = set()
+    for response in individual_responses:
+        provider_info_str = " ".join(
+            f"{k}: {v}" for k, v in response["provider_info"].items()
+        )
+        providers_info.add(provider_info_str)
 
     aggregated_response = aggregate_responses(
-        all_individual_responses,
+        individual_responses,
         aggregation_method,
         llms,
         num_repeats,
@@ -95,22 +430,32 @@ def grade_submission(
         overall_grade,
         aggregated_response,
         providers_info,
-        all_individual_responses,
+        individual_responses,
     )
 
 
 def run_evaluations(
     llm: BaseLLM,
     submission: str,
-    rubric: dict[str, Any],
+    rubric: Mapping[str, Mapping[str, Any]],
     num_repeats: int,
     repeat_each_provider: bool,
     prompt_template: str,
     bias_adjustments: dict[str, float] | None,
+    chunked: bool = False,
+    repeat_strategy: str = "sequential",
 ) -> tuple[list[dict[str, Any]], list[float]]:
     """
     Run evaluations for a given LLM.
 
+    With the "sequential" repeat strategy each repeat is a separate request,
+    one after the other. With "batched" all repeats are requested together
+    through ``BaseLLM.get_responses``: a single request where the provider
+    can return several samples (OpenAI), otherwise concurrent requests.
+    Submissions graded in sections are always repeated sequentially.
+    Evaluations whose provider is unavailable (``ProviderUnavailableError``)
+    are skipped, as are batched samples that come back empty.
+
     Args:
         llm (BaseLLM): The LLM provider.
         submission (str): The student submission text.
@@ -119,33 +464,136 @@ def run_evaluations(
         repeat_each_provider (bool): Whether to repeat grading for each provider.
         prompt_template (str): Custom prompt template for LLMs.
         bias_adjustments (Optional[Dict[str, float]]): Bias adjustments for specific providers.
+        chunked (bool): Whether to grade over-long submissions section by section.
+        repeat_strategy (str): "sequential" or "batched".
 
     Returns:
         Tuple[List[Dict[str, Any]], List[float]]: List of individual responses and their grades.
     """
-    individual_responses = []
-    provider_grades = []
+    if repeat_strategy not in REPEAT_STRATEGIES:
+        raise ValueError(f"Unsupported repeat strategy: {repeat_strategy}")
     repeats = num_repeats if repeat_each_provider else 1
 
-    for i in range(repeats):
+    if (
+        repeat_strategy == "batched"
+        and repeats > 1
+        and _section_budget(llm, submission, rubric, prompt_template, chunked) is None
+    ):
         prompt = generate_prompt(rubric, submission, prompt_template)
-        response = llm.get_response(prompt)
-        criteria, overall_feedback = parse_response(response)
-        total_grade = sum(criterion["grade"] for criterion in criteria)
-
-        individual_responses.append(
-            {
-                "criteria": criteria,
-                "overall_feedback": overall_feedback,
-                "provider_info": llm.get_model_info(),
-                "iteration": i + 1,
-            }
-        )
-        provider_grades.append(total_grade)
+        check_deadline()
+        try:
+            responses = llm.get_responses(prompt, repeats)
+        except ProviderUnavailableError as e:
+            logging.warning(f"Skipping unavailable provider: {e}")
+            responses = []
+        # Failed requests come back empty; they are not answers to aggregate.
+        responses = [response for response in responses if response]
+        individual_responses = [
+            _build_evaluation(llm, response, rubric, i + 1)
+            for i, response in enumerate(responses)
+        ]
+    else:
+        individual_responses = []
+        for i in range(repeats):
+            try:
+                individual_responses.append(
+                    run_evaluation(
+                        llm, submission, rubric, prompt_template, i + 1, chunked
+                    )
+                )
+            except ProviderUnavailableError as e:
+                logging.warning(f"Skipping unavailable provider: {e}")
+    provider_grades = [
+        sum(criterion["grade"] for criterion in response["criteria"])
+        for response in individual_responses
+    ]
 
     return individual_responses, provider_grades
 
 
+def run_evaluation(
+    llm: BaseLLM,
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    prompt_template: str,
+    iteration: int = 1,
+    chunked: bool = False,
+) -> dict[str, Any]:
+    """
+    Run a single evaluation of a submission with one LLM.
+
+    Args:
+        llm (BaseLLM): The LLM provider.
+        submission (str): The student submission text.
+        rubric (Dict[str, Any]): The grading rubric.
+        prompt_template (str): Custom prompt template for LLMs.
+        iteration (int): The repeat number this evaluation represents.
+        chunked (bool): Whether to grade the submission section by section when it
+            exceeds the model's context window.
+
+    Returns:
+        Dict[str, Any]: The parsed individual response.
+    """
+    check_deadline()
+    max_tokens = _section_budget(llm, submission, rubric, prompt_template, chunked)
+    if max_tokens is not None:
+        response = map_reduce_response(
+            llm, submission, rubric, prompt_template, max_tokens
+        )
+        sections = len(split_into_chunks(submission, max_tokens))
+    else:
+        prompt = generate_prompt(rubric, submission, prompt_template)
+        response = llm.get_response(prompt)
+        sections = 1
+    return _build_evaluation(llm, response, rubric, iteration, sections)
+
+
+def _section_budget(
+    llm: BaseLLM,
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    prompt_template: str,
+    chunked: bool,
+) -> int | None:
+    """Tokens per section when a submission must be graded in sections, else None."""
+    if not chunked:
+        return None
+    max_tokens = chunk_budget(llm, rubric, prompt_template)
+    return max_tokens if estimate_tokens(submission) > max_tokens else None
+
+
+def _build_evaluation(
+    llm: BaseLLM,
+    response: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    iteration: int,
+    sections: int = 1,
+) -> dict[str, Any]:
+    """Parse one raw LLM response into an individual response."""
+    criteria, overall_feedback = parse_response(response)
+    compiled = compile_rubric(rubric)
+    for criterion in criteria:
+        # Use the rubric's spelling so responses from different LLMs aggregate.
+        criterion["name"] = compiled.lookup(criterion["name"]) or criterion["name"]
+        # Rescale grades given out of a different maximum, e.g. "4/5" for a
+        # criterion worth 10 points.
+        out_of = criterion.pop("out_of", None)
+        if out_of and criterion["name"] in compiled:
+            max_points = compiled[criterion["name"]]["max_points"]
+            if out_of != max_points:
+                criterion["grade"] = criterion["grade"] * max_points / out_of
+
+    individual_response = {
+        "criteria": criteria,
+        "overall_feedback": overall_feedback,
+        "provider_info": llm.get_model_info(),
+        "iteration": iteration,
+    }
+    if sections > 1:
+        individual_response["sections"] = sections
+    return individual_response
+
+
 def aggregate_responses(
     responses: list[dict[str, Any]],
     aggregation_method: str,
@@ -157,6 +605,10 @@ def aggregate_responses(
     """
     Aggregate responses from multiple evaluations.
 
+    Grades are weighted by the provider behind each response, so a weighted
+    average is renormalised over the providers that answered when some were
+    unavailable. Feedback is summarized by the highest-weighted of them.
+
     Args:
         responses (List[Dict[str, Any]]): List of individual responses.
         aggregation_method (str): The method to aggregate grades.
@@ -168,25 +620,75 @@ def aggregate_responses(
     Returns:
         Dict[str, Any]: Aggregated response.
     """
-    criteria_by_name: dict[str, dict[str, list]] = {}
     all_overall_feedbacks = []
     aggregated_provider_info = set()
-    best_llm = max(llms, key=lambda llm: llm.get_model_info().get("weight", 1.0))
+    best_llm = _best_llm(llms, responses)
 
     for response in responses:
         all_overall_feedbacks.append(response["overall_feedback"]["overall"])
+        provider_info_str = " ".join(
+            f"{k}: {v}" for k, v in response["provider_info"].items()
+        )
+        aggregated_provider_info.add(provider_info_str)
+
+    aggregated_criteria = aggregate_criteria(
+        responses,
+        aggregation_method,
+        llms,
+        num_repeats,
+        repeat_each_provider,
+        summarize_feedback,
+    )
+
+    aggregated_overall_feedback = " ".join(all_overall_feedbacks)
+    if summarize_feedback:
+        aggregated_overall_feedback = summarize(all_overall_feedbacks, best_llm)
+
+    return {
+        "criteria": aggregated_criteria,
+        "overall_feedback": aggregated_overall_feedback,
+        "provider_info": list(aggregated_provider_info),
+        "iteration": len(responses),
+    }
+
+
+def aggregate_criteria(
+    responses: list[dict[str, Any]],
+    aggregation_method: str,
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    summarize_feedback: bool,
+) -> list[dict[str, Any]]:
+    """
+    Aggregate the per-criterion grades and feedback of multiple evaluations.
+
+    Args:
+        responses (List[Dict[str, Any]]): List of individual responses.
+        aggregation_method (str): The method to aggregate grades.
+        llms (List[BaseLLM]): List of LLM providers.
+        num_repeats: Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+        summarize_feedback (bool): Whether to summarize feedback from all LLMs.
+
+    Returns:
+        List[Dict[str, Any]]: Aggregated name, feedback and grade for each criterion.
+    """
+    criteria_by_name: dict[str, dict[str, list]] = {}
+    best_llm = _best_llm(llms, responses)
+
+    for response in responses:
         for criterion in response["criteria"]:
             name = criterion["name"]
             feedback = criterion["feedback"]
             grade = criterion["grade"]
             if name not in criteria_by_name:
-                criteria_by_name[name] = {"feedbacks": [], "grades": []}
+                criteria_by_name[name] = {"feedbacks": [], "grades": [], "weights": []}
             criteria_by_name[name]["feedbacks"].append(feedback)
             criteria_by_name[name]["grades"].append(grade)
-        provider_info_str = " ".join(
-            f"{k}: {v}" for k, v in response["provider_info"].items()
-        )
-        aggregated_provider_info.add(provider_info_str)
+            criteria_by_name[name]["weights"].append(
+                response["provider_info"].get("weight", 1.0)
+            )
 
     aggregated_criteria = []
     for name, feedbacks_grades in criteria_by_name.items():
@@ -197,6 +699,7 @@ def aggregate_responses(
             llms,
             num_repeats,
             repeat_each_provider,
+            feedbacks_grades["weights"],
         )
         if summarize_feedback:
             aggregated_feedback = summarize(feedbacks_grades["feedbacks"], best_llm)
@@ -204,16 +707,7 @@ def aggregate_responses(
             {"name": name, "feedback": aggregated_feedback, "grade": aggregated_grade}
         )
 
-    aggregated_overall_feedback = " ".join(all_overall_feedbacks)
-    if summarize_feedback:
-        aggregated_overall_feedback = summarize(all_overall_feedbacks, best_llm)
-
-    return {
-        "criteria": aggregated_criteria,
-        "overall_feedback": aggregated_overall_feedback,
-        "provider_info": list(aggregated_provider_info),
-        "iteration": len(responses),
-    }
+    return aggregated_criteria
 
 
 def aggregate_grades(
@@ -222,6 +716,7 @@ def aggregate_grades(
     llms: list[BaseLLM],
     num_repeats: int,
     repeat_each_provider: bool,
+    weights: list[float] | None = None,
 ) -> float:
     """
     Aggregate grades based on the specified method.
@@ -232,6 +727,9 @@ def aggregate_grades(
         llms (List[BaseLLM]): List of LLM providers.
         num_repeats: Number of times to repeat the grading process.
         repeat_each_provider (bool): Whether to repeat grading for each provider.
+        weights (Optional[List[float]]): The weight of the provider behind each
+            grade. By default each provider's weight is repeated for its
+            repeats, which assumes a grade from every provider and repeat.
 
     Returns:
         float: The aggregated grade.
@@ -242,11 +740,12 @@ def aggregate_grades(
     if aggregation_method in ["simple_average", "bias_adjusted"]:
         return round((sum(grades) / len(grades)) * 2) / 2  # Round to nearest 0.5
     elif aggregation_method == "weighted_average":
-        weights = [
-            llm.get_model_info().get("weight", 1.0)
-            for llm in llms
-            for _ in range(num_repeats if repeat_each_provider else 1)
-        ]
+        if weights is None:
+            weights = [
+                llm.get_model_info().get("weight", 1.0)
+                for llm in llms
+                for _ in range(num_repeats if repeat_each_provider else 1)
+            ]
         weighted_sum = sum(
             grade * weight for grade, weight in zip(grades, weights, strict=False)
         )
@@ -258,10 +757,17 @@ def aggregate_grades(
         raise ValueError(f"Unsupported aggregation method: {aggregation_method}")
 
 
+def _best_llm(llms: list[BaseLLM], responses: list[dict[str, Any]]) -> BaseLLM:
+    """The highest-weighted provider, preferring those that answered."""
+    answered = [response["provider_info"] for response in responses]
+    candidates = [llm for llm in llms if llm.get_model_info() in answered] or llms
+    return max(candidates, key=lambda llm: llm.get_model_info().get("weight", 1.0))
+
+
 def create_result_dict(
     submission_id: str,
     submission: str,
-    rubric: dict[str, Any],
+    rubric: Mapping[str, Mapping[str, Any]],
     overall_grade: float,
     aggregated_response: dict[str, Any],
     providers_info: set,
@@ -293,7 +799,7 @@ def create_result_dict(
         "grade": round(overall_grade * 2) / 2
         if overall_grade
         else 0,  # Round to nearest 0.5
-        "out_of": sum(details["max_points"] for details in rubric.values()),
+        "out_of": compile_rubric(rubric).max_total,
         "aggregated_response": aggregated_response,
         "individual_responses": individual_responses,
     }
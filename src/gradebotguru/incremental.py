@@ -0,0 +1,357 @@
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from gradebotguru.grader import (
+    aggregate_criteria,
+    create_result_dict,
+    evaluate_submission,
+    grade_submission,
+)
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.rubric import compile_rubric, normalise_criterion
+
+
+def diff_rubrics(
+    old_rubric: Mapping[str, Mapping[str, Any]],
+    new_rubric: Mapping[str, Mapping[str, Any]],
+) -> dict[str, list[str]]:
+    """
+    Compare two rubrics criterion by criterion.
+
+    A criterion counts as changed when its description or max points differ.
+
+    Args:
+        old_rubric (Dict[str, Dict[str, Any]]): The rubric the cached results were graded with.
+        new_rubric (Dict[str, Dict[str, Any]]): The current rubric.
+
+    Returns:
+        Dict[str, List[str]]: Criterion names grouped under 'added', 'removed',
+        'changed' and 'unchanged'.
+
+    Examples:
+        >>> old = {"Content": {"description": "A", "max_points": 10},
+        ...        "Clarity": {"description": "B", "max_points": 5},
+        ...        "Grammar": {"description": "C", "max_points": 5}}
+        >>> new = {"Content": {"description": "A", "max_points": 10},
+        ...        "Clarity": {"description": "B", "max_points": 10},
+        ...        "Evidence": {"description": "D", "max_points": 5}}
+        >>> diff_rubrics(old, new)
+        {'added': ['Evidence'], 'removed': ['Grammar'], 'changed': ['Clarity'], 'unchanged': ['Content']}
+    """
+    diff: dict[str, list[str]] = {
+        "added": [],
+        "removed": [],
+        "changed": [],
+        "unchanged": [],
+    }
+    for name, details in new_rubric.items():
+        if name not in old_rubric:
+            diff["added"].append(name)
+        elif (
+            details.get("description", "") != old_rubric[name].get("description", "")
+            or details["max_points"] != old_rubric[name]["max_points"]
+        ):
+            diff["changed"].append(name)
+        else:
+            diff["unchanged"].append(name)
+    diff["removed"] = [name for name in old_rubric if name not in new_rubric]
+    return diff
+
+
+def regrade_submission(
+    previous_result: dict[str, Any],
+    rubric_diff: dict[str, list[str]],
+    submission_id: str,
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    aggregation_method: str,
+    bias_adjustments: dict[str, float] | None = None,
+    prompt_template: str = "Grade the following student submission based on the rubric provided. The rubric is as follows: \n\n {rubric}. \n\n The student submission is as follows: \n\n {submission}.",
+    summarize_feedback: bool = False,
+    chunked: bool = False,
+    repeat_strategy: str = "sequential",
+    quorum: Mapping[str, float] | None = None,
+) -> dict[str, Any]:
+    """
+    Regrade a previously graded submission after a rubric change.
+
+    Only added and changed criteria are sent to the LLMs, using a prompt scoped
+    to those criteria. Grades and feedback for unchanged criteria are reused
+    from the previous result and removed criteria are dropped.
+
+    Args:
+        previous_result (Dict[str, Any]): The result produced with the old rubric.
+        rubric_diff (Dict[str, List[str]]): Output of ``diff_rubrics``.
+        submission_id (str): The ID of the student submission.
+        submission (str): The student submission text.
+        rubric (Dict[str, Dict[str, Any]]): The current grading rubric.
+        llms (List[BaseLLM]): List of LLM providers.
+        num_repeats: Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+        aggregation_method (str): The method to aggregate grades.
+        bias_adjustments (Optional[Dict[str, float]]): Bias adjustments for specific providers.
+        prompt_template (str): Custom prompt template for LLMs.
+        summarize_feedback (bool): Whether to summarize feedback from all LLMs.
+        chunked (bool): Whether to grade over-long submissions section by section.
+        repeat_strategy (str): How repeats are requested, see ``run_evaluations``.
+        quorum (Optional[Dict[str, float]]): Quorum settings, see ``evaluate_quorum``.
+            Only used when every criterion has to be regraded, since merging
+            needs an evaluation from every provider and repeat.
+
+    Returns:
+        Dict[str, Any]: The merged grading result, with the regraded criteria listed
+        under 'regraded_criteria'.
+    """
+    to_grade = rubric_diff["added"] + rubric_diff["changed"]
+    keep = {normalise_criterion(name) for name in rubric_diff["unchanged"]}
+
+    new_responses: list[dict[str, Any]] = []
+    if to_grade:
+        scoped_rubric = compile_rubric(rubric).subset(to_grade)
+        new_responses = evaluate_submission(
+            submission,
+            scoped_rubric,
+            llms,
+            num_repeats,
+            repeat_each_provider,
+            prompt_template,
+            bias_adjustments,
+            chunked,
+            repeat_strategy,
+        )
+        if len(new_responses) != len(previous_result["individual_responses"]):
+            logging.warning(
+                f"Provider setup changed since {submission_id} was graded; "
+                "regrading all criteria."
+            )
+            return grade_submission(
+                submission_id,
+                submission,
+                rubric,
+                llms,
+                num_repeats,
+                repeat_each_provider,
+                aggregation_method,
+                bias_adjustments,
+                prompt_template,
+                summarize_feedback,
+                chunked,
+                repeat_strategy,
+                quorum,
+            )
+
+    individual_responses = []
+    for index, previous in enumerate(previous_result["individual_responses"]):
+        merged = dict(previous)
+        merged["criteria"] = [
+            criterion
+            for criterion in previous["criteria"]
+            if normalise_criterion(criterion.get("name", "")) in keep
+        ]
+        if new_responses:
+            merged["criteria"] += new_responses[index]["criteria"]
+        individual_responses.append(merged)
+
+    previous_aggregated = previous_result["aggregated_response"]
+    aggregated_criteria = [
+        criterion
+        for criterion in previous_aggregated["criteria"]
+        if normalise_criterion(criterion["name"]) in keep
+    ]
+    if new_responses:
+        aggregated_criteria += aggregate_criteria(
+            new_responses,
+            aggregation_method,
+            llms,
+            num_repeats,
+            repeat_each_provider,
+            summarize_feedback,
+        )
+    order = {
+        normalise_criterion(name): position for position, name in enumerate(rubric)
+    }
+    aggregated_criteria.sort(
+        key=lambda c: order.get(normalise_criterion(c["name"]), len(order))
+    )
+
+    aggregated_response = dict(previous_aggregated)
+    aggregated_response["criteria"] = aggregated_criteria
+    overall_grade = sum(criterion["grade"] for criterion in aggregated_criteria)
+
+    result = create_result_dict(
+        submission_id,
+        submission,
+        rubric,
+        overall_grade,
+        aggregated_response,
+        set(previous_aggregated["provider_info"]),
+        individual_responses,
+    )
+    result["regraded_criteria"] = to_grade
+    return result
+
+
+def load_results(path: str) -> dict[str, Any]:
+    """
+    Load a results file written by ``save_results``.
+
+    Args:
+        path (str): Path to the results file.
+
+    Returns:
+        Dict[str, Any]: The stored rubric under 'rubric', results keyed by
+        submission ID under 'results' and the content/config hashes of each
+        graded file under 'manifest'. All are empty if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return {"rubric": {}, "results": {}, "manifest": {}}
+    with open(path, encoding="utf-8") as file:
+        data: dict[str, Any] = json.load(file)
+    data.setdefault("manifest", {})
+    return data
+
+
+def save_results(
+    path: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    results: dict[str, dict[str, Any]],
+    manifest: dict[str, dict[str, str]] | None = None,
+    shard: dict[str, Any] | None = None,
+) -> None:
+    """
+    Save grading results together with the rubric they were graded against.
+
+    The file is written atomically so an interrupted run never leaves a
+    truncated cache behind.
+
+    Args:
+        path (str): Path to the results file.
+        rubric (Dict[str, Dict[str, Any]]): The rubric used for grading.
+        results (Dict[str, Dict[str, Any]]): Results keyed by submission ID.
+        manifest (Optional[Dict[str, Dict[str, str]]]): Content and config hash of
+            each graded file, keyed by submission ID.
+        shard (Optional[Dict[str, Any]]): For a sharded run, the shard 'index' and
+            'count' and the 'files' found in the shard.
+    """
+    data: dict[str, Any] = {
+        "rubric": compile_rubric(rubric).to_dict(),
+        "results": results,
+        "manifest": manifest or {},
+    }
+    if shard is not None:
+        data["shard"] = shard
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+    os.replace(temp_path, path)
+
+
+def file_hash(file_path: str) -> str:
+    """
+    Compute the SHA-256 hash of a file's raw bytes.
+
+    Hashing the raw file is much cheaper than extracting its text, so unchanged
+    PDFs and DOCX files never need to be parsed again.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_hash(config: dict[str, Any]) -> str:
+    """
+    Hash the configuration settings that affect grading results.
+
+    API keys are left out so rotating a key does not invalidate cached results,
+    and the rubric is left out because rubric changes are handled criterion by
+    criterion by ``regrade_submission``.
+
+    Args:
+        config (Dict[str, Any]): The loaded configuration.
+
+    Returns:
+        str: The hexadecimal digest.
+
+    Examples:
+        >>> a = config_hash({"number_of_repeats": 1, "llm_providers": [{"api_key": "x"}]})
+        >>> b = config_hash({"number_of_repeats": 1, "llm_providers": [{"api_key": "y"}]})
+        >>> a == b
+        True
+    """
+    relevant = {
+        key: config.get(key)
+        for key in (
+            "number_of_repeats",
+            "repeat_each_provider",
+            "aggregation_method",
+            "bias_adjustments",
+            "llm_prompt_template",
+            "summarize_feedback",
+            "chunked_grading",
+            "extraction_limits",
+            "extraction_backends",
+            "triage",
+            "quorum",
+        )
+    }
+    relevant["llm_providers"] = [
+        {k: v for k, v in provider.items() if k != "api_key"}
+        for provider in config.get("llm_providers", [])
+    ]
+    encoded = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def plan_directory(
+    directory: str,
+    previous: dict[str, Any],
+    current_config_hash: str,
+    include: Callable[[str], bool] | None = None,
+) -> tuple[list[str], list[str], dict[str, dict[str, str]]]:
+    """
+    Work out which files in a submissions directory need grading.
+
+    A file is reused when its content hash and the config hash both match the
+    manifest entry from the previous run; otherwise it is graded.
+
+    Args:
+        directory (str): The path to the directory containing submission files.
+        previous (Dict[str, Any]): The data returned by ``load_results``.
+        current_config_hash (str): Output of ``config_hash`` for this run.
+        include (Optional[Callable[[str], bool]]): Only files it accepts are
+            hashed and planned, e.g. the files of one shard.
+
+    Returns:
+        Tuple[List[str], List[str], Dict[str, Dict[str, str]]]: Files to grade,
+        files whose previous result can be reused, and the manifest for this run.
+    """
+    to_grade, reused = [], []
+    manifest: dict[str, dict[str, str]] = {}
+    for filename in sorted(os.listdir(directory)):
+        file_path = os.path.join(directory, filename)
+        if not os.path.isfile(file_path) or (
+            include is not None and not include(filename)
+        ):
+            continue
+        entry = {"content_hash": file_hash(file_path), "config_hash": current_config_hash}
+        manifest[filename] = entry
+        if previous["manifest"].get(filename) == entry and filename in previous["results"]:
+            reused.append(filename)
+        else:
+            to_grade.append(filename)
+    return to_grade, reused, manifest
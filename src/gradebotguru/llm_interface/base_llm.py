@@ -1,8 +1,37 @@
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Any
 
+from gradebotguru.deadline import propagate_deadline
+
 
 class BaseLLM(ABC):
+    @property
+    def last_usage(self) -> dict[str, int] | None:
+        """
+        Token usage of the most recent request made from the calling thread.
+
+        Set by providers that report it, e.g.
+        {"prompt_tokens": 812, "completion_tokens": 164}. It is kept per
+        thread, so concurrent requests to one provider each read their own.
+        """
+        return getattr(self._usage(), "value", None)
+
+    @last_usage.setter
+    def last_usage(self, usage: dict[str, int] | None) -> None:
+        self._usage().value = usage
+
+    def _usage(self) -> threading.local:
+        """The per-thread storage behind ``last_usage``, created on first use."""
+        # Read through __dict__ so wrappers do not forward it to the wrapped LLM.
+        usage: threading.local = self.__dict__.setdefault(
+            "_last_usage", threading.local()
+        )
+        return usage
+
     @abstractmethod
     def get_response(self, prompt: str) -> str:
         """
@@ -16,6 +45,28 @@ class BaseLLM(ABC):
         """
         pass
 
+    def get_responses(self, prompt: str, n: int) -> list[str]:
+        """
+        Get several independent responses to the same prompt.
+
+        Providers that can return several samples from one request override
+        this. By default the prompt is sent ``n`` times concurrently.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+            n (int): The number of responses.
+
+        Returns:
+            List[str]: The responses. Providers that override this return only
+            the samples they received, so there may be fewer than ``n``.
+        """
+        if n == 1:
+            return [self.get_response(prompt)]
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            return list(
+                executor.map(propagate_deadline(self.get_response), [prompt] * n)
+            )
+
     @abstractmethod
     def generate_text(self, prompt: str, **kwargs: dict[str, Any]) -> str:
         """
@@ -30,6 +81,29 @@ class BaseLLM(ABC):
         """
         pass
 
+    @contextmanager
+    def keep_loaded(self, keep_alive: float | str) -> Iterator[None]:
+        """
+        Keep the model loaded on its server between requests made in the block.
+
+        Providers that load models on demand override this; wrappers of
+        other providers forward it. Does nothing by default.
+
+        Args:
+            keep_alive (float | str): How long the model stays loaded after each
+                request, e.g. "30m".
+        """
+        yield
+
+    def unload(self) -> None:
+        """
+        Unload the model from its server now, freeing its memory for another model.
+
+        Providers that load models on demand override this; wrappers of
+        other providers forward it. Does nothing by default.
+        """
+        return None
+
     @abstractmethod
     def get_model_info(self) -> dict[str, Any]:
         """
@@ -0,0 +1,242 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from gradebotguru.deadline import DeadlineExceeded
+from gradebotguru.llm_interface.base_llm import BaseLLM
+
+T = TypeVar("T")
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Raised when an LLM provider is shed by its circuit breaker or its call fails."""
+
+
+class ProviderHealth:
+    """
+    Rolling error rate and latency of a provider's most recent calls.
+
+    Args:
+        window (int): Calls kept.
+
+    Examples:
+        >>> health = ProviderHealth(window=4)
+        >>> for ok in (True, False, True, True, False):
+        ...     health.record(ok, 0.5)
+        >>> health.error_rate()
+        0.5
+    """
+
+    def __init__(self, window: int = 20) -> None:
+        self._calls: deque[tuple[bool, float]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def record(self, ok: bool, seconds: float) -> None:
+        """Add the outcome and latency of a call."""
+        self._calls.append((ok, seconds))
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+
+    def error_rate(self) -> float:
+        """Share of the recent calls that failed, or 0.0 before any call."""
+        if not self._calls:
+            return 0.0
+        return sum(not ok for ok, _ in self._calls) / len(self._calls)
+
+    def mean_latency(self) -> float | None:
+        """Mean latency in seconds of the recent successful calls, if any."""
+        latencies = [seconds for ok, seconds in self._calls if ok]
+        return sum(latencies) / len(latencies) if latencies else None
+
+
+class CircuitBreakerLLM(BaseLLM):
+    """
+    Track a provider's health and stop calling it while it is failing.
+
+    The breaker starts closed and every call goes through. It opens after
+    ``failure_threshold`` consecutive failures, or once at least
+    ``min_calls`` recent calls have an error rate of ``max_error_rate`` or
+    more. While open, calls fail immediately with
+    ``ProviderUnavailableError`` instead of waiting for a server that is
+    down. After ``cooldown`` seconds one trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+
+    Failed calls, including empty responses (how ``OpenAILLM`` reports API
+    errors), are raised as ``ProviderUnavailableError`` so that grading can
+    carry on with the providers that answered.
+
+    Args:
+        llm (BaseLLM): The provider to protect.
+        failure_threshold (int): Consecutive failures that open the breaker.
+        max_error_rate (float): Rolling error rate that opens the breaker.
+        min_calls (int): Calls needed before the error rate is considered.
+        cooldown (float): Seconds to shed the provider before a trial call.
+        window (int): Recent calls kept for the error rate and latency.
+
+    Attributes:
+        health (ProviderHealth): The provider's recent calls.
+        state (str): "closed", "open" or "half_open".
+    """
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        failure_threshold: int = 3,
+        max_error_rate: float = 0.5,
+        min_calls: int = 5,
+        cooldown: float = 30.0,
+        window: int = 20,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.health = ProviderHealth(window)
+        self.state = "closed"
+        self.shed_calls = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        # Set last: from here on, new attributes the provider has are set on it.
+        self.llm = llm
+
+    def __getattr__(self, name: str) -> Any:
+        # Settings such as context_length are read from the wrapped provider.
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Settings the wrapped provider has, such as keep_alive, are changed there.
+        if (
+            "llm" in self.__dict__
+            and name not in self.__dict__
+            and not hasattr(type(self), name)
+            and hasattr(self.llm, name)
+        ):
+            setattr(self.llm, name, value)
+        else:
+            super().__setattr__(name, value)
+
+    def get_response(self, prompt: str) -> str:
+        """
+        Get a response from the wrapped provider unless its breaker is open.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+
+        Returns:
+            str: The response.
+
+        Raises:
+            ProviderUnavailableError: If the provider is shed or the call fails.
+        """
+        return self._call(self.llm.get_response, prompt)
+
+    def generate_text(self, prompt: str, **kwargs: dict[str, Any]) -> str:
+        """Generate text with the wrapped provider unless its breaker is open."""
+        return self._call(lambda text: self.llm.generate_text(text, **kwargs), prompt)
+
+    def get_responses(self, prompt: str, n: int) -> list[str]:
+        """Get several responses from the wrapped provider, as one call."""
+        return self._call(lambda text: self.llm.get_responses(text, n), prompt)
+
+    @contextmanager
+    def keep_loaded(self, keep_alive: float | str) -> Iterator[None]:
+        """Keep the wrapped provider's model loaded."""
+        with self.llm.keep_loaded(keep_alive):
+            yield
+
+    def unload(self) -> None:
+        """Unload the wrapped provider's model."""
+        self.llm.unload()
+
+    def get_model_info(self) -> dict[str, Any]:
+        """Get the wrapped provider's model information."""
+        return self.llm.get_model_info()
+
+    def _call(self, call: Callable[[str], T], prompt: str) -> T:
+        """Make a call through the breaker, recording its outcome."""
+        name = self.llm.get_model_info().get("model_name", "provider")
+        with self._lock:
+            if self.state == "open" and self._cooled_down():
+                self.state = "half_open"
+            elif self.state != "closed":
+                # Open, or half-open with its trial call still running.
+                self.shed_calls += 1
+                raise ProviderUnavailableError(f"{name} is unavailable (circuit open)")
+
+        started = time.perf_counter()
+        try:
+            result = call(prompt)
+            self.last_usage = self.llm.last_usage
+        except DeadlineExceeded:
+            # The grading ran out of time; that says nothing about the provider.
+            with self._lock:
+                if self.state == "half_open":
+                    self.state = "open"
+            raise
+        except Exception as e:
+            self._record(False, time.perf_counter() - started, name)
+            raise ProviderUnavailableError(f"{name} failed: {e}") from e
+        ok = any(result) if isinstance(result, list) else bool(result)
+        self._record(ok, time.perf_counter() - started, name)
+        if not ok:
+            raise ProviderUnavailableError(f"{name} returned an empty response")
+        return result
+
+    def _record(self, ok: bool, seconds: float, name: str) -> None:
+        """Update the health and move the breaker between states."""
+        with self._lock:
+            self.health.record(ok, seconds)
+            if ok:
+                if self.state != "closed":
+                    logging.info(f"{name} is answering again; closing its circuit.")
+                self.state = "closed"
+                return
+            failing = self.health.consecutive_failures >= self.failure_threshold or (
+                len(self.health) >= self.min_calls
+                and self.health.error_rate() >= self.max_error_rate
+            )
+            if self.state == "half_open" or (self.state == "closed" and failing):
+                logging.warning(
+                    f"Shedding {name} for {self.cooldown:.0f}s after failures "
+                    f"(error rate {self.health.error_rate():.0%})."
+                )
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def _cooled_down(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.cooldown
+
+
+def format_health_report(llms: list[BaseLLM]) -> str | None:
+    """
+    Summarise the health of a run's providers.
+
+    Args:
+        llms (List[BaseLLM]): The run's LLM providers, possibly wrapped again,
+            e.g. by ``ReplayLLM``.
+
+    Returns:
+        Optional[str]: One line per provider with a circuit breaker, or None if
+        there are none.
+    """
+    lines = []
+    for llm in llms:
+        health = getattr(llm, "health", None)
+        if not isinstance(health, ProviderHealth):
+            continue
+        latency = health.mean_latency()
+        lines.append(
+            f"{llm.get_model_info().get('model_name', 'provider')}: "
+            f"{getattr(llm, 'state', 'closed')}, error rate {health.error_rate():.0%}, "
+            f"mean latency {'n/a' if latency is None else f'{latency:.2f}s'}, "
+            f"{getattr(llm, 'shed_calls', 0)} calls shed"
+        )
+    return "Provider health:\n" + "\n".join(lines) if lines else None
@@ -2,16 +2,31 @@
 from typing import Any
 
 from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.llm_interface.circuit_breaker import CircuitBreakerLLM
+from gradebotguru.llm_interface.hedged_llm import HedgeBudget, HedgedLLM, LatencyTracker
 from gradebotguru.llm_interface.local_llm import OllamaLLM
 from gradebotguru.llm_interface.openai_llm import OpenAILLM
+from gradebotguru.llm_interface.replay_llm import Cassette, ReplayLLM
 
+# The setting 'hedge_urls' replaces to reach an equivalent endpoint.
+_URL_KEYS = {"openai": "base_url", "ollama": "server_url"}
 
-def create_llms(config: dict[str, Any]) -> list[BaseLLM]:
+
+def create_llms(
+    config: dict[str, Any],
+    *,
+    budget: HedgeBudget | None = None,
+    cassette: Cassette | None = None,
+) -> list[BaseLLM]:
     """
     Factory function to create a list of LLM instances based on the provided configuration.
 
     Args:
         config (Dict[str, Any]): Configuration dictionary containing LLM settings.
+        budget (Optional[HedgeBudget]): Hedging budget to share with providers
+            created earlier in the run, instead of a new one.
+        cassette (Optional[Cassette]): Replay cassette to share with providers
+            created earlier in the run, instead of opening it again.
 
     Returns:
         List[BaseLLM]: A list of LLM instances.
@@ -19,24 +34,109 @@ def create_llms(config: dict[str, Any]) -> list[BaseLLM]:
     Raises:
         ValueError: If an unsupported LLM provider is specified.
     """
-    llms: list[BaseLLM] = []
-    for provider_config in config["llm_providers"]:
-        provider = provider_config.get("provider", "openai")
-        if provider == "openai":
-            api_key = provider_config.get("api_key")
-            if not api_key:
-                raise ValueError("API key is required for OpenAI provider")
-            model = provider_config.get("model", "chatgpt-3.5-turbo")
-            temperature = provider_config.get("temperature", 0.7)
-            weight = provider_config.get("weight", 1.0)
-            llms.append(OpenAILLM(api_key, model, temperature, weight))
-        elif provider == "ollama":
-            api_key = provider_config.get("api_key", "ollama")  # required, but unused
-            server_url = provider_config.get("server_url", "http://localhost:11434/v1")
-            model = provider_config.get("model", "llama3")
-            weight = provider_config.get("weight", 1.0)
-            llms.append(OllamaLLM(api_key, server_url, model, weight))
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}")
+    llms = [_create_llm(provider_config) for provider_config in config["llm_providers"]]
+
+    hedging = config.get("hedging")
+    if hedging is not None:
+        # One budget caps the duplicate requests of the whole run.
+        if budget is None:
+            budget = HedgeBudget(hedging.get("max_extra_requests", 100))
+        hedged: list[BaseLLM] = []
+        for llm, provider_config in zip(llms, config["llm_providers"], strict=True):
+            # Duplicates go to the equivalent endpoints in 'hedge_urls', if any.
+            url_key = _URL_KEYS[provider_config.get("provider", "openai")]
+            alternates = [
+                _create_llm({**provider_config, url_key: url})
+                for url in provider_config.get("hedge_urls", [])
+            ]
+            tracker = LatencyTracker(
+                hedging.get("percentile", 95), hedging.get("min_samples", 20)
+            )
+            hedged.append(HedgedLLM(llm, budget, alternates, tracker))
+        llms = hedged
+
+    breaker = config.get("circuit_breaker")
+    if breaker is not None:
+        # Shed providers that keep failing instead of waiting on them.
+        llms = [
+            CircuitBreakerLLM(
+                llm,
+                failure_threshold=breaker.get("failure_threshold", 3),
+                max_error_rate=breaker.get("max_error_rate", 0.5),
+                min_calls=breaker.get("min_calls", 5),
+                cooldown=breaker.get("cooldown", 30.0),
+                window=breaker.get("window", 20),
+            )
+            for llm in llms
+        ]
+
+    replay = config.get("replay")
+    if replay:
+        # Record every provider's calls to one cassette, or replay them from it.
+        if cassette is None:
+            cassette = Cassette(replay["cassette"], replay.get("mode", "replay"))
+        latency = replay.get("latency", False)
+        llms = [ReplayLLM(llm, cassette, latency) for llm in llms]
 
     return llms
+
+
+def _create_llm(provider_config: dict[str, Any]) -> BaseLLM:
+    """
+    Create one LLM instance from its provider settings.
+
+    Args:
+        provider_config (Dict[str, Any]): One entry of 'llm_providers'.
+
+    Returns:
+        BaseLLM: The LLM instance.
+
+    Raises:
+        ValueError: If an unsupported LLM provider is specified.
+    """
+    llm: BaseLLM
+    provider = provider_config.get("provider", "openai")
+    if provider == "openai":
+        api_key = provider_config.get("api_key")
+        if not api_key:
+            raise ValueError("API key is required for OpenAI provider")
+        model = provider_config.get("model", "chatgpt-3.5-turbo")
+        temperature = provider_config.get("temperature", 0.7)
+        weight = provider_config.get("weight", 1.0)
+        base_url = provider_config.get("base_url")
+        llm = OpenAILLM(
+            api_key,
+            model,
+            temperature,
+            weight,
+            base_url,
+            provider_config.get("connect_timeout"),
+            provider_config.get("read_timeout"),
+            provider_config.get("max_retries", 2),
+            _context_length(provider_config),
+        )
+    elif provider == "ollama":
+        api_key = provider_config.get("api_key", "ollama")  # required, but unused
+        server_url = provider_config.get("server_url", "http://localhost:11434/v1")
+        model = provider_config.get("model", "llama3")
+        weight = provider_config.get("weight", 1.0)
+        keep_alive = provider_config.get("keep_alive")
+        llm = OllamaLLM(
+            api_key,
+            server_url,
+            model,
+            weight,
+            keep_alive,
+            provider_config.get("connect_timeout"),
+            provider_config.get("read_timeout"),
+            _context_length(provider_config),
+        )
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    return llm
+
+
+def _context_length(provider_config: dict[str, Any]) -> int | None:
+    """The configured context window, read by chunking to size sections."""
+    value = provider_config.get("context_length")
+    return None if value is None else int(value)
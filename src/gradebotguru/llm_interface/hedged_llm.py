@@ -0,0 +1,368 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any
+
+# Imported as a module: chunking imports this package in turn.
+from gradebotguru import chunking
+from gradebotguru.deadline import propagate_deadline
+from gradebotguru.llm_interface.base_llm import BaseLLM
+
+# Worker threads per hedged provider, for original requests and duplicates.
+MAX_CONCURRENT_REQUESTS = 64
+
+
+class LatencyTracker:
+    """
+    Rolling record of a provider's request latencies.
+
+    Args:
+        percentile (float): The percentile that triggers a hedge, from 0 to 100.
+        min_samples (int): Requests to observe before hedging starts.
+        window (int): Most recent latencies kept.
+
+    Examples:
+        >>> tracker = LatencyTracker(percentile=50, min_samples=2)
+        >>> tracker.threshold() is None
+        True
+        >>> for seconds in (1.0, 2.0, 3.0):
+        ...     tracker.record(seconds)
+        >>> tracker.threshold()
+        2.0
+    """
+
+    def __init__(
+        self, percentile: float = 95, min_samples: int = 20, window: int = 200
+    ) -> None:
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a completed request."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def threshold(self) -> float | None:
+        """
+        The observed latency percentile, by nearest rank.
+
+        Returns:
+            Optional[float]: Seconds to wait before hedging, or None while fewer
+            than ``min_samples`` requests have completed.
+        """
+        with self._lock:
+            if len(self._latencies) < max(self.min_samples, 1):
+                return None
+            ordered = sorted(self._latencies)
+        rank = max(math.ceil(self.percentile / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+
+class HedgeBudget:
+    """
+    The per-run cap on hedge requests, shared by every ``HedgedLLM`` of a run.
+
+    Args:
+        max_extra_requests (int): Duplicate requests allowed in the run.
+
+    Attributes:
+        stats (Dict[str, float]): Run report: 'requests' (calls made through
+            the wrappers), 'hedged' (duplicates sent), 'hedge_wins' (calls
+            answered by the duplicate first), 'budget_exhausted' (calls that
+            were slow enough to hedge after the cap was reached),
+            'extra_prompt_tokens' and 'extra_completion_tokens' (estimated
+            tokens spent on duplicates) and 'seconds_saved' (time the winning
+            duplicate beat its original by, once the original finished).
+    """
+
+    def __init__(self, max_extra_requests: int = 100) -> None:
+        self.max_extra_requests = max_extra_requests
+        self.stats: dict[str, float] = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_exhausted": 0,
+            "extra_prompt_tokens": 0,
+            "extra_completion_tokens": 0,
+            "seconds_saved": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """
+        Take one extra request from the budget.
+
+        Returns:
+            bool: False, and the call is counted as unhedged, if the cap is reached.
+        """
+        with self._lock:
+            if self.stats["hedged"] >= self.max_extra_requests:
+                self.stats["budget_exhausted"] += 1
+                return False
+            self.stats["hedged"] += 1
+            return True
+
+    def count(self, key: str, amount: float = 1) -> None:
+        """Add to one of the run's counters."""
+        with self._lock:
+            self.stats[key] += amount
+
+
+class HedgedLLM(BaseLLM):
+    """
+    Send a duplicate of a slow request and use whichever response arrives first.
+
+    Aggregation waits for every provider and repeat, so one slow completion
+    holds up a whole submission. Once a request has taken longer than the
+    provider's observed latency percentile (p95 by default), the same prompt
+    is sent again, to the next of the equivalent ``alternates`` (e.g. another
+    Ollama server hosting the same model) or to the provider itself, and the
+    first usable response wins. The slower request is left to finish in the
+    background; its latency still feeds the percentile.
+
+    Only ``get_response`` is hedged. Feedback summaries and batched repeats
+    go straight to the provider.
+
+    Args:
+        llm (BaseLLM): The provider whose requests to hedge.
+        budget (HedgeBudget): The run's cap on duplicate requests.
+        alternates (Optional[List[BaseLLM]]): Equivalent providers to send
+            duplicates to, in turn. Default is the provider itself.
+        tracker (Optional[LatencyTracker]): The provider's latencies.
+    """
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        budget: HedgeBudget,
+        alternates: list[BaseLLM] | None = None,
+        tracker: LatencyTracker | None = None,
+    ) -> None:
+        self.budget = budget
+        self.alternates = alternates or [llm]
+        self.tracker = tracker or LatencyTracker()
+        self._next_alternate = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="hedge"
+        )
+        # Set last: from here on, new attributes the provider has are set on it.
+        self.llm = llm
+
+    def __getattr__(self, name: str) -> Any:
+        # Settings such as context_length are read from the wrapped provider.
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Settings the wrapped provider has, such as keep_alive, are changed there.
+        if (
+            "llm" in self.__dict__
+            and name not in self.__dict__
+            and not hasattr(type(self), name)
+            and hasattr(self.llm, name)
+        ):
+            setattr(self.llm, name, value)
+        else:
+            super().__setattr__(name, value)
+
+    def get_response(self, prompt: str) -> str:
+        """
+        Get a response, hedging the request if it is slower than usual.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+
+        Returns:
+            str: The first usable response.
+
+        Raises:
+            Exception: The original request's error, if no request succeeded.
+        """
+        self.budget.count("requests")
+        threshold = self.tracker.threshold()
+        primary = self._submit(self.llm, prompt)
+        if threshold is None:
+            return self._result(primary)
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self.budget.acquire():
+            return self._result(primary)
+
+        target = self._alternate()
+        logging.debug(
+            f"Hedging a request to {self.llm.get_model_info().get('model_name')} "
+            f"after {threshold:.2f}s."
+        )
+        self.budget.count("extra_prompt_tokens", chunking.estimate_tokens(prompt))
+        hedge = self._submit(target, prompt)
+        pending = {primary, hedge}
+        winner: Future[tuple[str, dict[str, int] | None]] | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            usable = [future for future in done if _usable(future)]
+            if usable:
+                # Prefer the original when both finished together.
+                winner = primary if primary in usable else usable[0]
+                break
+        if winner is None:
+            return self._result(primary)
+
+        response = self._result(winner)
+        # Only the response not used is extra; it is counted when it arrives.
+        (hedge if winner is primary else primary).add_done_callback(
+            self._count_extra_completion
+        )
+        if winner is hedge:
+            self.budget.count("hedge_wins")
+            won_at = time.perf_counter()
+            primary.add_done_callback(
+                lambda _: self.budget.count(
+                    "seconds_saved", time.perf_counter() - won_at
+                )
+            )
+        return response
+
+    def generate_text(self, prompt: str, **kwargs: dict[str, Any]) -> str:
+        """Generate text with the wrapped provider, without hedging."""
+        text = self.llm.generate_text(prompt, **kwargs)
+        self.last_usage = self.llm.last_usage
+        return text
+
+    def get_responses(self, prompt: str, n: int) -> list[str]:
+        """Get several responses from the wrapped provider, without hedging."""
+        responses = self.llm.get_responses(prompt, n)
+        self.last_usage = self.llm.last_usage
+        return responses
+
+    @contextmanager
+    def keep_loaded(self, keep_alive: float | str) -> Iterator[None]:
+        """Keep the wrapped provider's model loaded."""
+        with self.llm.keep_loaded(keep_alive):
+            yield
+
+    def unload(self) -> None:
+        """Unload the wrapped provider's model."""
+        self.llm.unload()
+
+    def get_model_info(self) -> dict[str, Any]:
+        """Get the wrapped provider's model information."""
+        return self.llm.get_model_info()
+
+    def close(self) -> None:
+        """Stop the request threads, cancelling requests not yet started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _alternate(self) -> BaseLLM:
+        """The next equivalent provider to send a duplicate to."""
+        with self._lock:
+            target = self.alternates[self._next_alternate % len(self.alternates)]
+            self._next_alternate += 1
+        return target
+
+    def _submit(
+        self, llm: BaseLLM, prompt: str
+    ) -> "Future[tuple[str, dict[str, int] | None]]":
+        """Start a request in the background, recording its latency when it succeeds."""
+        return self._executor.submit(propagate_deadline(self._timed), llm, prompt)
+
+    def _timed(self, llm: BaseLLM, prompt: str) -> tuple[str, dict[str, int] | None]:
+        started = time.perf_counter()
+        response = llm.get_response(prompt)
+        self.tracker.record(time.perf_counter() - started)
+        # Usage is kept per thread, so it is read here, in the request's thread.
+        return response, llm.last_usage
+
+    def _count_extra_completion(
+        self, future: "Future[tuple[str, dict[str, int] | None]]"
+    ) -> None:
+        """Count the tokens of a response that was not used."""
+        if not future.cancelled() and _usable(future):
+            response = future.result()[0]
+            self.budget.count(
+                "extra_completion_tokens", chunking.estimate_tokens(response)
+            )
+
+    def _result(self, future: "Future[tuple[str, dict[str, int] | None]]") -> str:
+        """A request's response, taking its token usage as this thread's."""
+        response, self.last_usage = future.result()
+        return response
+
+
+def _usable(future: "Future[tuple[str, dict[str, int] | None]]") -> bool:
+    """Whether a finished request produced a response worth using."""
+    # OpenAILLM reports API errors as an empty response rather than raising.
+    return future.exception() is None and bool(future.result()[0])
+
+
+def find_hedge_budget(llms: list[BaseLLM]) -> HedgeBudget | None:
+    """
+    Find the hedging budget shared by a run's providers.
+
+    Args:
+        llms (List[BaseLLM]): The run's LLM providers, possibly wrapped again,
+            e.g. by ``ReplayLLM``.
+
+    Returns:
+        Optional[HedgeBudget]: The budget, or None if hedging is off.
+    """
+    for llm in llms:
+        budget = getattr(llm, "budget", None)
+        if isinstance(budget, HedgeBudget):
+            return budget
+    return None
+
+
+def close_hedged_llms(llms: list[BaseLLM]) -> None:
+    """
+    Stop the request threads of a run's hedged providers.
+
+    Args:
+        llms (List[BaseLLM]): The run's LLM providers, possibly wrapped again,
+            e.g. by ``ReplayLLM``.
+    """
+    for llm in llms:
+        if isinstance(getattr(llm, "budget", None), HedgeBudget):
+            llm.close()  # type: ignore[attr-defined]
+
+
+def format_hedging_report(budget: HedgeBudget) -> str:
+    """
+    Summarise what hedging cost and saved in a run.
+
+    Args:
+        budget (HedgeBudget): The run's hedging budget.
+
+    Returns:
+        str: A one-line report.
+
+    Examples:
+        >>> budget = HedgeBudget(max_extra_requests=10)
+        >>> budget.stats.update(requests=200, hedged=10, hedge_wins=7,
+        ...     budget_exhausted=2, extra_prompt_tokens=8000,
+        ...     extra_completion_tokens=1500, seconds_saved=21.0)
+        >>> format_hedging_report(budget)
+        'Hedging: 10 extra requests for 200 calls (5.0%), 7 answered first, 21.0s saved; ~9500 extra tokens; 2 slow calls not hedged (cap of 10 reached).'
+    """
+    stats = budget.stats
+    report = (
+        f"Hedging: {stats['hedged']:.0f} extra requests for {stats['requests']:.0f} "
+        f"calls ({100 * stats['hedged'] / (stats['requests'] or 1):.1f}%), "
+        f"{stats['hedge_wins']:.0f} answered first, "
+        f"{stats['seconds_saved']:.1f}s saved; "
+        f"~{stats['extra_prompt_tokens'] + stats['extra_completion_tokens']:.0f} "
+        f"extra tokens"
+    )
+    if stats["budget_exhausted"]:
+        report += (
+            f"; {stats['budget_exhausted']:.0f} slow calls not hedged "
+            f"(cap of {budget.max_extra_requests} reached)"
+        )
+    return report + "."
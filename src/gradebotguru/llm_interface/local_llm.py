@@ -1,9 +1,21 @@
 import logging
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
 from typing import Any
 
+import httpx
 from ollama import Client
 
+from gradebotguru.deadline import check_deadline, current_deadline
 from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.logging_config import log_response
+
+# keep_alive set by ``keep_loaded`` for the grading in progress, by provider id.
+_keep_loaded: ContextVar[Mapping[int, float | str]] = ContextVar(
+    "keep_loaded", default=MappingProxyType({})
+)
 
 
 class OllamaLLM(BaseLLM):
@@ -14,22 +26,50 @@ class OllamaLLM(BaseLLM):
         api_key (str): The API key for authentication with the Ollama server.
         server_url (str): The URL of the Ollama server.
         model (str): The model to use for generating responses.
+        keep_alive (Optional[float | str]): How long the server keeps the model loaded
+            after a request, e.g. "30m". None uses the server's default.
+        connect_timeout (Optional[float]): Seconds allowed to connect. None waits
+            indefinitely.
+        read_timeout (Optional[float]): Seconds allowed for a response. None waits
+            indefinitely.
+        context_length (Optional[int]): Context window to run the model with, sent
+            as ``num_ctx``. None uses the server's default of 2048 tokens.
 
     Attributes:
         api_key (str): The API key for authentication.
         server_url (str): The URL of the Ollama server.
         model (str): The model to use for generating responses.
+        keep_alive (Optional[float | str]): Sent with every request.
+        context_length (Optional[int]): Sent with every request as ``num_ctx``.
         client (Client): The custom client for interacting with the Ollama server.
     """
 
     def __init__(
-        self, api_key: str, server_url: str, model: str = "llama3", weight: float = 1.0
+        self,
+        api_key: str,
+        server_url: str,
+        model: str = "llama3",
+        weight: float = 1.0,
+        keep_alive: float | str | None = None,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        context_length: int | None = None,
     ) -> None:
         self.api_key = api_key
         self.server_url = server_url
         self.model = model
         self.weight = weight
-        self.client = Client(host=server_url)
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.context_length = context_length
+        if connect_timeout is None and read_timeout is None:
+            self.client = Client(host=server_url)
+        else:
+            self.client = Client(
+                host=server_url,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            )
 
     def generate_text(self, prompt: str, **kwargs: dict[str, Any]) -> str:
         """
@@ -43,7 +83,43 @@ class OllamaLLM(BaseLLM):
             str: The generated text response.
         """
         messages = [{"role": "user", "content": prompt}]
-        response = self.client.chat(model=self.model, messages=messages)
+        keep_alive = _keep_loaded.get().get(id(self), self.keep_alive)
+        # Without num_ctx the server truncates prompts to its default window.
+        options = (
+            None if self.context_length is None else {"num_ctx": self.context_length}
+        )
+        deadline = current_deadline()
+        try:
+            if deadline is None:
+                response = self.client.chat(
+                    model=self.model,
+                    messages=messages,
+                    keep_alive=keep_alive,
+                    options=options,
+                )
+            else:
+                # The Ollama client takes timeouts per client, not per request, so
+                # a short-lived one is sized to the time left before the deadline.
+                timeout = deadline.timeout(self.read_timeout)
+                connect = min(self.connect_timeout or timeout, timeout)
+                with Client(
+                    host=self.server_url,
+                    timeout=httpx.Timeout(timeout, connect=connect),
+                ) as client:
+                    response = client.chat(
+                        model=self.model,
+                        messages=messages,
+                        keep_alive=keep_alive,
+                        options=options,
+                    )
+        except httpx.TimeoutException:
+            # Running out of time is reported as such, not as a server failure.
+            check_deadline()
+            raise
+        self.last_usage = {
+            "prompt_tokens": getattr(response, "prompt_eval_count", None) or 0,
+            "completion_tokens": getattr(response, "eval_count", None) or 0,
+        }
 
         # Handle the response structure properly - Ollama returns a ChatResponse object
         if hasattr(response, "message") and hasattr(response.message, "content"):
@@ -64,12 +140,37 @@ class OllamaLLM(BaseLLM):
         """
         try:
             response = self.generate_text(prompt, **kwargs)
-            logging.debug(f"Response from Ollama: {response}")
+            log_response("Ollama", response)
             return response
         except Exception as e:
             logging.error(f"Error getting response from Ollama: {e}")
             raise
 
+    @contextmanager
+    def keep_loaded(self, keep_alive: float | str) -> Iterator[None]:
+        """
+        Send ``keep_alive`` with requests made in the block.
+
+        The setting applies to the current context only, which
+        ``propagate_deadline`` carries into worker threads, so concurrent
+        grading elsewhere keeps the provider's own ``keep_alive``.
+
+        Args:
+            keep_alive (float | str): How long the model stays loaded after each
+                request, e.g. "30m".
+        """
+        token = _keep_loaded.set({**_keep_loaded.get(), id(self): keep_alive})
+        try:
+            yield
+        finally:
+            _keep_loaded.reset(token)
+
+    def unload(self) -> None:
+        """
+        Ask the server to unload the model now, freeing its memory for another model.
+        """
+        self.client.generate(model=self.model, keep_alive=0)
+
     def get_model_info(self) -> dict[str, Any]:
         """
         Get information about the Ollama LLM model.
@@ -1,9 +1,14 @@
 import logging
-from typing import Any
+import time
+from typing import Any, cast
 
+import openai
 from openai import OpenAI
+from openai.types.chat import ChatCompletion
 
+from gradebotguru.deadline import DeadlineExceeded, check_deadline, current_deadline
 from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.logging_config import log_response
 
 
 class OpenAILLM(BaseLLM):
@@ -13,6 +18,11 @@ class OpenAILLM(BaseLLM):
         model: str = "gpt-3.5-turbo-0125",
         temperature: float = 0.7,
         weight: float = 1.0,
+        base_url: str | None = None,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        max_retries: int = 2,
+        context_length: int | None = None,
     ):
         """
         Initialize the OpenAILLM class with the provided API key and model.
@@ -20,12 +30,36 @@ class OpenAILLM(BaseLLM):
         Args:
             api_key (str): The API key for accessing the OpenAI API.
             model (str): The model to use for generating text. Default is "gpt-3.5-turbo-0125".
+            base_url (Optional[str]): URL of an OpenAI-compatible API to use instead of
+                OpenAI's, e.g. a local test server. Default is None.
+            connect_timeout (Optional[float]): Seconds allowed to connect. Default is
+                the OpenAI client's.
+            read_timeout (Optional[float]): Seconds allowed for a response. Default is
+                the OpenAI client's.
+            max_retries (int): Retries of failed or timed-out requests. Default is 2.
+            context_length (Optional[int]): The model's context window in tokens.
+                Default is None, looked up from the model name.
         """
         self.api_key = api_key
         self.model = model
         self.weight = weight
         self.temperature = temperature
-        self.client = OpenAI(api_key=self.api_key)
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.context_length = context_length
+        if connect_timeout is None and read_timeout is None:
+            self.client = OpenAI(
+                api_key=self.api_key, base_url=base_url, max_retries=max_retries
+            )
+        else:
+            self.client = OpenAI(
+                api_key=self.api_key,
+                base_url=base_url,
+                max_retries=max_retries,
+                timeout=_timeout(read_timeout, connect_timeout),
+            )
 
     def generate_text(self, prompt: str, **kwargs: dict[str, Any]) -> str:
         """
@@ -40,7 +74,7 @@ class OpenAILLM(BaseLLM):
         """
         # Modern OpenAI API - all models use chat completions now
         try:
-            response = self.client.chat.completions.create(
+            response = self._create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant."},
@@ -48,12 +82,15 @@ class OpenAILLM(BaseLLM):
                 ],
                 temperature=self.temperature,
             )
+            self.last_usage = _usage(response)
 
             if response.choices and response.choices[0].message.content:
                 content = response.choices[0].message.content
                 return content.strip()
             else:
                 return ""
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logging.error(f"OpenAI API error: {e}")
             return ""
@@ -71,12 +108,84 @@ class OpenAILLM(BaseLLM):
         """
         try:
             response = self.generate_text(prompt, **kwargs)
-            logging.debug(f"Response from OpenAI: {response}")
+            log_response("OpenAI", response)
             return response
         except Exception as e:
             logging.error(f"Error getting response from OpenAI: {e}")
             raise
 
+    def get_responses(self, prompt: str, n: int) -> list[str]:
+        """
+        Get several responses to the same prompt from a single request.
+
+        The samples are requested with the ``n`` parameter, so the prompt is
+        sent and billed once.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+            n (int): The number of responses.
+
+        Returns:
+            List[str]: The generated texts. Empty samples are left out, and no
+            texts are returned if the request fails.
+        """
+        try:
+            response = self._create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=self.temperature,
+                n=n,
+            )
+            self.last_usage = _usage(response)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logging.error(f"OpenAI API error: {e}")
+            return []
+
+        # Empty samples would be parsed as grades of zero, so they are left out.
+        texts = [(choice.message.content or "").strip() for choice in response.choices]
+        texts = [text for text in texts if text]
+        if len(texts) < n:
+            logging.warning(f"OpenAI returned {len(texts)} of {n} samples.")
+        for text in texts:
+            log_response("OpenAI", text)
+        return texts
+
+    def _create(self, **kwargs: Any) -> ChatCompletion:
+        """
+        Request a chat completion within the current grading deadline, if any.
+
+        Under a deadline the client's automatic retries are replaced by retries
+        here, so that every attempt and back-off fits in the time left.
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return cast(ChatCompletion, self.client.chat.completions.create(**kwargs))
+        attempt = 0
+        while True:
+            timeout = deadline.timeout(self.read_timeout)
+            connect = min(self.connect_timeout or timeout, timeout)
+            client = self.client.with_options(
+                timeout=_timeout(timeout, connect), max_retries=0
+            )
+            try:
+                return cast(ChatCompletion, client.chat.completions.create(**kwargs))
+            except (
+                openai.APIConnectionError,
+                openai.RateLimitError,
+                openai.InternalServerError,
+            ):
+                # Running out of time is reported as such, not as an API error.
+                check_deadline()
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(min(0.5 * 2**attempt, deadline.remaining()))
+                attempt += 1
+
     def get_model_info(self) -> dict[str, Any]:
         """
         Get information about the LLM model.
@@ -90,3 +199,19 @@ class OpenAILLM(BaseLLM):
             "weight": self.weight,
             "version": "1.0",
         }
+
+
+def _timeout(read: float | None, connect: float | None) -> openai.Timeout:
+    """Request timeouts in seconds; None waits indefinitely."""
+    return openai.Timeout(read, connect=connect)
+
+
+def _usage(response: Any) -> dict[str, int] | None:
+    """Token counts reported with a chat completion, if any."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+    }
@@ -0,0 +1,261 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import IO, Any
+
+from gradebotguru.llm_interface.base_llm import BaseLLM
+
+REPLAY_MODES = ("record", "replay")
+
+
+class Cassette:
+    """
+    A file of recorded LLM calls, shared by the ``ReplayLLM`` wrappers of a run.
+
+    Each line is a JSON object holding the request key (a SHA-256 of the
+    provider information and prompt), the response, the latency in seconds
+    and the token usage. Paths ending in ``.gz`` are gzip-compressed.
+
+    A prompt sent several times, e.g. for repeats, has one entry per call;
+    replay serves them in the recorded order and starts again from the first
+    when they run out.
+
+    Args:
+        path (str): Path to the cassette file.
+        mode (str): "record" to start a new cassette, or "replay" to read one.
+
+    Raises:
+        ValueError: If the mode is not supported.
+        FileNotFoundError: If a cassette to replay does not exist.
+    """
+
+    def __init__(self, path: str, mode: str = "replay") -> None:
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unsupported replay mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[dict[str, Any]]] = {}
+        self._served: dict[str, int] = {}
+        if mode == "record":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._open("wt").close()
+            return
+        with self._open("rt") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def record(self, entry: dict[str, Any]) -> None:
+        """
+        Append a call to the cassette.
+
+        Args:
+            entry (Dict[str, Any]): The 'key', 'response', 'latency' and 'usage'.
+        """
+        with self._lock:
+            self._entries.setdefault(entry["key"], []).append(entry)
+            with self._open("at") as file:
+                file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def next(self, key: str) -> dict[str, Any]:
+        """
+        Get the next recorded call for a request key.
+
+        Args:
+            key (str): The request key.
+
+        Returns:
+            Dict[str, Any]: The recorded entry.
+
+        Raises:
+            LookupError: If nothing was recorded for the key.
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise LookupError(
+                    f"No recorded response for request {key[:12]} in {self.path}"
+                )
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            return entries[served % len(entries)]
+
+    def _open(self, mode: str) -> IO[str]:
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode, encoding="utf-8")  # type: ignore[return-value]
+        return open(self.path, mode, encoding="utf-8")
+
+
+class ReplayLLM(BaseLLM):
+    """
+    Record the calls made to an LLM provider, or replay them from a cassette.
+
+    In record mode every call goes to the wrapped provider and is written to
+    the cassette. In replay mode responses come from the cassette and the
+    provider is only asked for its model information, so a run can be
+    repeated offline, without spending tokens, to benchmark throughput or to
+    try changes to parsing and aggregation.
+
+    Args:
+        llm (BaseLLM): The provider to record, or whose recorded calls to replay.
+        cassette (Cassette): The cassette to record to or replay from.
+        replay_latency (bool): Sleep for each call's recorded latency when
+            replaying, for realistic timings.
+
+    Attributes:
+        last_usage (Optional[Dict[str, int]]): Token usage of the most recent call,
+            as recorded.
+    """
+
+    def __init__(
+        self, llm: BaseLLM, cassette: Cassette, replay_latency: bool = False
+    ) -> None:
+        self.cassette = cassette
+        self.replay_latency = replay_latency
+        identity = json.dumps(llm.get_model_info(), sort_keys=True, default=str)
+        self._identity = identity.encode("utf-8")
+        # Set last: from here on, new attributes the provider has are set on it.
+        self.llm = llm
+
+    def __getattr__(self, name: str) -> Any:
+        # Settings such as context_length are read from the wrapped provider.
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Settings the wrapped provider has, such as keep_alive, are changed there.
+        if (
+            "llm" in self.__dict__
+            and name not in self.__dict__
+            and not hasattr(type(self), name)
+            and hasattr(self.llm, name)
+        ):
+            setattr(self.llm, name, value)
+        else:
+            super().__setattr__(name, value)
+
+    def get_response(self, prompt: str) -> str:
+        """
+        Get a response, from the provider when recording or the cassette when replaying.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+
+        Returns:
+            str: The response.
+        """
+        return self._call(prompt, self.llm.get_response)
+
+    def generate_text(self, prompt: str, **kwargs: dict[str, Any]) -> str:
+        """
+        Generate text, from the provider when recording or the cassette when replaying.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+            kwargs (Dict[str, Any]): Additional parameters for text generation.
+
+        Returns:
+            str: The generated text.
+        """
+        return self._call(prompt, lambda text: self.llm.generate_text(text, **kwargs))
+
+    def get_responses(self, prompt: str, n: int) -> list[str]:
+        """
+        Get several responses to the same prompt.
+
+        When recording, the wrapped provider's own batching is used and each
+        sample is recorded as a call with the latency of the whole request.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+            n (int): The number of responses.
+
+        Returns:
+            List[str]: The responses.
+        """
+        if self.cassette.mode == "replay":
+            return super().get_responses(prompt, n)
+        started = time.perf_counter()
+        responses = self.llm.get_responses(prompt, n)
+        latency = time.perf_counter() - started
+        for response in responses:
+            self._record(prompt, response, latency)
+        return responses
+
+    @contextmanager
+    def keep_loaded(self, keep_alive: float | str) -> Iterator[None]:
+        """Keep the wrapped provider's model loaded, unless replaying."""
+        if self.cassette.mode == "replay":
+            yield
+            return
+        with self.llm.keep_loaded(keep_alive):
+            yield
+
+    def unload(self) -> None:
+        """Unload the wrapped provider's model, unless replaying."""
+        if self.cassette.mode != "replay":
+            self.llm.unload()
+
+    def get_model_info(self) -> dict[str, Any]:
+        """
+        Get information about the wrapped LLM model.
+
+        Returns:
+            Dict[str, Any]: The wrapped provider's model information.
+        """
+        return self.llm.get_model_info()
+
+    def request_key(self, prompt: str) -> str:
+        """
+        Compute the cassette key for a prompt sent to this provider.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+
+        Returns:
+            str: A SHA-256 hex digest of the provider information and prompt.
+        """
+        digest = hashlib.sha256(self._identity)
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _call(self, prompt: str, call: Callable[[str], str]) -> str:
+        """Make a call through the cassette."""
+        if self.cassette.mode == "replay":
+            entry = self.cassette.next(self.request_key(prompt))
+            if self.replay_latency:
+                time.sleep(entry["latency"])
+            self.last_usage = entry["usage"]
+            return str(entry["response"])
+        started = time.perf_counter()
+        response = call(prompt)
+        self._record(prompt, response, time.perf_counter() - started)
+        return response
+
+    def _record(self, prompt: str, response: str, latency: float) -> None:
+        """Write one call to the cassette."""
+        # Usage is kept per thread, so this is the usage of the call just made
+        # here, even while other threads call the same provider.
+        self.last_usage = self.llm.last_usage
+        self.cassette.record(
+            {
+                "key": self.request_key(prompt),
+                "response": response,
+                "latency": round(latency, 4),
+                "usage": self.last_usage,
+            }
+        )
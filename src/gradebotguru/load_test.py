@@ -0,0 +1,204 @@
+import copy
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from gradebotguru.grader import grade_submission
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.stats import percentile
+
+T = TypeVar("T")
+
+
+class TimedLLM(BaseLLM):
+    """
+    Wrap an LLM provider to record how long each request takes.
+
+    Args:
+        llm (BaseLLM): The provider to time.
+
+    Attributes:
+        latencies (List[float]): Seconds taken by each request.
+        failures (int): Requests that raised an exception or returned no
+            response, as OpenAILLM does for API errors.
+    """
+
+    def __init__(self, llm: BaseLLM) -> None:
+        self.llm = llm
+        self.latencies: list[float] = []
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def get_response(self, prompt: str) -> str:
+        """Get a response from the wrapped provider, timing the request."""
+        return self._timed(self.llm.get_response, prompt)
+
+    def generate_text(self, prompt: str, **kwargs: dict[str, Any]) -> str:
+        """Generate text with the wrapped provider, timing the request."""
+        return self._timed(self.llm.generate_text, prompt, **kwargs)
+
+    def get_responses(self, prompt: str, n: int) -> list[str]:
+        """Get several responses from the wrapped provider, timed as one request."""
+        return self._timed(self.llm.get_responses, prompt, n)
+
+    def get_model_info(self) -> dict[str, Any]:
+        """Get the wrapped provider's model information."""
+        return self.llm.get_model_info()
+
+    def _timed(self, call: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Make a call and record its latency, or count its failure."""
+        started = time.perf_counter()
+        try:
+            result = call(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        else:
+            # Some providers report errors as an empty response rather than raising.
+            if not (any(result) if isinstance(result, list) else result):
+                with self._lock:
+                    self.failures += 1
+            return result
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - started)
+
+
+def fake_server_config(config: dict[str, Any], url: str) -> dict[str, Any]:
+    """
+    Point every LLM provider in a configuration at a fake server.
+
+    Args:
+        config (Dict[str, Any]): The loaded configuration.
+        url (str): Base URL of a ``FakeLLMServer``.
+
+    Returns:
+        Dict[str, Any]: A copy of the configuration using the fake server.
+    """
+    config = copy.deepcopy(config)
+    for provider in config["llm_providers"]:
+        if provider.get("provider", "openai") == "openai":
+            provider["base_url"] = f"{url}/v1"
+            provider.setdefault("api_key", "fake")
+        else:
+            provider["server_url"] = url
+        # Hedge against the fake server too, never a real endpoint.
+        provider.pop("hedge_urls", None)
+    return config
+
+
+def run_load_test(
+    submissions: Mapping[str, str],
+    grading_options: dict[str, Any],
+    concurrency: int = 4,
+) -> dict[str, Any]:
+    """
+    Grade submissions concurrently and measure throughput and latency.
+
+    The full pipeline runs for each submission: prompting, every provider
+    and repeat, parsing and aggregation.
+
+    Args:
+        submissions (Mapping[str, str]): Submission texts keyed by submission ID.
+        grading_options (Dict[str, Any]): Keyword arguments for ``grade_submission``,
+            including 'llms' and 'rubric'.
+        concurrency (int): Submissions graded at once.
+
+    A submission fails when grading raises or grades no criterion, and a
+    request fails when it raises or returns an empty response.
+
+    Returns:
+        Dict[str, Any]: 'submissions', 'failed', 'seconds', 'throughput'
+        (submissions per second), 'latency' (per-submission p50/p95/p99 in
+        seconds), 'requests', 'failed_requests', 'request_throughput' and
+        'request_latency' (per-request p50/p95/p99).
+    """
+    llms = [TimedLLM(llm) for llm in grading_options["llms"]]
+    options = {**grading_options, "llms": llms}
+    latencies: list[float] = []
+    failed = 0
+    lock = threading.Lock()
+
+    def grade(item: tuple[str, str]) -> None:
+        nonlocal failed
+        submission_id, text = item
+        started = time.perf_counter()
+        try:
+            result = grade_submission(
+                submission_id=submission_id, submission=text, **options
+            )
+            if not result["aggregated_response"]["criteria"]:
+                raise ValueError("no criterion was graded")
+        except Exception as e:
+            logging.warning(f"Grading {submission_id} failed: {e}")
+            with lock:
+                failed += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(grade, submissions.items()))
+    seconds = time.perf_counter() - started
+
+    request_latencies = [latency for llm in llms for latency in llm.latencies]
+    return {
+        "submissions": len(submissions),
+        "failed": failed,
+        "seconds": seconds,
+        "throughput": len(latencies) / seconds if seconds else 0.0,
+        "latency": _summary(latencies),
+        "requests": len(request_latencies),
+        "failed_requests": sum(llm.failures for llm in llms),
+        "request_throughput": len(request_latencies) / seconds if seconds else 0.0,
+        "request_latency": _summary(request_latencies),
+    }
+
+
+def format_load_test(report: dict[str, Any]) -> str:
+    """
+    Render a load test report as text.
+
+    Args:
+        report (Dict[str, Any]): Output of ``run_load_test``, optionally with the
+            fake server's 'server' stats.
+
+    Returns:
+        str: The report.
+    """
+    lines = [
+        f"Graded {report['submissions'] - report['failed']}/{report['submissions']} "
+        f"submissions in {report['seconds']:.2f}s "
+        f"({report['throughput']:.2f} submissions/s)",
+        f"Submission latency: {_format_summary(report['latency'])}",
+        f"Requests: {report['requests']} ({report['failed_requests']} failed, "
+        f"{report['request_throughput']:.2f} requests/s)",
+        f"Request latency: {_format_summary(report['request_latency'])}",
+    ]
+    if "server" in report:
+        stats = report["server"]
+        lines.append(
+            f"Fake server: {stats['requests']} requests, {stats['ok']} ok, "
+            f"{stats['throttled']} throttled (429), {stats['errors']} errors (500)"
+        )
+    return "\n".join(lines)
+
+
+def _summary(latencies: list[float]) -> dict[str, float]:
+    """The p50, p95 and p99 of a list of latencies."""
+    return {f"p{q}": percentile(latencies, q) for q in (50, 95, 99)}
+
+
+def _format_summary(summary: dict[str, float]) -> str:
+    """Render latency percentiles in milliseconds."""
+    return ", ".join(f"{name} {value * 1000:.0f} ms" for name, value in summary.items())
@@ -1,25 +1,106 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+from typing import Any
 
 LOGGING_LEVEL = logging.INFO
 LOGGING_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOGGING_FILE = "demo/gradebotguru.log"
+# Longest LLM response written to the log by log_response, in characters.
+MAX_RESPONSE_CHARS = 2000
+
+# Attributes every LogRecord has; anything else was passed with ``extra=``.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener | None = None
+_max_response_chars = MAX_RESPONSE_CHARS
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as JSON lines.
+
+    Each line holds the time, level, logger name and message, any fields
+    passed with ``extra=`` and the formatted exception, if there is one.
+
+    Examples:
+        >>> record = logging.makeLogRecord(
+        ...     {"msg": "Graded %s", "args": ("essay.txt",), "levelname": "INFO",
+        ...      "name": "gradebotguru", "created": 0, "model": "llama3"})
+        >>> JsonFormatter().format(record)  # doctest: +ELLIPSIS
+        '{"time": "...", "level": "INFO", "logger": "gradebotguru", "message": "Graded essay.txt", "model": "llama3"}'
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that leaves all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record can be passed
+        # through as it is and its message built only when it is written.
+        return record
+
+
+class _Truncated:
+    """Render a string cut to a maximum length, only when it is formatted."""
+
+    __slots__ = ("text", "limit")
+
+    def __init__(self, text: str, limit: int) -> None:
+        self.text = text
+        self.limit = limit
+
+    def __str__(self) -> str:
+        if len(self.text) <= self.limit:
+            return self.text
+        omitted = len(self.text) - self.limit
+        return f"{self.text[: self.limit]}... [{omitted} more characters]"
 
 
 def setup_logging(
-    level: int = LOGGING_LEVEL,
+    level: int | str = LOGGING_LEVEL,
     format: str = LOGGING_FORMAT,
     filename: str | None = LOGGING_FILE,
+    queued: bool = False,
+    json_lines: bool = False,
+    max_response_chars: int = MAX_RESPONSE_CHARS,
 ) -> None:
     """
     Setup logging configuration.
 
     This function configures the logging settings, including log level, format, and output file.
 
+    In queued mode the root logger only puts records on an in-memory queue
+    and a background listener thread formats and writes them, so log I/O
+    and handler locks stay off the grading path. The listener is flushed
+    when the interpreter exits, or by ``stop_logging``.
+
     Args:
-        level (int): Logging level (default is logging.INFO).
+        level (int | str): Logging level (default is logging.INFO).
         format (str): Logging format string (default is '%(asctime)s - %(name)s - %(levelname)s - %(message)s').
         filename (Optional[str]): Log file name. If None, logs will not be written to a file (default is 'gradebotguru.log').
+        queued (bool): Write logs from a background thread (default is False).
+        json_lines (bool): Write one JSON object per line instead of ``format`` (default is False).
+        max_response_chars (int): Longest LLM response logged by ``log_response`` (default is 2000).
 
     Examples:
         >>> import logging
@@ -33,22 +114,60 @@ def setup_logging(
         'This is a debug message'
         >>> log_stream.close()
     """
+    global _listener, _max_response_chars
+    stop_logging()
     # Clear existing handlers
-    for handler in logging.root.handlers[:]:
-        logging.root.removeHandler(handler)
+    for existing in logging.root.handlers[:]:
+        logging.root.removeHandler(existing)
 
     if filename and os.path.exists(filename):
-        # Configure file handler
-        logging.basicConfig(
-            level=level,
-            format=format,
-            filename=filename,
-            filemode="a",  # Append mode
-        )
+        handler: logging.Handler = logging.FileHandler(filename, mode="a")
     else:
-        # Configure console handler
-        logging.basicConfig(level=level, format=format)
-        console = logging.StreamHandler()
-        console.setLevel(level)
-        console.setFormatter(logging.Formatter(format))
-        logging.getLogger("").addHandler(console)
+        handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(format))
+
+    if queued:
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, handler)
+        _listener.start()
+        logging.root.addHandler(_DeferredQueueHandler(records))
+    else:
+        logging.root.addHandler(handler)
+    logging.root.setLevel(level)
+    _max_response_chars = max_response_chars
+
+
+def stop_logging() -> None:
+    """
+    Stop the queued-logging listener, writing any records still on the queue.
+
+    Does nothing unless ``setup_logging`` was called with ``queued=True``.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def log_response(provider: str, response: str) -> None:
+    """
+    Log an LLM response at DEBUG level, capped at the configured length.
+
+    Nothing is formatted unless DEBUG logging is enabled, and the response is
+    only truncated when the record is written.
+
+    Args:
+        provider (str): The provider name, e.g. 'OpenAI'.
+        response (str): The response text.
+    """
+    logging.debug(
+        "Response from %s: %s",
+        provider,
+        _Truncated(response, _max_response_chars),
+        extra={"provider": provider, "response_chars": len(response)},
+    )
+
+
+atexit.register(stop_logging)
@@ -1,16 +1,87 @@
 import argparse
+import functools
 import logging
+import os
 import pprint
+import sys
+from collections.abc import Callable, Mapping
+from typing import Any
 
+from gradebotguru.archive import is_archive, load_archive
+from gradebotguru.benchmark import benchmark_backends, format_benchmark
 from gradebotguru.config import load_config
+from gradebotguru.deadline import DeadlineExceeded, deadline_after
+from gradebotguru.duplicates import (
+    DuplicateIndex,
+    flag_near_duplicates,
+    reuse_duplicate_result,
+)
+from gradebotguru.fake_server import FakeLLMServer
 from gradebotguru.grader import grade_submission
+from gradebotguru.incremental import (
+    config_hash,
+    diff_rubrics,
+    load_results,
+    plan_directory,
+    regrade_submission,
+    save_results,
+)
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.llm_interface.circuit_breaker import (
+    ProviderUnavailableError,
+    format_health_report,
+)
 from gradebotguru.llm_interface.factory import create_llms
-from gradebotguru.logging_config import setup_logging
+from gradebotguru.llm_interface.hedged_llm import (
+    close_hedged_llms,
+    find_hedge_budget,
+    format_hedging_report,
+)
+from gradebotguru.load_test import fake_server_config, format_load_test, run_load_test
+from gradebotguru.logging_config import MAX_RESPONSE_CHARS, setup_logging
+from gradebotguru.results_db import AGGREGATED, ResultsDB, format_table
 from gradebotguru.rubric_loader import load_rubric
-from gradebotguru.submission_loader import load_submissions
+from gradebotguru.scheduler import BATCH_KEEP_ALIVE, grade_by_model
+from gradebotguru.server import GradingServer
+from gradebotguru.sharding import (
+    ShardError,
+    cohort_stats,
+    format_cohort_stats,
+    in_shard,
+    merge_shards,
+    parse_shard,
+)
+from gradebotguru.submission_loader import extract_submission, load_submissions
+from gradebotguru.triage import (
+    create_triage_llm,
+    format_triage_report,
+    get_triage_config,
+    new_triage_stats,
+    triage_submission,
+)
+from gradebotguru.watcher import DirectoryWatcher
+from gradebotguru.work_queue import WorkQueue, run_worker, serve_queue
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    commands = {
+        "serve-queue": serve_queue_command,
+        "worker": worker_command,
+        "benchmark": benchmark_command,
+        "fake-server": fake_server_command,
+        "load-test": load_test_command,
+        "serve": serve_command,
+        "query": query_command,
+        "merge": merge_command,
+    }
+    if argv and argv[0] in commands:
+        commands[argv[0]](argv[1:])
+    else:
+        grade_command(argv)
+
+
+def grade_command(argv: list[str]) -> None:
     parser = argparse.ArgumentParser(
         description="Grade student submissions using an LLM."
     )
@@ -21,35 +92,841 @@ def main() -> None:
         "--submissions",
         type=str,
         required=True,
-        help="Path to the submissions directory.",
+        help="Path to the submissions directory or a ZIP export from an LMS.",
+    )
+    parser.add_argument(
+        "--results",
+        type=str,
+        default=None,
+        help="Path to a results file; only new or modified submissions and "
+        "criteria changed in the rubric are graded on later runs.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and grade new submissions as they arrive.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between directory scans when inotify is unavailable.",
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        metavar="CASSETTE",
+        default=None,
+        help="Record every LLM call to a cassette file for later replay.",
+    )
+    cassette.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        default=None,
+        help="Serve LLM responses from a recorded cassette instead of the providers.",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        action="store_true",
+        help="With --replay, wait for each call's recorded latency.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        default=None,
+        help="Grade only shard I of N, a stable subset of the submissions, and "
+        "write its results to --results for 'gradebot-guru merge'.",
+    )
+    args = parser.parse_args(argv)
+    if args.watch and not args.results:
+        parser.error("--watch requires --results")
+    shard = None
+    if args.shard:
+        if not args.results:
+            parser.error("--shard requires --results")
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.results and is_archive(args.submissions):
+        parser.error(
+            "--results and --watch need a submissions directory, not an archive"
+        )
 
-    setup_logging()
     config = load_config(args.config)
+    _setup_logging(config)
     logging.info("Configuration loaded successfully.")
+    if args.record or args.replay:
+        config["replay"] = {
+            "cassette": args.record or args.replay,
+            "mode": "record" if args.record else "replay",
+            "latency": args.replay_latency,
+        }
+
+    llms = create_llms(config)
+    triage_config = get_triage_config(config)
+    triage_llm = (
+        None
+        if triage_config is None
+        else create_triage_llm(triage_config, config, llms)
+    )
+    results_db = None
+    if config.get("results_db"):
+        results_db = ResultsDB(
+            config["results_db"], batch_size=config.get("results_db_batch_size", 50)
+        )
+    # Arm the watch before grading, so uploads during a pass are not missed.
+    watcher = (
+        DirectoryWatcher(args.submissions, poll_interval=args.poll_interval)
+        if args.watch
+        else None
+    )
+    try:
+        while True:
+            rubric = load_rubric(config["rubric_path"])
+            grade_directory(
+                args.submissions,
+                config,
+                llms,
+                rubric,
+                args.results,
+                results_db,
+                shard,
+                triage_llm,
+            )
+            if watcher is None:
+                break
+            changed = watcher.wait()
+            logging.info(f"Detected changes to {len(changed)} file(s); regrading.")
+    finally:
+        if watcher is not None:
+            watcher.close()
+        if results_db is not None:
+            results_db.close()
+        close_hedged_llms(llms if triage_llm is None else [*llms, triage_llm])
+
+
+def grade_directory(
+    directory: str,
+    config: dict[str, Any],
+    llms: list[BaseLLM],
+    rubric: Mapping[str, Mapping[str, Any]],
+    results_path: str | None = None,
+    results_db: ResultsDB | None = None,
+    shard: tuple[int, int] | None = None,
+    triage_llm: BaseLLM | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Grade the submissions in a directory or ZIP archive and print the results.
+
+    When ``results_path`` is given, files whose content and grading
+    configuration are unchanged since the previous run reuse their stored
+    result (regrading only criteria changed in the rubric), and the updated
+    results are written back. When ``results_db`` is given, the submissions
+    graded are recorded in it as one run. With ``shard``, only the
+    submissions in that shard are graded and the results file records the
+    shard for ``merge_shards``.
+
+    Args:
+        directory (str): The path to the directory containing submission files.
+        config (Dict[str, Any]): The loaded configuration.
+        llms (List[BaseLLM]): List of LLM providers.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        results_path (Optional[str]): Path to the results file.
+        results_db (Optional[ResultsDB]): Database to record the run in.
+        shard (Optional[Tuple[int, int]]): The shard index and count to grade;
+            requires ``results_path``.
+        triage_llm (Optional[BaseLLM]): The cheap model when ``triage`` is
+            configured; created from the configuration if None.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Results keyed by submission ID.
+    """
+    grading_options = _grading_options(config, llms, rubric)
+    results: dict[str, dict[str, Any]] = {}
+    triage_config = get_triage_config(config)
+    triage_stats = new_triage_stats()
+    if triage_config is not None and triage_llm is None:
+        triage_llm = create_triage_llm(triage_config, config, llms)
+    grade = _grade_function(triage_config, triage_llm, triage_stats)
+    duplicate_index = None
+    if config.get("detect_duplicates", False):
+        duplicate_index = DuplicateIndex(
+            threshold=config.get("duplicate_threshold", 0.8)
+        )
+
+    limits = config.get("extraction_limits")
+    backends = config.get("extraction_backends")
+    extraction: dict[str, dict[str, Any]] = {}
+    deadline = config.get("submission_deadline")
+    run_id = None
+    if results_db is not None:
+        run_id = results_db.start_run(rubric, config_hash(config))
+
+    if results_path is None:
+        load = load_archive if is_archive(directory) else load_submissions
+        submissions = load(directory, duplicate_index, limits, extraction, backends)
+        logging.info("Submissions loaded successfully.")
+        graded, ungraded = _grade_by_model(
+            config, triage_config, submissions, duplicate_index, grading_options
+        )
+        for submission_id, submission_text in submissions.items():
+            if submission_id in ungraded:
+                continue
+            reused_result = None
+            if duplicate_index is not None:
+                reused_result = reuse_duplicate_result(
+                    duplicate_index, submission_id, results
+                )
+            result = (
+                reused_result
+                or graded.get(submission_id)
+                or _grade_within_deadline(
+                    grade,
+                    deadline,
+                    submission_id=submission_id,
+                    submission=submission_text,
+                    **grading_options,
+                )
+            )
+            if result is None:
+                continue
+            results[submission_id] = result
+            if duplicate_index is not None:
+                flag_near_duplicates(duplicate_index, submission_id, results)
+            _record_extraction(results[submission_id], extraction[submission_id])
+            _print_result(results[submission_id])
+            if results_db is not None and run_id is not None:
+                results_db.add_result(run_id, results[submission_id])
+        if triage_config is not None:
+            logging.info(format_triage_report(triage_stats))
+        _log_provider_reports(llms)
+        if results_db is not None and run_id is not None:
+            results_db.finish_run(run_id)
+        return results
+
+    previous = load_results(results_path)
+    rubric_diff = diff_rubrics(previous["rubric"], rubric)
+    rubric_changed = any(rubric_diff[key] for key in ("added", "removed", "changed"))
+    to_grade, reused, manifest = plan_directory(
+        directory,
+        previous,
+        config_hash(config),
+        include=None if shard is None else functools.partial(in_shard, shard=shard),
+    )
+    if shard is not None:
+        logging.info(f"Shard {shard[0]}/{shard[1]}: {len(manifest)} submission(s).")
+    logging.info(f"{len(to_grade)} submission(s) to grade, {len(reused)} unchanged.")
+
+    if not rubric_changed:
+        results = {sid: previous["results"][sid] for sid in reused}
+        reused = []
+
+    texts: dict[str, str] = {}
+    for submission_id in reused + to_grade:
+        try:
+            texts[submission_id], extraction[submission_id] = extract_submission(
+                os.path.join(directory, submission_id), limits, backends
+            )
+        except ValueError as e:
+            logging.warning(f"Skipping unsupported file: {submission_id} - {e}")
+            manifest.pop(submission_id)
+            continue
+        if duplicate_index is not None:
+            duplicate_index.add(submission_id, texts[submission_id])
+    graded, ungraded = _grade_by_model(
+        config,
+        triage_config,
+        {sid: texts[sid] for sid in to_grade if sid in texts},
+        duplicate_index,
+        grading_options,
+    )
+
+    for submission_id, submission_text in texts.items():
+        if submission_id in ungraded:
+            # Left out of the results file, so the next run grades it again.
+            continue
+        reused_result = None
+        if duplicate_index is not None:
+            reused_result = reuse_duplicate_result(
+                duplicate_index, submission_id, results
+            )
+        if reused_result is not None:
+            result = reused_result
+        elif submission_id in graded:
+            result = graded[submission_id]
+        elif submission_id in reused:
+            result = _grade_within_deadline(
+                functools.partial(
+                    regrade_submission, previous["results"][submission_id], rubric_diff
+                ),
+                deadline,
+                submission_id=submission_id,
+                submission=submission_text,
+                **grading_options,
+            )
+        else:
+            result = _grade_within_deadline(
+                grade,
+                deadline,
+                submission_id=submission_id,
+                submission=submission_text,
+                **grading_options,
+            )
+        if result is None:
+            # Left out of the results file, so the next run grades it again.
+            continue
+        results[submission_id] = result
+        if duplicate_index is not None:
+            flag_near_duplicates(duplicate_index, submission_id, results)
+        _record_extraction(results[submission_id], extraction[submission_id])
+        _print_result(results[submission_id])
+        if results_db is not None and run_id is not None:
+            results_db.add_result(run_id, results[submission_id])
+        # Save as we go so an interrupted run keeps the work already done.
+        save_results(
+            results_path,
+            rubric,
+            results,
+            {sid: manifest[sid] for sid in results},
+            _shard_info(shard, manifest),
+        )
+
+    save_results(
+        results_path,
+        rubric,
+        results,
+        {sid: manifest[sid] for sid in results},
+        _shard_info(shard, manifest),
+    )
+    if triage_config is not None:
+        logging.info(format_triage_report(triage_stats))
+    _log_provider_reports(llms)
+    if results_db is not None and run_id is not None:
+        results_db.finish_run(run_id)
+    return results
+
+
+def _shard_info(
+    shard: tuple[int, int] | None, manifest: dict[str, dict[str, str]]
+) -> dict[str, Any] | None:
+    """What a sharded run records about its shard in the results file."""
+    if shard is None:
+        return None
+    return {"index": shard[0], "count": shard[1], "files": sorted(manifest)}
+
+
+def _grade_by_model(
+    config: dict[str, Any],
+    triage_config: dict[str, Any] | None,
+    submissions: Mapping[str, str],
+    duplicate_index: DuplicateIndex | None,
+    grading_options: dict[str, Any],
+) -> tuple[dict[str, dict[str, Any]], set[str]]:
+    """
+    Grade submissions up front, one model at a time, if model affinity is on.
+
+    Returns the results, and the submissions that could not be graded and
+    are left out of them.
+    """
+    if not config.get("model_affinity", False) or triage_config is not None:
+        return {}, set()
+    # Exact duplicates are skipped here and reuse their twin's result as usual.
+    batch = {
+        sid: text
+        for sid, text in submissions.items()
+        if duplicate_index is None or duplicate_index.canonical(sid) == sid
+    }
+    graded = grade_by_model(
+        batch,
+        keep_alive=config.get("model_affinity_keep_alive", BATCH_KEEP_ALIVE),
+        max_workers=config.get("model_affinity_workers", 1),
+        submission_deadline=config.get("submission_deadline"),
+        **grading_options,
+    )
+    return graded, batch.keys() - graded.keys()
+
+
+def _grade_within_deadline(
+    grade: Callable[..., dict[str, Any]],
+    deadline: float | None,
+    submission_id: str,
+    **grading_options: Any,
+) -> dict[str, Any] | None:
+    """Grade one submission, or log and skip it if it cannot be graded in time."""
+    try:
+        with deadline_after(deadline):
+            return grade(submission_id=submission_id, **grading_options)
+    except (DeadlineExceeded, ProviderUnavailableError) as e:
+        logging.warning(f"Could not grade {submission_id}: {e}")
+        return None
+
+
+def _grade_function(
+    triage_config: dict[str, Any] | None,
+    triage_llm: BaseLLM | None,
+    triage_stats: dict[str, Any],
+) -> Callable[..., dict[str, Any]]:
+    """Choose how each submission is graded: directly, or triaged first."""
+    if triage_config is None or triage_llm is None:
+        return grade_submission
+    return functools.partial(
+        triage_submission,
+        triage_llm=triage_llm,
+        triage_config=triage_config,
+        stats=triage_stats,
+    )
+
+
+def _grading_options(
+    config: dict[str, Any],
+    llms: list[BaseLLM],
+    rubric: Mapping[str, Mapping[str, Any]],
+) -> dict[str, Any]:
+    """Keyword arguments for ``grade_submission`` taken from the configuration."""
+    return {
+        "rubric": rubric,
+        "llms": llms,
+        "num_repeats": config["number_of_repeats"],
+        "repeat_each_provider": config["repeat_each_provider"],
+        "aggregation_method": config["aggregation_method"],
+        "bias_adjustments": config.get("bias_adjustments", {}),
+        "prompt_template": config["llm_prompt_template"],
+        "summarize_feedback": config.get("summarize_feedback", True),
+        "chunked": config.get("chunked_grading", False),
+        "repeat_strategy": config.get("repeat_strategy", "sequential"),
+        "quorum": config.get("quorum"),
+    }
+
+
+def _log_provider_reports(llms: list[BaseLLM]) -> None:
+    """Log what request hedging has cost and how healthy providers are, if enabled."""
+    budget = find_hedge_budget(llms)
+    if budget is not None:
+        logging.info(format_hedging_report(budget))
+    health = format_health_report(llms)
+    if health is not None:
+        logging.info(health)
+
+
+def _setup_logging(config: dict[str, Any]) -> None:
+    """Configure logging from the ``logging_level`` and ``log_*`` config keys."""
+    setup_logging(
+        level=config.get("logging_level", "INFO"),
+        queued=config.get("log_queue", False),
+        json_lines=config.get("log_json", False),
+        max_response_chars=config.get("log_max_response_chars", MAX_RESPONSE_CHARS),
+    )
+
+
+def _record_extraction(result: dict[str, Any], metadata: dict[str, Any]) -> None:
+    """Note on a result when its submission text was cut short by extraction limits."""
+    result.pop("extraction", None)
+    if metadata["truncated"]:
+        logging.warning(
+            f"{result['submission_id']} was truncated after {metadata['pages_read']} "
+            f"page(s) ({metadata['truncation_reason']})."
+        )
+        result["extraction"] = metadata
+
+
+def _print_result(result: dict[str, Any]) -> None:
+    print(f"{result['grade']}")
+    pprint.pprint(result["aggregated_response"])
+
+
+def serve_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru serve",
+        description="Run a local HTTP/JSON grading API that keeps providers and "
+        "the rubric loaded between requests.",
+    )
+    parser.add_argument(
+        "--config", type=str, required=True, help="Path to the configuration file."
+    )
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1", help="Interface to listen on."
+    )
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Submissions graded at once across all requests "
+        "(default: serve_workers from the configuration, or 4).",
+    )
+    parser.add_argument(
+        "--submissions",
+        type=str,
+        default=None,
+        help="Directory that submissions sent by path are read from "
+        "(default: only submission text is accepted).",
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    _setup_logging(config)
+    llms = create_llms(config)
+    rubric = load_rubric(config["rubric_path"])
+    triage_config = get_triage_config(config)
+    triage_llm = (
+        None
+        if triage_config is None
+        else create_triage_llm(triage_config, config, llms)
+    )
+    triage_stats = new_triage_stats()
+    affinity = None
+    if config.get("model_affinity", False) and triage_config is None:
+        affinity = {
+            "keep_alive": config.get("model_affinity_keep_alive", BATCH_KEEP_ALIVE),
+            "max_workers": config.get("model_affinity_workers", 1),
+        }
+    server = GradingServer(
+        _grade_function(triage_config, triage_llm, triage_stats),
+        _grading_options(config, llms, rubric),
+        rubric_path=config["rubric_path"],
+        host=args.host,
+        port=args.port,
+        max_workers=args.workers or config.get("serve_workers", 4),
+        deadline=config.get("submission_deadline"),
+        affinity=affinity,
+        extraction={
+            "limits": config.get("extraction_limits"),
+            "backends": config.get("extraction_backends"),
+        },
+        submissions_dir=args.submissions,
+    )
+    logging.info(f"Grading server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_hedged_llms(llms if triage_llm is None else [*llms, triage_llm])
+    if triage_config is not None:
+        logging.info(format_triage_report(triage_stats))
+    _log_provider_reports(llms)
+
+
+def query_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru query",
+        description="Query the results database written during grading runs.",
+    )
+    parser.add_argument(
+        "--db", type=str, required=True, help="Path to the results database."
+    )
+    reports = parser.add_subparsers(dest="report", required=True)
+    runs = reports.add_parser("runs", help="List grading runs, most recent first.")
+    runs.add_argument("--last", type=int, default=None, help="Only the last N runs.")
+    criteria = reports.add_parser(
+        "criteria", help="Grades per run, provider and criterion."
+    )
+    criteria.add_argument("--criterion", type=str, default=None)
+    criteria.add_argument(
+        "--provider",
+        type=str,
+        default=None,
+        help=f"Model name, or {AGGREGATED} for the aggregated grades.",
+    )
+    criteria.add_argument(
+        "--last", type=int, default=None, help="Only the last N runs."
+    )
+    submission = reports.add_parser(
+        "submission", help="A submission's grades across runs."
+    )
+    submission.add_argument("submission_id", type=str)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"no results database at {args.db}")
+    with ResultsDB(args.db) as results_db:
+        if args.report == "runs":
+            rows = results_db.runs(args.last)
+        elif args.report == "criteria":
+            rows = results_db.criterion_stats(args.criterion, args.provider, args.last)
+        else:
+            rows = [
+                {
+                    **entry,
+                    "criteria": ", ".join(
+                        f"{name} {grade:g}" for name, grade in entry["criteria"].items()
+                    ),
+                }
+                for entry in results_db.submission_history(args.submission_id)
+            ]
+    print(format_table(rows))
+
+
+def merge_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru merge",
+        description="Combine the results files of a sharded run, check that every "
+        "shard and submission is present, and report cohort statistics.",
+    )
+    parser.add_argument("shards", nargs="+", help="Results files written with --shard.")
+    parser.add_argument(
+        "--output", type=str, required=True, help="Path to the merged results file."
+    )
+    parser.add_argument(
+        "--allow-incomplete",
+        action="store_true",
+        help="Write the merged results even if some submissions have no result.",
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    try:
+        merged, missing = merge_shards(args.shards)
+    except ShardError as e:
+        raise SystemExit(f"gradebot-guru: error: {e}") from e
+    if missing:
+        logging.warning(
+            f"{len(missing)} submission(s) have no result: {', '.join(missing)}"
+        )
+        if not args.allow_incomplete:
+            raise SystemExit(
+                "gradebot-guru: error: cohort is incomplete; regrade the missing "
+                "submissions or pass --allow-incomplete"
+            )
+    save_results(args.output, merged["rubric"], merged["results"], merged["manifest"])
+    print(format_cohort_stats(cohort_stats(merged["results"])))
+
+
+def serve_queue_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru serve-queue",
+        description="Enqueue grading jobs for workers and aggregate their results.",
+    )
+    parser.add_argument(
+        "--config", type=str, required=True, help="Path to the configuration file."
+    )
+    parser.add_argument(
+        "--submissions",
+        type=str,
+        required=True,
+        help="Path to the submissions directory or a ZIP export from an LMS.",
+    )
+    parser.add_argument(
+        "--queue", type=str, required=True, help="Path to the shared queue database."
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between progress checks.",
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    _setup_logging(config)
+    llms = create_llms(config)
+    rubric = load_rubric(config["rubric_path"])
+    load = load_archive if is_archive(args.submissions) else load_submissions
+    submissions = load(
+        args.submissions,
+        limits=config.get("extraction_limits"),
+        backends=config.get("extraction_backends"),
+    )
+    queue = WorkQueue(
+        args.queue,
+        lease_seconds=config.get("queue_lease_seconds", 300),
+        max_attempts=config.get("queue_max_attempts", 3),
+    )
+    try:
+        results = serve_queue(
+            queue, submissions, rubric, llms, config, poll_interval=args.poll_interval
+        )
+    finally:
+        queue.close()
+        close_hedged_llms(llms)
+
+    for result in results.values():
+        _print_result(result)
+
 
+def worker_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru worker",
+        description="Process grading jobs from a shared queue.",
+    )
+    parser.add_argument(
+        "--config", type=str, required=True, help="Path to the configuration file."
+    )
+    parser.add_argument(
+        "--queue", type=str, required=True, help="Path to the shared queue database."
+    )
+    parser.add_argument(
+        "--worker-id", type=str, default=None, help="Identifier for this worker."
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Keep polling for new jobs after the queue is drained.",
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    _setup_logging(config)
     llms = create_llms(config)
+    queue = WorkQueue(
+        args.queue,
+        lease_seconds=config.get("queue_lease_seconds", 300),
+        max_attempts=config.get("queue_max_attempts", 3),
+    )
+    try:
+        completed = run_worker(queue, llms, worker_id=args.worker_id, wait=args.wait)
+    finally:
+        queue.close()
+        close_hedged_llms(llms)
+    logging.info(f"Worker completed {completed} jobs.")
+
+
+def benchmark_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru benchmark",
+        description="Compare extraction backends on a sample corpus.",
+    )
+    parser.add_argument(
+        "--corpus",
+        type=str,
+        required=True,
+        help="Directory of sample submissions, searched recursively.",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Passes over the corpus per backend."
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="*",
+        default=None,
+        help="File extensions to benchmark, e.g. pdf docx; all by default.",
+    )
+    args = parser.parse_args(argv)
+    rows = benchmark_backends(args.corpus, args.repeats, args.formats)
+    print(format_benchmark(rows))
+
+
+def _add_fake_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that shape a fake server's behaviour."""
+    parser.add_argument(
+        "--latency",
+        type=str,
+        default="lognormal:0.8:0.5",
+        help="Latency distribution: fixed:<s>, uniform:<low>:<high>, "
+        "exponential:<mean> or lognormal:<median>:<sigma>.",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests failing (500)."
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests rate limited (429).",
+    )
+    parser.add_argument(
+        "--tokens-per-minute",
+        type=int,
+        default=None,
+        help="Token-rate limit; requests over it are rate limited (429).",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for latencies and failures."
+    )
+
+
+def _fake_server(args: argparse.Namespace, port: int = 0) -> FakeLLMServer:
+    """Create a fake server from parsed command line options."""
+    try:
+        return FakeLLMServer(
+            port=port,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            tokens_per_minute=args.tokens_per_minute,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        raise SystemExit(f"gradebot-guru: error: {e}") from e
+
+
+def fake_server_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru fake-server",
+        description="Run a local OpenAI- and Ollama-compatible server with canned "
+        "grading responses, for load testing.",
+    )
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on.")
+    _add_fake_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    server = _fake_server(args, args.port)
+    print(f"OpenAI base_url: {server.url}/v1")
+    print(f"Ollama server_url: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def load_test_command(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="gradebot-guru load-test",
+        description="Grade submissions concurrently and report throughput and "
+        "p50/p95/p99 latency.",
+    )
+    parser.add_argument(
+        "--config", type=str, required=True, help="Path to the configuration file."
+    )
+    parser.add_argument(
+        "--submissions",
+        type=str,
+        required=True,
+        help="Path to the submissions directory or a ZIP export from an LMS.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Submissions graded at once."
+    )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Send every provider's requests to a local fake server instead.",
+    )
+    _add_fake_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    _setup_logging(config)
     rubric = load_rubric(config["rubric_path"])
-    submissions = load_submissions(args.submissions)
-    logging.info("Submissions loaded successfully.")
-
-    for submission_id, submission_text in submissions.items():
-        result = grade_submission(
-            submission_id=submission_id,
-            submission=submission_text,
-            rubric=rubric,
-            llms=llms,
-            num_repeats=config["number_of_repeats"],
-            repeat_each_provider=config["repeat_each_provider"],
-            aggregation_method=config["aggregation_method"],
-            bias_adjustments=config.get("bias_adjustments", {}),
-            prompt_template=config["llm_prompt_template"],
-            summarize_feedback=config.get("summarize_feedback", True),
-        )
-
-        print(f"{result['grade']}")
-        pprint.pprint(result["aggregated_response"])
+    load = load_archive if is_archive(args.submissions) else load_submissions
+    submissions = load(
+        args.submissions,
+        limits=config.get("extraction_limits"),
+        backends=config.get("extraction_backends"),
+    )
+
+    server = _fake_server(args).start() if args.fake else None
+    try:
+        if server is not None:
+            config = fake_server_config(config, server.url)
+        llms = create_llms(config)
+        try:
+            report = run_load_test(
+                submissions, _grading_options(config, llms, rubric), args.concurrency
+            )
+        finally:
+            close_hedged_llms(llms)
+    finally:
+        if server is not None:
+            server.stop()
+    if server is not None:
+        report["server"] = server.stats
+    print(format_load_test(report))
+    budget = find_hedge_budget(llms)
+    if budget is not None:
+        print(format_hedging_report(budget))
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
+from collections.abc import Mapping
 from typing import Any
 
+from gradebotguru.rubric import compile_rubric
+
 
 def generate_system_prompt() -> str:
     """
@@ -15,7 +18,7 @@ def generate_system_prompt() -> str:
 
 
 def generate_user_prompt(
-    rubric: dict[str, dict[str, Any]],
+    rubric: Mapping[str, Mapping[str, Any]],
     submission: str,
     prompt_template: str,
     assessment_type: str = "essay",
@@ -24,7 +27,8 @@ def generate_user_prompt(
     Generate a well-formatted prompt for the LLM based on the rubric, submission, and assessment type.
 
     Parameters:
-    - rubric (Dict[str, Dict[str, Any]]): A dictionary representing the grading rubric.
+    - rubric (Mapping[str, Mapping[str, Any]]): The grading rubric; a compiled ``Rubric``
+      reuses its precomputed rendering.
     - submission (str): The student submission text.
     - prompt_template (str): Custom prompt template for LLMs.
     - assessment_type (str): The type of assessment (e.g., 'essay', 'code').
@@ -42,19 +46,16 @@ def generate_user_prompt(
     >>> print(generate_user_prompt(rubric, submission, template, "essay"))
     Evaluate the following submission based on the rubric provided. The rubric is as follows: - Content: Quality and relevance of content. (Max Points: 10) - Clarity: Clarity of expression and organization. (Max Points: 5) - Grammar: Proper use of grammar and syntax. (Max Points: 5). The student submission is as follows: This is a sample student submission for testing purposes.
     """
-    rubric_str = ""
-    for criterion, details in rubric.items():
-        description = details.get("description", "")
-        max_points = details["max_points"]
-        rubric_str += f"- {criterion}: {description} (Max Points: {max_points}) "
     prompt = prompt_template.format(
-        rubric=rubric_str.strip(), submission=submission.strip()
+        rubric=compile_rubric(rubric).prompt_fragment, submission=submission.strip()
     )
     return prompt
 
 
 def generate_prompt(
-    rubric: dict[str, dict[str, Any]], submission: str, assessment_type: str = "essay"
+    rubric: Mapping[str, Mapping[str, Any]],
+    submission: str,
+    assessment_type: str = "essay",
 ) -> str:
     """
     Generate the full prompt including system and user prompts.
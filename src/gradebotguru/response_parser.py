@@ -1,74 +1,132 @@
 import re
 from typing import Any
 
+# A labelled line, e.g. "Grade: 8", "**Grade:** 8", "1. Criterion: Content" or
+# "### Overall Feedback: ...". Markdown list, heading and emphasis markers
+# around the label are ignored.
+LABEL_PATTERN = re.compile(
+    r"[#>*_\-\s]*(?:\d+[.)][*_\s]*)?"
+    r"(?P<label>criterion|grade|feedback|overall(?: feedback)?)"
+    r"[*_]*\s*:[*_]*\s*(?P<value>.*)",
+    re.IGNORECASE,
+)
+# A grade value: "8", "7.5", "4/5", "**4.5**/5" or "6 out of 10".
+GRADE_PATTERN = re.compile(
+    r"[*_]*(?P<grade>-?\d+(?:\.\d+)?)[*_]*"
+    r"(?:\s*(?:/|out of)\s*(?P<out_of>\d+(?:\.\d+)?))?",
+    re.IGNORECASE,
+)
+
+
+def parse_grade(value: str) -> tuple[int | float, int | float | None] | None:
+    """
+    Parse the value of a "Grade:" line.
+
+    Parameters:
+    - value (str): The text after the label.
+
+    Returns:
+    - Optional[Tuple]: The grade and the maximum it is out of, or None if the
+      value is not a number. Whole numbers are returned as ints.
+
+    Examples:
+        >>> parse_grade("7.5")
+        (7.5, None)
+        >>> parse_grade("**4**/5")
+        (4, 5)
+        >>> parse_grade("6 out of 10")
+        (6, 10)
+        >>> parse_grade("N/A") is None
+        True
+    """
+    match = GRADE_PATTERN.match(value)
+    if not match:
+        return None
+    out_of = match["out_of"]
+    return _number(match["grade"]), _number(out_of) if out_of else None
+
 
 def parse_response(text: str) -> tuple[list[dict[str, Any]], dict[str, str]]:
     """
     Parse the response from the LLM to extract criteria and overall feedback.
 
+    The response is read in a single pass, line by line. "Criterion:" starts a
+    new criterion, "Grade:" and "Feedback:" fill it in, and unlabelled lines
+    continue the feedback. Everything from the first "Overall:" line to the
+    end of the response is the overall feedback.
+
     Parameters:
     - text (str): The response string from the LLM.
 
     Returns:
     - Tuple: A tuple containing:
         - List[Dict[str, Any]]: A list of dictionaries for each criterion with keys 'name', 'grade', and 'feedback'.
+          Grades written as "x/y" or "x out of y" also have 'out_of'. Missing grades are 0.
         - Dict[str, str]: A dictionary with the overall feedback.
+
+    Examples:
+        >>> criteria, overall = parse_response(
+        ...     "Criterion: Content\\nGrade: 7.5/10\\nFeedback: Good.\\nOverall: Fine.")
+        >>> criteria
+        [{'name': 'Content', 'grade': 7.5, 'feedback': 'Good.', 'out_of': 10}]
+        >>> overall
+        {'overall': 'Fine.'}
     """
-    # Define regex patterns for criterion, grade, feedback, and overall sections
-    criterion_pattern = re.compile(r"Criterion:\s*(.*)")
-    grade_pattern = re.compile(r"Grade:\s*(\d+)")
-    feedback_pattern = re.compile(r"Feedback:\s*(.*)", re.DOTALL)
-    overall_pattern = re.compile(r"Overall:\s*(.*)", re.DOTALL)
-
-    # Split the text into lines
-    original_lines = text.split("\n")
-    lines = [line.strip() for line in original_lines]
-
-    criteria = []
-    overall = ""
-    current_criterion: dict[str, Any] = {}
-    collecting_feedback = False
-    overall_found = False  # Flag to track if overall has been processed
-
-    for i, line in enumerate(lines):
-        criterion_match = criterion_pattern.match(line)
-        grade_match = grade_pattern.match(line)
-        feedback_match = feedback_pattern.match(line)
-        overall_match = overall_pattern.match(line)
-
-        if criterion_match:
-            if current_criterion:
-                criteria.append(current_criterion)
-                current_criterion = {}
-            current_criterion["name"] = criterion_match.group(1).strip()
-            collecting_feedback = False
-        elif grade_match:
-            current_criterion["grade"] = int(grade_match.group(1))
-            collecting_feedback = False
-        elif feedback_match:
-            current_criterion["feedback"] = feedback_match.group(1).strip()
-            collecting_feedback = True
-        elif overall_match and not overall_found:  # Process overall only once
-            if current_criterion:
-                criteria.append(current_criterion)
-                current_criterion = {}
-            overall = overall_match.group(1).strip()
-            overall_index = i + 1
-            for next_line in original_lines[overall_index:]:
-                overall += " " + next_line.strip()
-            overall_found = True  # Set flag to indicate overall has been processed
-            break  # No need to continue after processing overall
-        elif collecting_feedback:
-            current_criterion["feedback"] += " " + line.strip()
-
-    if current_criterion:
-        criteria.append(current_criterion)
+    criteria: list[dict[str, Any]] = []
+    current: dict[str, Any] | None = None
+    # Text parts of the feedback (or overall feedback) being collected, if any.
+    parts: list[str] | None = None
+    overall: list[str] | None = None
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if overall is not None:
+            if line:
+                overall.append(line)
+            continue
+        match = LABEL_PATTERN.match(line)
+        if match is None:
+            if parts is not None and line:
+                parts.append(line)
+            continue
+
+        label = match["label"].lower()
+        value = match["value"].strip()
+        if label == "criterion":
+            current = _new_criterion(value.strip("*_ "))
+            criteria.append(current)
+            parts = None
+        elif label.startswith("overall"):
+            overall = [value] if value else []
+        elif current is None:
+            # A grade or feedback before any criterion has nothing to apply to.
+            parts = None
+        elif label == "grade":
+            grade = parse_grade(value)
+            if grade is not None:
+                current["grade"], out_of = grade
+                if out_of is not None:
+                    current["out_of"] = out_of
+            parts = None
+        else:
+            parts = current["parts"]
+            if value:
+                parts.append(value)
 
     for criterion in criteria:
-        if "grade" not in criterion or not isinstance(criterion["grade"], int):
-            criterion["grade"] = 0
+        criterion["feedback"] = " ".join(criterion.pop("parts"))
+        if "out_of" in criterion:
+            criterion["out_of"] = criterion.pop("out_of")
+
+    return criteria, {"overall": " ".join(overall or [])}
+
+
+def _new_criterion(name: str) -> dict[str, Any]:
+    """Start a criterion with the defaults used when the LLM leaves fields out."""
+    return {"name": name, "grade": 0, "parts": []}
 
-    # Save the overall feedback
-    overall_feedback = {"overall": overall.strip()}
 
-    return criteria, overall_feedback
+def _number(text: str) -> int | float:
+    """Convert a number to an int if it is whole, otherwise to a float."""
+    number = float(text)
+    return int(number) if number.is_integer() else number
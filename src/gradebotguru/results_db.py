@@ -0,0 +1,393 @@
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from gradebotguru.rubric import compile_rubric
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    config_hash TEXT,
+    rubric_hash TEXT NOT NULL,
+    rubric TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    submission_id TEXT NOT NULL,
+    grade REAL,
+    out_of REAL,
+    word_count INTEGER,
+    readability REAL,
+    result TEXT NOT NULL,
+    UNIQUE (run_id, submission_id)
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submission_row INTEGER NOT NULL REFERENCES submissions(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    provider TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    total REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS criterion_grades (
+    submission_row INTEGER NOT NULL REFERENCES submissions(id),
+    response_id INTEGER REFERENCES responses(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    provider TEXT,
+    criterion TEXT NOT NULL,
+    grade REAL NOT NULL,
+    feedback TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_submission
+    ON submissions (submission_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_responses_provider ON responses (provider, run_id);
+CREATE INDEX IF NOT EXISTS idx_responses_submission ON responses (submission_row);
+CREATE INDEX IF NOT EXISTS idx_criterion_grades_provider
+    ON criterion_grades (provider, criterion, run_id);
+CREATE INDEX IF NOT EXISTS idx_criterion_grades_criterion
+    ON criterion_grades (criterion, run_id);
+CREATE INDEX IF NOT EXISTS idx_criterion_grades_submission
+    ON criterion_grades (submission_row);
+"""
+
+# Name of the aggregated grade in the provider column of query results.
+AGGREGATED = "(aggregated)"
+
+
+class ResultsDB:
+    """
+    Embedded SQLite store of grading results, queryable across runs.
+
+    Each run records the rubric it graded with, every submission's result,
+    each provider's individual responses and the grade given for each
+    criterion, both per provider and aggregated. Indexes on submission,
+    criterion and provider keep cross-run questions, such as how one
+    provider scored one criterion over the last few runs, to a single
+    indexed query.
+
+    Results are buffered and written ``batch_size`` at a time in one
+    transaction, so grading is not slowed by a commit per submission.
+
+    Args:
+        path (str): Path to the SQLite database file.
+        batch_size (int): Results buffered before they are written.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._pending: list[tuple[int, dict[str, Any]]] = []
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Write any buffered results and close the database connection."""
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> "ResultsDB":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def start_run(
+        self, rubric: Mapping[str, Mapping[str, Any]], config_hash: str | None = None
+    ) -> int:
+        """
+        Record the start of a grading run.
+
+        Args:
+            rubric (Dict[str, Dict[str, Any]]): The rubric the run grades with.
+            config_hash (Optional[str]): Hash of the grading configuration, see
+                ``incremental.config_hash``.
+
+        Returns:
+            int: The run's ID.
+        """
+        compiled = compile_rubric(rubric)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, config_hash, rubric_hash, rubric) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    time.time(),
+                    config_hash,
+                    compiled.content_hash,
+                    json.dumps(compiled.to_dict()),
+                ),
+            )
+        return int(cursor.lastrowid or 0)
+
+    def finish_run(self, run_id: int) -> None:
+        """
+        Write the run's buffered results and mark it finished.
+
+        Args:
+            run_id (int): The run's ID.
+        """
+        self.flush()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id)
+            )
+
+    def add_result(self, run_id: int, result: dict[str, Any]) -> None:
+        """
+        Buffer a submission's result, writing the buffer once it is full.
+
+        Args:
+            run_id (int): The run's ID.
+            result (Dict[str, Any]): The result from ``grade_submission``.
+        """
+        with self._lock:
+            self._pending.append((run_id, result))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered results in one transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for run_id, result in pending:
+                    self._insert(run_id, result)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _insert(self, run_id: int, result: dict[str, Any]) -> None:
+        """Insert one result and its responses and criterion grades."""
+        self._conn.execute(
+            "DELETE FROM criterion_grades WHERE submission_row IN "
+            "(SELECT id FROM submissions WHERE run_id = ? AND submission_id = ?)",
+            (run_id, result["submission_id"]),
+        )
+        self._conn.execute(
+            "DELETE FROM responses WHERE submission_row IN "
+            "(SELECT id FROM submissions WHERE run_id = ? AND submission_id = ?)",
+            (run_id, result["submission_id"]),
+        )
+        cursor = self._conn.execute(
+            "INSERT OR REPLACE INTO submissions (run_id, submission_id, grade, "
+            "out_of, word_count, readability, result) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id,
+                result["submission_id"],
+                result.get("grade"),
+                result.get("out_of"),
+                result.get("word_count"),
+                result.get("readability"),
+                json.dumps(result, default=str),
+            ),
+        )
+        submission_row = cursor.lastrowid
+        aggregated = result.get("aggregated_response", {}).get("criteria", [])
+        rows: list[tuple[Any, ...]] = [
+            (
+                submission_row,
+                None,
+                run_id,
+                None,
+                c["name"],
+                c["grade"],
+                c.get("feedback"),
+            )
+            for c in aggregated
+        ]
+        for response in result.get("individual_responses", []):
+            provider = str(response["provider_info"].get("model_name", "unknown"))
+            criteria = response.get("criteria", [])
+            cursor = self._conn.execute(
+                "INSERT INTO responses (submission_row, run_id, provider, iteration, "
+                "total) VALUES (?, ?, ?, ?, ?)",
+                (
+                    submission_row,
+                    run_id,
+                    provider,
+                    response.get("iteration", 1),
+                    sum(c["grade"] for c in criteria),
+                ),
+            )
+            rows += [
+                (
+                    submission_row,
+                    cursor.lastrowid,
+                    run_id,
+                    provider,
+                    c["name"],
+                    c["grade"],
+                    c.get("feedback"),
+                )
+                for c in criteria
+            ]
+        self._conn.executemany(
+            "INSERT INTO criterion_grades (submission_row, response_id, run_id, "
+            "provider, criterion, grade, feedback) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def runs(self, last: int | None = None) -> list[dict[str, Any]]:
+        """
+        List recorded runs, most recent first.
+
+        Args:
+            last (Optional[int]): Only the most recent runs, if given.
+
+        Returns:
+            List[Dict[str, Any]]: Each run's 'id', 'started_at', 'finished_at',
+            'rubric_hash' (abbreviated), 'submissions' and 'mean_grade'. Times
+            are local, and 'finished_at' is None for a run that was interrupted.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT runs.id, runs.started_at, runs.finished_at, runs.rubric_hash, "
+                "COUNT(submissions.id), AVG(submissions.grade) FROM runs "
+                "LEFT JOIN submissions ON submissions.run_id = runs.id "
+                "GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?",
+                (-1 if last is None else last,),
+            ).fetchall()
+        return [
+            {
+                "id": run_id,
+                "started_at": _timestamp(started_at),
+                "finished_at": _timestamp(finished_at),
+                "rubric_hash": rubric_hash[:12],
+                "submissions": submissions,
+                "mean_grade": mean_grade,
+            }
+            for run_id, started_at, finished_at, rubric_hash, submissions, mean_grade in rows
+        ]
+
+    def criterion_stats(
+        self,
+        criterion: str | None = None,
+        provider: str | None = None,
+        last: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Summarise the grades given per run, provider and criterion.
+
+        Args:
+            criterion (Optional[str]): Only this criterion.
+            provider (Optional[str]): Only this provider's model name, or
+                ``AGGREGATED`` for the aggregated grades.
+            last (Optional[int]): Only the most recent runs.
+
+        Returns:
+            List[Dict[str, Any]]: 'run_id', 'provider', 'criterion', 'count',
+            'mean', 'min' and 'max' for each combination, most recent run first.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        if criterion is not None:
+            clauses.append("criterion = ?")
+            params.append(criterion)
+        if provider == AGGREGATED:
+            clauses.append("provider IS NULL")
+        elif provider is not None:
+            clauses.append("provider = ?")
+            params.append(provider)
+        if last is not None:
+            clauses.append("run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)")
+            params.append(last)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, COALESCE(provider, ?), criterion, COUNT(*), "
+                "AVG(grade), MIN(grade), MAX(grade) FROM criterion_grades "
+                f"{where}GROUP BY run_id, provider, criterion "
+                "ORDER BY run_id DESC, provider IS NOT NULL, provider, criterion",
+                (AGGREGATED, *params),
+            ).fetchall()
+        keys = ("run_id", "provider", "criterion", "count", "mean", "min", "max")
+        return [dict(zip(keys, row, strict=True)) for row in rows]
+
+    def submission_history(self, submission_id: str) -> list[dict[str, Any]]:
+        """
+        List a submission's grades across runs, most recent first.
+
+        Args:
+            submission_id (str): The ID of the student submission.
+
+        Returns:
+            List[Dict[str, Any]]: 'run_id', 'grade', 'out_of' and 'criteria'
+            (aggregated grades keyed by criterion) for each run that graded it.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT submissions.run_id, submissions.grade, submissions.out_of, "
+                "criterion_grades.criterion, criterion_grades.grade FROM submissions "
+                "LEFT JOIN criterion_grades ON criterion_grades.submission_row = "
+                "submissions.id AND criterion_grades.provider IS NULL "
+                "WHERE submissions.submission_id = ? ORDER BY submissions.run_id DESC",
+                (submission_id,),
+            ).fetchall()
+        history: dict[int, dict[str, Any]] = {}
+        for run_id, grade, out_of, criterion, criterion_grade in rows:
+            entry = history.setdefault(
+                run_id,
+                {"run_id": run_id, "grade": grade, "out_of": out_of, "criteria": {}},
+            )
+            if criterion is not None:
+                entry["criteria"][criterion] = criterion_grade
+        return list(history.values())
+
+
+def format_table(rows: list[dict[str, Any]]) -> str:
+    """
+    Render query results as an aligned text table.
+
+    Args:
+        rows (List[Dict[str, Any]]): Rows with the same keys.
+
+    Returns:
+        str: The table, or a note that nothing matched.
+
+    Examples:
+        >>> print(format_table([{"criterion": "Content", "mean": 7.25}]))
+        criterion  mean
+        Content    7.25
+    """
+    if not rows:
+        return "No matching results."
+    cells = [
+        [
+            f"{value:.2f}" if isinstance(value, float) else str(value)
+            for value in row.values()
+        ]
+        for row in rows
+    ]
+    headers = list(rows[0])
+    widths = [
+        max(len(header), *(len(row[index]) for row in cells))
+        for index, header in enumerate(headers)
+    ]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) for cell, width in zip(line, widths, strict=True)
+        ).rstrip()
+        for line in [headers, *cells]
+    )
+
+
+def _timestamp(seconds: float | None) -> str | None:
+    """Render a Unix time as local date and time."""
+    if seconds is None:
+        return None
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
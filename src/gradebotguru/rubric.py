@@ -0,0 +1,150 @@
+import hashlib
+import json
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from types import MappingProxyType
+from typing import Any
+
+
+def normalise_criterion(name: str) -> str:
+    """
+    Normalise a criterion name so names parsed from LLM responses match the rubric.
+
+    Args:
+        name (str): A criterion name.
+
+    Returns:
+        str: The lower-case name with punctuation collapsed to single spaces.
+
+    Examples:
+        >>> normalise_criterion("**Use of Evidence:**")
+        'use of evidence'
+    """
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+class Rubric(Mapping[str, Mapping[str, Any]]):
+    """
+    An immutable, compiled grading rubric.
+
+    A ``Rubric`` behaves like the ``{criterion: {"description", "max_points"}}``
+    mapping used throughout GradeBot Guru, and compares equal to the
+    equivalent dict, but everything derived from the criteria is computed
+    once when it is built instead of for every submission.
+
+    Attributes:
+        prompt_fragment (str): The criteria rendered for ``generate_user_prompt``.
+        max_total (int | float): The sum of the criteria's max points.
+        content_hash (str): SHA-256 of the ordered criteria, usable as a cache key.
+
+    Examples:
+        >>> rubric = Rubric({"Content": {"description": "Quality.", "max_points": 10},
+        ...                  "Clarity": {"max_points": 5}})
+        >>> rubric.prompt_fragment
+        '- Content: Quality. (Max Points: 10) - Clarity:  (Max Points: 5)'
+        >>> rubric.max_total
+        15
+        >>> rubric.lookup("clarity:")
+        'Clarity'
+        >>> rubric == {"Content": {"description": "Quality.", "max_points": 10},
+        ...            "Clarity": {"description": "", "max_points": 5}}
+        True
+    """
+
+    __slots__ = (
+        "_criteria",
+        "_by_normalised",
+        "prompt_fragment",
+        "max_total",
+        "content_hash",
+    )
+
+    def __init__(self, criteria: Mapping[str, Mapping[str, Any]]) -> None:
+        self._criteria: dict[str, Mapping[str, Any]] = {
+            name: MappingProxyType(
+                {
+                    **details,
+                    "description": details.get("description", ""),
+                    "max_points": details["max_points"],
+                }
+            )
+            for name, details in criteria.items()
+        }
+        self._by_normalised = {
+            normalise_criterion(name): name for name in self._criteria
+        }
+        self.prompt_fragment = " ".join(
+            f"- {name}: {details['description']} (Max Points: {details['max_points']})"
+            for name, details in self._criteria.items()
+        )
+        self.max_total = sum(
+            details["max_points"] for details in self._criteria.values()
+        )
+        encoded = json.dumps(self.to_dict(), default=str)
+        self.content_hash = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def __getitem__(self, name: str) -> Mapping[str, Any]:
+        return self._criteria[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._criteria)
+
+    def __len__(self) -> int:
+        return len(self._criteria)
+
+    def __repr__(self) -> str:
+        return f"Rubric({self.to_dict()!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.content_hash)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """The criterion names, in rubric order."""
+        return tuple(self._criteria)
+
+    def lookup(self, name: str) -> str | None:
+        """
+        Find the rubric criterion a parsed criterion name refers to.
+
+        Args:
+            name (str): A criterion name, e.g. as parsed from an LLM response.
+
+        Returns:
+            Optional[str]: The criterion name as written in the rubric, or None.
+        """
+        return self._by_normalised.get(normalise_criterion(name))
+
+    def subset(self, names: Iterable[str]) -> "Rubric":
+        """
+        Build a rubric holding only some of the criteria.
+
+        Args:
+            names (Iterable[str]): The criteria to keep.
+
+        Returns:
+            Rubric: The scoped rubric, in the order given.
+        """
+        return Rubric({name: self._criteria[name] for name in names})
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """
+        Convert the rubric to plain dicts, e.g. for JSON serialisation.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: A mutable copy of the criteria.
+        """
+        return {name: dict(details) for name, details in self._criteria.items()}
+
+
+def compile_rubric(rubric: Mapping[str, Mapping[str, Any]]) -> Rubric:
+    """
+    Compile a rubric mapping, returning it unchanged if it is already compiled.
+
+    Args:
+        rubric (Mapping[str, Mapping[str, Any]]): A rubric dict or ``Rubric``.
+
+    Returns:
+        Rubric: The compiled rubric.
+    """
+    return rubric if isinstance(rubric, Rubric) else Rubric(rubric)
@@ -1,8 +1,10 @@
 import csv
 from typing import Any
 
+from gradebotguru.rubric import Rubric
 
-def load_rubric(file_path: str) -> dict[str, dict[str, Any]]:
+
+def load_rubric(file_path: str) -> Rubric:
     """
     Load and parse a grading rubric from a CSV file.
 
@@ -10,7 +12,7 @@ def load_rubric(file_path: str) -> dict[str, dict[str, Any]]:
         file_path (str): Path to the CSV file containing the rubric.
 
     Returns:
-        Dict[str, Dict[str, Any]]: A dictionary where keys are criteria and values are dictionaries with descriptions and max points.
+        Rubric: The compiled rubric, a read-only mapping where keys are criteria and values are mappings with descriptions and max points.
 
     Examples:
         >>> csv_content = '''criterion,description,max_points
@@ -22,9 +24,11 @@ def load_rubric(file_path: str) -> dict[str, dict[str, Any]]:
         ...     _ = f.write(csv_content)
         >>> rubric = load_rubric('temp_rubric.csv')
         >>> rubric
-        {'Clarity': {'description': 'Clarity of expression and organization.', 'max_points': 5},\
+        Rubric({'Clarity': {'description': 'Clarity of expression and organization.', 'max_points': 5},\
  'Organization': {'description': 'Quality and structure of content.', 'max_points': 10},\
- 'Evidence': {'description': 'Support and relevance of arguments.', 'max_points': 5}}
+ 'Evidence': {'description': 'Support and relevance of arguments.', 'max_points': 5}})
+        >>> rubric.max_total
+        20
         >>> import os; os.remove('temp_rubric.csv')
 
         >>> csv_content = '''criterion,max_points
@@ -36,12 +40,12 @@ def load_rubric(file_path: str) -> dict[str, dict[str, Any]]:
         ...     _ = f.write(csv_content)
         >>> rubric = load_rubric('temp_rubric.csv')
         >>> rubric
-        {'Clarity': {'description': '', 'max_points': 5},\
+        Rubric({'Clarity': {'description': '', 'max_points': 5},\
  'Organization': {'description': '', 'max_points': 10},\
- 'Evidence': {'description': '', 'max_points': 5}}
+ 'Evidence': {'description': '', 'max_points': 5}})
         >>> import os; os.remove('temp_rubric.csv')
     """
-    rubric = {}
+    rubric: dict[str, dict[str, Any]] = {}
     with open(file_path) as file:
         reader = csv.DictReader(file)
         for row in reader:
@@ -54,4 +58,4 @@ def load_rubric(file_path: str) -> dict[str, dict[str, Any]]:
                 "description": description,
                 "max_points": int(max_points) if max_points else 0,
             }
-    return rubric
+    return Rubric(rubric)
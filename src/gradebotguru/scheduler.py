@@ -0,0 +1,200 @@
+import functools
+import logging
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from typing import Any
+
+from gradebotguru.deadline import DeadlineExceeded, deadline_after, propagate_deadline
+from gradebotguru.grader import finalize_submission, run_evaluations
+from gradebotguru.llm_interface.base_llm import BaseLLM
+
+# How long Ollama keeps a model loaded between requests while its batch runs.
+BATCH_KEEP_ALIVE = "30m"
+
+
+def affinity_key(llm: BaseLLM) -> tuple[str, str]:
+    """
+    Identify the loaded model an LLM provider's requests run on.
+
+    Args:
+        llm (BaseLLM): The LLM provider.
+
+    Returns:
+        Tuple[str, str]: The server URL (or the provider name for hosted APIs)
+        and the model name.
+    """
+    info = llm.get_model_info()
+    return str(info.get("server_url", info.get("provider", ""))), str(
+        info.get("model_name", "")
+    )
+
+
+def group_by_model(llms: list[BaseLLM]) -> dict[tuple[str, str], list[int]]:
+    """
+    Group LLM providers that run on the same model of the same server.
+
+    Args:
+        llms (List[BaseLLM]): List of LLM providers.
+
+    Returns:
+        Dict[Tuple[str, str], List[int]]: Provider indices keyed by
+        ``affinity_key``, in the order each model first appears.
+    """
+    groups: dict[tuple[str, str], list[int]] = {}
+    for index, llm in enumerate(llms):
+        groups.setdefault(affinity_key(llm), []).append(index)
+    return groups
+
+
+def grade_by_model(
+    submissions: Mapping[str, str],
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    aggregation_method: str,
+    bias_adjustments: dict[str, float] | None = None,
+    prompt_template: str = "Grade the following student submission based on the rubric provided. The rubric is as follows: \n\n {rubric}. \n\n The student submission is as follows: \n\n {submission}.",
+    summarize_feedback: bool = False,
+    chunked: bool = False,
+    repeat_strategy: str = "sequential",
+    quorum: Mapping[str, float] | None = None,
+    keep_alive: float | str = BATCH_KEEP_ALIVE,
+    max_workers: int = 1,
+    submission_deadline: float | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Grade a batch of submissions one model at a time.
+
+    ``grade_submission`` calls every provider for one submission before
+    moving to the next, so an Ollama server hosting several models swaps
+    them in and out of memory for every essay. Here all evaluations for one
+    (server, model) pair run before the next model is used. Ollama models
+    are kept loaded for the whole batch and unloaded afterwards when another
+    model on the same server is next. The evaluations of each submission
+    are then aggregated exactly as ``grade_submission`` does. A submission
+    no provider answered, e.g. because every circuit breaker is open, is
+    left out of the results rather than given a grade of 0, as is one that
+    runs past its deadline with any model.
+
+    Args:
+        submissions (Mapping[str, str]): Submission texts keyed by submission ID.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        llms (List[BaseLLM]): List of LLM providers.
+        num_repeats: Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+        aggregation_method (str): The method to aggregate grades.
+        bias_adjustments (Optional[Dict[str, float]]): Bias adjustments for specific providers.
+        prompt_template (str): Custom prompt template for LLMs.
+        summarize_feedback (bool): Whether to summarize feedback from all LLMs.
+        chunked (bool): Whether to grade over-long submissions section by section.
+        repeat_strategy (str): How repeats are requested, see ``run_evaluations``.
+        quorum (Optional[Dict[str, float]]): Ignored: every model's evaluations
+            are made while it is loaded, so there are no stragglers to drop.
+        keep_alive (float | str): How long Ollama keeps a model loaded between
+            requests of its batch.
+        max_workers (int): Submissions evaluated at once by each model.
+        submission_deadline (Optional[float]): Seconds allowed for each model's
+            evaluations of a submission, or None for no limit.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Grading results keyed by submission ID, for
+        the submissions at least one provider answered.
+    """
+    # responses[submission_id][provider_index] holds that provider's evaluations.
+    responses: dict[str, dict[int, list[dict[str, Any]]]] = {
+        submission_id: {} for submission_id in submissions
+    }
+    expired: set[str] = set()
+    evaluate = functools.partial(
+        _evaluate_within_deadline,
+        deadline=submission_deadline,
+        rubric=rubric,
+        num_repeats=num_repeats,
+        repeat_each_provider=repeat_each_provider,
+        prompt_template=prompt_template,
+        bias_adjustments=bias_adjustments,
+        chunked=chunked,
+        repeat_strategy=repeat_strategy,
+    )
+    groups = list(group_by_model(llms).items())
+    for position, ((server, model), indices) in enumerate(groups):
+        logging.info(
+            f"Grading {len(submissions)} submission(s) with {model} on {server}."
+        )
+        batch = [llms[index] for index in indices]
+        with ExitStack() as stack:
+            for llm in batch:
+                stack.enter_context(llm.keep_loaded(keep_alive))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for index in indices:
+                    # Carries the batch keep_alive into the worker threads.
+                    evaluations = executor.map(
+                        propagate_deadline(evaluate),
+                        repeat(llms[index]),
+                        submissions.values(),
+                    )
+                    for submission_id, individual_responses in zip(
+                        submissions, evaluations, strict=True
+                    ):
+                        if individual_responses is None:
+                            expired.add(submission_id)
+                        else:
+                            responses[submission_id][index] = individual_responses
+        if any(
+            later_server == server for (later_server, _), _ in groups[position + 1 :]
+        ):
+            _unload(batch)
+
+    results = {}
+    for submission_id, submission in submissions.items():
+        if submission_id in expired:
+            logging.warning(
+                f"Could not grade {submission_id}: Grading deadline exceeded"
+            )
+            continue
+        individual_responses = [
+            response
+            for index in sorted(responses[submission_id])
+            for response in responses[submission_id][index]
+        ]
+        if llms and not individual_responses:
+            logging.warning(
+                f"Could not grade {submission_id}: No LLM provider answered"
+            )
+            continue
+        results[submission_id] = finalize_submission(
+            submission_id,
+            submission,
+            rubric,
+            individual_responses,
+            llms,
+            num_repeats,
+            repeat_each_provider,
+            aggregation_method,
+            summarize_feedback,
+        )
+    return results
+
+
+def _evaluate_within_deadline(
+    llm: BaseLLM, submission: str, deadline: float | None, **options: Any
+) -> list[dict[str, Any]] | None:
+    """One model's evaluations of a submission, or None if they missed the deadline."""
+    try:
+        with deadline_after(deadline):
+            return run_evaluations(llm, submission, **options)[0]
+    except DeadlineExceeded:
+        return None
+
+
+def _unload(batch: list[BaseLLM]) -> None:
+    """Unload a batch's model so the next model on the server has room."""
+    # Every provider in a batch shares one model, so unloading it once is enough.
+    try:
+        batch[0].unload()
+    except Exception as e:
+        model = batch[0].get_model_info().get("model_name")
+        logging.warning(f"Could not unload {model}: {e}")
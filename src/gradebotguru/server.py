@@ -0,0 +1,428 @@
+import functools
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from gradebotguru.deadline import DeadlineExceeded, deadline_after
+from gradebotguru.llm_interface.circuit_breaker import ProviderUnavailableError
+from gradebotguru.rubric import Rubric
+from gradebotguru.rubric_loader import load_rubric
+from gradebotguru.scheduler import grade_by_model
+from gradebotguru.submission_loader import extract_submission
+
+
+class JobError(ValueError):
+    """Raised when a grading request is malformed."""
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_request_rubric(encoded: str) -> Rubric:
+    """Compile a rubric sent with a request, reusing it for identical requests."""
+    return Rubric(json.loads(encoded))
+
+
+class GradingServer:
+    """
+    A local HTTP/JSON API that grades submissions with warm providers.
+
+    Each ``gradebot-guru`` run imports its libraries, builds provider
+    clients and loads the rubric before grading anything. The server does
+    that once and keeps everything warm between requests: the providers
+    (with their hedging latencies and circuit breaker health), the compiled
+    rubric, which is reloaded only when its file changes, and rubrics sent
+    with requests, which are compiled once and cached.
+
+    ``POST /grade`` takes one submission as
+    ``{"submission_id": ..., "submission": <text>}`` or, when
+    ``submissions_dir`` is set, ``{"path": <file in that directory>}`` and
+    returns its result, or a batch as
+    ``{"submissions": [<submission>, ...]}`` and streams one JSON line per
+    submission (``application/x-ndjson``) as each is graded. Either form may
+    include a ``"rubric"`` to use instead of the configured one.
+    ``GET /health`` reports the rubric, providers and job counts.
+
+    Submissions from every request share one pool of ``max_workers``
+    threads, so concurrent requests never grade more than that many
+    submissions at once. With ``affinity`` set, a batch is graded by
+    ``grade_by_model``, one model at a time, as batch runs are.
+
+    Args:
+        grade (Callable[..., Dict[str, Any]]): Grades one submission, e.g.
+            ``grade_submission`` or a triage wrapper.
+        grading_options (Dict[str, Any]): Keyword arguments for ``grade``; the
+            'rubric' is replaced per request.
+        rubric_path (Optional[str]): The configured rubric file, watched for changes.
+        host (str): Interface to listen on.
+        port (int): Port to listen on; 0 picks a free port.
+        max_workers (int): Submissions graded at once across all requests.
+        deadline (Optional[float]): Seconds allowed per submission.
+        affinity (Optional[Dict[str, Any]]): Extra arguments for
+            ``grade_by_model`` to grade batches one model at a time, or None.
+        extraction (Optional[Dict[str, Any]]): 'limits' and 'backends' for
+            submissions sent as file paths.
+        submissions_dir (Optional[str]): The directory submissions sent as file
+            paths are read from. Paths outside it are refused, and without it
+            only submission text is accepted.
+
+    Attributes:
+        stats (Dict[str, int]): Counts of 'graded', 'failed' and 'in_flight'
+            submissions.
+    """
+
+    def __init__(
+        self,
+        grade: Callable[..., dict[str, Any]],
+        grading_options: dict[str, Any],
+        rubric_path: str | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_workers: int = 4,
+        deadline: float | None = None,
+        affinity: dict[str, Any] | None = None,
+        extraction: dict[str, Any] | None = None,
+        submissions_dir: str | None = None,
+    ) -> None:
+        self.grade = grade
+        self.grading_options = grading_options
+        self.rubric_path = rubric_path
+        self.deadline = deadline
+        self.affinity = affinity
+        self.extraction = extraction or {}
+        self.submissions_dir = (
+            None if submissions_dir is None else os.path.realpath(submissions_dir)
+        )
+        self.stats = {"graded": 0, "failed": 0, "in_flight": 0}
+        self._rubric: Mapping[str, Mapping[str, Any]] = grading_options["rubric"]
+        self._rubric_mtime = self._mtime()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="grade"
+        )
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """The server's base URL, e.g. 'http://127.0.0.1:8000'."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> "GradingServer":
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving, close the socket and wait for running jobs."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def serve_forever(self) -> None:
+        """Serve requests from the calling thread until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "GradingServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def rubric(
+        self, override: Mapping[str, Any] | None = None
+    ) -> Mapping[str, Mapping[str, Any]]:
+        """
+        The rubric to grade with.
+
+        Args:
+            override (Optional[Mapping[str, Any]]): A rubric sent with the request.
+
+        Returns:
+            Mapping[str, Mapping[str, Any]]: The compiled request rubric, or the
+            configured rubric, reloaded if its file has changed. If the changed
+            file cannot be loaded, e.g. while it is being edited, the last
+            rubric that loaded is kept.
+
+        Raises:
+            JobError: If the request rubric is invalid.
+        """
+        if override is not None:
+            try:
+                return _compile_request_rubric(json.dumps(override))
+            except (TypeError, KeyError, AttributeError, ValueError) as e:
+                raise JobError(f"Invalid rubric: {e}") from e
+        with self._lock:
+            mtime = self._mtime()
+            if self.rubric_path is not None and mtime != self._rubric_mtime:
+                logging.info(f"Rubric {self.rubric_path} changed; reloading it.")
+                # Tried once per change; saving the file again retries it.
+                self._rubric_mtime = mtime
+                try:
+                    self._rubric = load_rubric(self.rubric_path)
+                except Exception as e:
+                    logging.error(
+                        f"Could not reload rubric {self.rubric_path}: {e}; "
+                        "keeping the previous rubric."
+                    )
+            return self._rubric
+
+    def health(self) -> dict[str, Any]:
+        """The server's rubric, providers and job counts."""
+        rubric = self.rubric()
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            "status": "ok",
+            "rubric": getattr(rubric, "content_hash", None),
+            "providers": [
+                {
+                    **llm.get_model_info(),
+                    **({"state": llm.state} if hasattr(llm, "state") else {}),
+                }
+                for llm in self.grading_options["llms"]
+            ],
+            "jobs": stats,
+        }
+
+    def grade_one(self, body: Mapping[str, Any]) -> dict[str, Any]:
+        """
+        Grade one submission request on the shared pool.
+
+        Args:
+            body (Mapping[str, Any]): The decoded request.
+
+        Returns:
+            Dict[str, Any]: The grading result, or the submission ID and an
+            'error' if it could not be graded.
+
+        Raises:
+            JobError: If the request is malformed.
+        """
+        rubric = self.rubric(body.get("rubric"))
+        submission_id, text, metadata = self._submission(body)
+        return self._executor.submit(
+            self._grade, submission_id, text, metadata, rubric
+        ).result()
+
+    def grade_batch(self, body: Mapping[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Grade a batch request, yielding each result as it is ready.
+
+        Args:
+            body (Mapping[str, Any]): The decoded request, with 'submissions'.
+
+        Returns:
+            Iterator[Dict[str, Any]]: Results, or submission IDs with an 'error',
+            in the order they finish.
+
+        Raises:
+            JobError: If the request is malformed.
+        """
+        items = body.get("submissions")
+        if not isinstance(items, list) or not items:
+            raise JobError("'submissions' must be a non-empty list")
+        rubric = self.rubric(body.get("rubric"))
+        submissions = [self._submission(item) for item in items]
+        if self.affinity is not None:
+            return self._grade_by_model(submissions, rubric)
+        futures: list[Future[dict[str, Any]]] = [
+            self._executor.submit(self._grade, submission_id, text, metadata, rubric)
+            for submission_id, text, metadata in submissions
+        ]
+        return (future.result() for future in as_completed(futures))
+
+    def _grade(
+        self,
+        submission_id: str,
+        text: str,
+        metadata: dict[str, Any] | None,
+        rubric: Mapping[str, Mapping[str, Any]],
+    ) -> dict[str, Any]:
+        """Grade one submission, turning failures into an error record."""
+        self._count("in_flight", 1)
+        try:
+            with deadline_after(self.deadline):
+                result = self.grade(
+                    submission_id=submission_id,
+                    submission=text,
+                    **{**self.grading_options, "rubric": rubric},
+                )
+        except (DeadlineExceeded, ProviderUnavailableError) as e:
+            logging.warning(f"Could not grade {submission_id}: {e}")
+            self._count("failed", 1)
+            return {"submission_id": submission_id, "error": str(e)}
+        except Exception as e:
+            logging.exception(f"Grading {submission_id} failed: {e}")
+            self._count("failed", 1)
+            return {"submission_id": submission_id, "error": str(e)}
+        finally:
+            self._count("in_flight", -1)
+        if metadata is not None and metadata["truncated"]:
+            result["extraction"] = metadata
+        self._count("graded", 1)
+        return result
+
+    def _grade_by_model(
+        self,
+        submissions: list[tuple[str, str, dict[str, Any] | None]],
+        rubric: Mapping[str, Mapping[str, Any]],
+    ) -> Iterator[dict[str, Any]]:
+        """Grade a batch one model at a time as a single job on the shared pool."""
+        options = {**self.grading_options, "rubric": rubric}
+        texts = {submission_id: text for submission_id, text, _ in submissions}
+        self._count("in_flight", len(texts))
+        try:
+            results = self._executor.submit(
+                grade_by_model,
+                texts,
+                **self.affinity or {},
+                submission_deadline=self.deadline,
+                **options,
+            ).result()
+        except Exception as e:
+            logging.exception(f"Grading a batch of {len(texts)} failed: {e}")
+            self._count("failed", len(texts))
+            yield from ({"submission_id": sid, "error": str(e)} for sid in texts)
+            return
+        finally:
+            self._count("in_flight", -len(texts))
+        self._count("graded", len(results))
+        self._count("failed", len(texts) - len(results))
+        for submission_id, _, metadata in submissions:
+            if submission_id not in results:
+                yield {
+                    "submission_id": submission_id,
+                    "error": "No LLM provider answered in time",
+                }
+                continue
+            result = results[submission_id]
+            if metadata is not None and metadata["truncated"]:
+                result["extraction"] = metadata
+            yield result
+
+    def _submission(self, item: Any) -> tuple[str, str, dict[str, Any] | None]:
+        """Read a submission's ID, text and extraction metadata from a request."""
+        if not isinstance(item, dict):
+            raise JobError("Each submission must be a JSON object")
+        if isinstance(item.get("submission"), str):
+            if not isinstance(item.get("submission_id"), str):
+                raise JobError("'submission_id' is required with 'submission'")
+            return item["submission_id"], item["submission"], None
+        if isinstance(item.get("path"), str):
+            path = self._submission_path(item["path"])
+            try:
+                text, metadata = extract_submission(
+                    path,
+                    self.extraction.get("limits"),
+                    self.extraction.get("backends"),
+                )
+            except (OSError, ValueError) as e:
+                raise JobError(f"Cannot read {item['path']}: {e}") from e
+            submission_id = item.get("submission_id") or os.path.basename(path)
+            return submission_id, text, metadata
+        raise JobError("Each submission needs 'submission' text or a 'path'")
+
+    def _submission_path(self, path: str) -> str:
+        """Resolve a submission path under the submissions directory."""
+        if self.submissions_dir is None:
+            raise JobError("Submissions by 'path' are not enabled on this server")
+        resolved = os.path.realpath(os.path.join(self.submissions_dir, path))
+        if os.path.commonpath([resolved, self.submissions_dir]) != self.submissions_dir:
+            raise JobError(f"{path} is outside the submissions directory")
+        return resolved
+
+    def _count(self, key: str, amount: int) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _mtime(self) -> float | None:
+        if self.rubric_path is None:
+            return None
+        try:
+            return os.path.getmtime(self.rubric_path)
+        except OSError:
+            return None
+
+
+def _make_handler(server: GradingServer) -> type[BaseHTTPRequestHandler]:
+    """Build the request handler class bound to a grading server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            path = self.path.split("?")[0].rstrip("/")
+            if path != "/health":
+                self._send(404, {"error": f"Unknown endpoint {path}"})
+                return
+            try:
+                health = server.health()
+            except Exception as e:
+                logging.exception(f"Health check failed: {e}")
+                self._send(500, {"error": str(e)})
+                return
+            self._send(200, health)
+
+        def do_POST(self) -> None:
+            path = self.path.split("?")[0].rstrip("/")
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send(400, {"error": "Invalid JSON"})
+                return
+            if path != "/grade":
+                self._send(404, {"error": f"Unknown endpoint {path}"})
+                return
+            if not isinstance(body, dict):
+                self._send(400, {"error": "Expected a JSON object"})
+                return
+            try:
+                if "submissions" in body:
+                    self._stream(server.grade_batch(body))
+                else:
+                    self._send(200, server.grade_one(body))
+            except JobError as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                logging.exception(f"Request to {path} failed: {e}")
+                self._send(500, {"error": str(e)})
+
+        def _send(self, status: int, payload: dict[str, Any]) -> None:
+            data = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, results: Iterator[dict[str, Any]]) -> None:
+            # The length is unknown up front, so the body ends when the
+            # connection closes.
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            for result in results:
+                self.wfile.write(json.dumps(result, default=str).encode("utf-8"))
+                self.wfile.write(b"\n")
+                self.wfile.flush()
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logging.debug(f"Grading server: {format % args}")
+
+    return Handler
@@ -0,0 +1,222 @@
+import hashlib
+import math
+import statistics
+from collections.abc import Mapping
+from typing import Any
+
+from gradebotguru.incremental import load_results
+
+
+class ShardError(ValueError):
+    """Raised when shard results cannot be merged into a complete cohort."""
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    Parse a shard written as ``index/count``, counting shards from 1.
+
+    Args:
+        spec (str): The shard, e.g. "2/4".
+
+    Returns:
+        Tuple[int, int]: The shard index and the number of shards.
+
+    Raises:
+        ValueError: If the shard is malformed or out of range.
+
+    Examples:
+        >>> parse_shard("2/4")
+        (2, 4)
+    """
+    index, _, count = spec.partition("/")
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard must be written as i/n, e.g. 1/4: {spec}") from None
+    if not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"Shard index must be between 1 and {shard[1]}: {spec}")
+    return shard
+
+
+def shard_of(submission_id: str, count: int) -> int:
+    """
+    The shard a submission belongs to.
+
+    The shard depends only on the submission ID, so every machine agrees on
+    it without coordinating, and adding or removing other files never moves
+    a submission to another shard.
+
+    Args:
+        submission_id (str): The submission's file name.
+        count (int): The number of shards.
+
+    Returns:
+        int: The shard index, from 1 to ``count``.
+
+    Examples:
+        >>> shard_of("essay1.pdf", 1)
+        1
+        >>> shard_of("essay1.pdf", 4) == shard_of("essay1.pdf", 4)
+        True
+    """
+    digest = hashlib.sha256(submission_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def in_shard(submission_id: str, shard: tuple[int, int] | None) -> bool:
+    """
+    Whether a submission is graded by a shard; everything is when unsharded.
+
+    Args:
+        submission_id (str): The submission's file name.
+        shard (Optional[Tuple[int, int]]): The shard index and count, or None.
+
+    Returns:
+        bool: True if the submission belongs to the shard.
+    """
+    return shard is None or shard_of(submission_id, shard[1]) == shard[0]
+
+
+def merge_shards(paths: list[str]) -> tuple[dict[str, Any], list[str]]:
+    """
+    Combine the results files written by each shard of a cohort.
+
+    Every shard from 1 to n must be present exactly once, all graded against
+    the same rubric. Each shard records the files it found, so files that
+    were found but have no result, e.g. because they timed out, are reported.
+
+    Args:
+        paths (List[str]): Results files written with ``--shard``.
+
+    Returns:
+        Tuple[Dict[str, Any], List[str]]: The merged 'rubric', 'results' and
+        'manifest', and the files that have no result.
+
+    Raises:
+        ShardError: If a shard is missing, repeated or inconsistent with the others.
+    """
+    shards: dict[int, tuple[str, dict[str, Any]]] = {}
+    counts = set()
+    for path in paths:
+        data = load_results(path)
+        shard = data.get("shard")
+        if not shard:
+            raise ShardError(f"{path} was not written by a sharded run")
+        if shard["index"] in shards:
+            raise ShardError(
+                f"{path} and {shards[shard['index']][0]} are both shard "
+                f"{shard['index']}/{shard['count']}"
+            )
+        shards[shard["index"]] = (path, data)
+        counts.add(shard["count"])
+    if len(counts) != 1:
+        raise ShardError(f"Shards were split different ways: {sorted(counts)} shards")
+    count = counts.pop()
+    missing_shards = sorted(set(range(1, count + 1)) - set(shards))
+    if missing_shards:
+        raise ShardError(
+            f"Missing shard(s) {', '.join(f'{i}/{count}' for i in missing_shards)}"
+        )
+
+    rubric = shards[1][1]["rubric"]
+    merged: dict[str, Any] = {"rubric": rubric, "results": {}, "manifest": {}}
+    missing: list[str] = []
+    for index in sorted(shards):
+        path, data = shards[index]
+        if data["rubric"] != rubric:
+            raise ShardError(f"{path} was graded against a different rubric")
+        for submission_id in data["results"]:
+            if shard_of(submission_id, count) != index:
+                raise ShardError(
+                    f"{path} has {submission_id}, which belongs to shard "
+                    f"{shard_of(submission_id, count)}/{count}"
+                )
+        merged["results"].update(data["results"])
+        merged["manifest"].update(data["manifest"])
+        missing += [
+            submission_id
+            for submission_id in data["shard"]["files"]
+            if submission_id not in data["results"]
+        ]
+    return merged, sorted(missing)
+
+
+def cohort_stats(
+    results: Mapping[str, Mapping[str, Any]],
+) -> dict[str, Any]:
+    """
+    Summarise the grades of a whole cohort.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Results keyed by submission ID.
+
+    Returns:
+        Dict[str, Any]: 'submissions', 'out_of', the 'grade' distribution and a
+        distribution per criterion under 'criteria', each with 'mean', 'median',
+        'stdev', 'min' and 'max'.
+
+    Examples:
+        >>> stats = cohort_stats({
+        ...     "a": {"grade": 8, "out_of": 10, "aggregated_response": {
+        ...         "criteria": [{"name": "Content", "grade": 8}]}},
+        ...     "b": {"grade": 6, "out_of": 10, "aggregated_response": {
+        ...         "criteria": [{"name": "Content", "grade": 6}]}},
+        ... })
+        >>> stats["grade"]["mean"], stats["criteria"]["Content"]["max"]
+        (7, 8)
+    """
+    criteria: dict[str, list[float]] = {}
+    for result in results.values():
+        for criterion in result["aggregated_response"]["criteria"]:
+            criteria.setdefault(criterion["name"], []).append(criterion["grade"])
+    out_of = {result.get("out_of") for result in results.values()}
+    return {
+        "submissions": len(results),
+        "out_of": out_of.pop() if len(out_of) == 1 else None,
+        "grade": _distribution([result["grade"] for result in results.values()]),
+        "criteria": {name: _distribution(grades) for name, grades in criteria.items()},
+    }
+
+
+def format_cohort_stats(stats: dict[str, Any]) -> str:
+    """
+    Render cohort statistics as text.
+
+    Args:
+        stats (Dict[str, Any]): Output of ``cohort_stats``.
+
+    Returns:
+        str: The report.
+    """
+    out_of = f" / {stats['out_of']:g}" if stats["out_of"] is not None else ""
+    lines = [
+        f"Cohort: {stats['submissions']} submission(s)",
+        f"{'':<20} {'mean':>7} {'median':>7} {'stdev':>7} {'min':>7} {'max':>7}",
+        _format_distribution(f"Grade{out_of}", stats["grade"]),
+    ]
+    lines += [
+        _format_distribution(name, distribution)
+        for name, distribution in stats["criteria"].items()
+    ]
+    return "\n".join(lines)
+
+
+def _distribution(values: list[float]) -> dict[str, float]:
+    """The mean, median, standard deviation, minimum and maximum of some grades."""
+    if not values:
+        return dict.fromkeys(("mean", "median", "stdev", "min", "max"), math.nan)
+    return {
+        "mean": statistics.mean(values),
+        "median": statistics.median(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def _format_distribution(label: str, distribution: dict[str, float]) -> str:
+    values = " ".join(
+        f"{distribution[key]:>7.2f}"
+        for key in ("mean", "median", "stdev", "min", "max")
+    )
+    return f"{label[:20]:<20} {values}"
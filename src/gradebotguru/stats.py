@@ -0,0 +1,27 @@
+import math
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Compute a percentile with linear interpolation between the closest ranks.
+
+    Args:
+        values (List[float]): The measurements.
+        q (float): The percentile, from 0 to 100.
+
+    Returns:
+        float: The percentile, or NaN when there are no values.
+
+    Examples:
+        >>> percentile([1.0, 2.0, 3.0, 4.0], 50)
+        2.5
+        >>> percentile([5.0], 99)
+        5.0
+    """
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
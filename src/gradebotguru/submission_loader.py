@@ -1,4 +1,30 @@
+import io
+import logging
 import os
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO, TYPE_CHECKING, Any
+
+from gradebotguru.chunking import CHARS_PER_TOKEN
+from gradebotguru.docx_reader import iter_docx_paragraphs
+
+if TYPE_CHECKING:
+    from gradebotguru.duplicates import DuplicateIndex
+
+# Formats read as UTF-8 text; PDF and DOCX have their own extractors.
+TEXT_EXTENSIONS = {".txt", ".md", ".py", ".js", ".css", ".html"}
+
+# An extraction backend takes a path or seekable binary stream and the
+# extraction limits, and returns the text and its extraction metadata.
+Extractor = Callable[
+    [str | IO[bytes], dict[str, Any] | None], tuple[str, dict[str, Any]]
+]
+
+# Backends by file extension and name, and the backend used when none is configured.
+EXTRACTION_BACKENDS: dict[str, dict[str, Extractor]] = {}
+DEFAULT_BACKENDS: dict[str, str] = {}
 
 
 def load_text(file_path: str) -> str:
@@ -27,6 +53,9 @@ def load_markdown(file_path: str) -> str:
     """
     Load a Markdown file and return its content as a string.
 
+    The file is read with the default extraction backend for its extension;
+    see ``get_backend``.
+
     Parameters:
     - file_path (str): The path to the Markdown file.
 
@@ -35,19 +64,22 @@ def load_markdown(file_path: str) -> str:
 
     Examples:
     >>> from tempfile import NamedTemporaryFile
-    >>> with NamedTemporaryFile('w', delete=False) as temp_file:
+    >>> with NamedTemporaryFile('w', suffix='.md', delete=False) as temp_file:
     ...     temp_file.write("# Test\\nThis is a test markdown file.")
     >>> load_markdown(temp_file.name)
     '# Test\\nThis is a test markdown file.'
     >>> os.remove(temp_file.name)
     """
-    return load_text(file_path)
+    return extract_submission(file_path)[0]
 
 
 def load_pdf(file_path: str) -> str:
     """
     Load a PDF file and return its text content as a string.
 
+    The file is read with the default extraction backend for its extension;
+    see ``get_backend``.
+
     Parameters:
     - file_path (str): The path to the PDF file.
 
@@ -60,7 +92,7 @@ def load_pdf(file_path: str) -> str:
     Examples:
     >>> from pypdf import PdfWriter
     >>> from tempfile import NamedTemporaryFile
-    >>> pdf_file = NamedTemporaryFile('wb', delete=False)
+    >>> pdf_file = NamedTemporaryFile('wb', suffix='.pdf', delete=False)
     >>> writer = PdfWriter()
     >>> writer.add_blank_page(width=72, height=72)
     >>> writer.write(pdf_file.name)
@@ -69,29 +101,312 @@ def load_pdf(file_path: str) -> str:
     ''
     >>> os.remove(pdf_file.name)
     """
+    return extract_submission(file_path)[0]
+
+
+def iter_pdf_pages(source: str | IO[bytes]) -> Iterator[str]:
+    """
+    Yield the text of a PDF file one page at a time.
+
+    Pages are only extracted as they are consumed, so a caller that stops
+    early never pays for the rest of the document.
+
+    Parameters:
+    - source (str | IO[bytes]): The path to the PDF file, or a seekable binary stream.
+
+    Yields:
+    - str: The text of each page, in order.
+
+    Requires:
+    - pypdf package.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            yield from iter_pdf_pages(file)
+        return
+    reader = _pdf_reader(source)
+    yield from (page.extract_text() or "" for page in reader.pages)
+
+
+def _pdf_reader(stream: IO[bytes]) -> Any:
+    """Open a pypdf reader on a binary stream."""
     try:
         from pypdf import PdfReader
-
-        with open(file_path, "rb") as file:
-            reader = PdfReader(file)
-            return " ".join(page.extract_text() for page in reader.pages)
     except ImportError:
         raise ImportError("pypdf is required to load PDF files")
+    return PdfReader(stream)
+
+
+def collect_text(
+    pages: Iterable[str],
+    limits: dict[str, Any] | None = None,
+    separator: str = " ",
+    total_pages: int | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Join pages of text, stopping as soon as an extraction limit is reached.
+
+    Parameters:
+    - pages (Iterable[str]): The text of each page, usually a lazy iterator.
+    - limits (dict, optional): Any of 'max_pages', 'max_chars', 'max_tokens' and
+      'time_budget' (seconds). The time budget is checked between pages.
+    - separator (str): The string placed between pages.
+    - total_pages (int, optional): The number of pages available, recorded in the
+      metadata and used to tell whether a page or time limit cut anything off.
+
+    Returns:
+    - tuple: The collected text and extraction metadata with 'pages_read',
+      'total_pages', 'characters', 'truncated' and 'truncation_reason'.
+
+    Examples:
+    >>> collect_text(["one", "two", "three"], {"max_pages": 2})[0]
+    'one two'
+    >>> collect_text(["abcdef", "ghi"], {"max_chars": 4})
+    ('abcd', {'pages_read': 1, 'total_pages': None, 'characters': 4, 'truncated': True, 'truncation_reason': 'max_chars'})
+    >>> collect_text(["one", "two"], {"max_pages": 2}, total_pages=2)[1]["truncated"]
+    False
+    """
+    limits = limits or {}
+    max_pages = limits.get("max_pages")
+    max_chars = limits.get("max_chars")
+    if limits.get("max_tokens") is not None:
+        token_chars = limits["max_tokens"] * CHARS_PER_TOKEN
+        max_chars = token_chars if max_chars is None else min(max_chars, token_chars)
+    time_budget = limits.get("time_budget")
+
+    parts: list[str] = []
+    characters = 0
+    reason = None
+    started = time.monotonic()
+    iterator = iter(pages)
+    try:
+        for text in iterator:
+            if parts:
+                characters += len(separator)
+            if max_chars is not None and characters + len(text) > max_chars:
+                text = text[: max(0, max_chars - characters)]
+                reason = "max_chars"
+            parts.append(text)
+            characters += len(text)
+            if reason:
+                break
+            if max_pages is not None and len(parts) >= max_pages:
+                reason = "max_pages"
+                break
+            if time_budget is not None and time.monotonic() - started > time_budget:
+                reason = "time_budget"
+                break
+    finally:
+        # Close lazy page iterators so their files are released straight away.
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+    # Stopping on a page or time limit after the last page cuts nothing off.
+    if reason != "max_chars" and total_pages is not None and len(parts) >= total_pages:
+        reason = None
+    metadata = {
+        "pages_read": len(parts),
+        "total_pages": total_pages,
+        "characters": characters,
+        "truncated": reason is not None,
+        "truncation_reason": reason,
+    }
+    return separator.join(parts), metadata
 
 
-def load_docx(file_path: str) -> str:
+def extract_submission(
+    file_path: str,
+    limits: dict[str, Any] | None = None,
+    backends: dict[str, str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Load a submission file within the given extraction limits.
+
+    Parameters:
+    - file_path (str): The path to the submission file.
+    - limits (dict, optional): Extraction limits, see ``collect_text``.
+    - backends (dict, optional): Backend name per file extension, see ``get_backend``.
+
+    Returns:
+    - tuple: The submission text and its extraction metadata.
+
+    Raises:
+    - ValueError: If the file format or a configured backend is not supported.
+    """
+    return get_backend(file_path, backends)(file_path, limits)
+
+
+def read_submission(
+    stream: IO[bytes],
+    filename: str,
+    limits: dict[str, Any] | None = None,
+    backends: dict[str, str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Extract a submission from a binary stream, choosing the format by file name.
+
+    PDF files are extracted page by page and DOCX files paragraph by
+    paragraph, and extraction stops as soon as a limit is reached; text
+    formats are loaded in full and then cut to the character budget. PDF and
+    DOCX streams must be seekable.
+
+    Parameters:
+    - stream (IO[bytes]): The file content.
+    - filename (str): The file name, used to pick the format.
+    - limits (dict, optional): Extraction limits, see ``collect_text``.
+    - backends (dict, optional): Backend name per file extension, see ``get_backend``.
+
+    Returns:
+    - tuple: The submission text and its extraction metadata.
+
+    Raises:
+    - ValueError: If the file format or a configured backend is not supported.
+
+    Examples:
+    >>> read_submission(io.BytesIO(b"line one\\r\\nline two"), "essay.txt")[0]
+    'line one\\nline two'
+    """
+    return get_backend(filename, backends)(stream, limits)
+
+
+def register_backend(
+    extensions: Iterable[str], name: str, extractor: Extractor, default: bool = False
+) -> None:
+    """
+    Register an extraction backend for one or more file extensions.
+
+    Parameters:
+    - extensions (Iterable[str]): Extensions handled, including the dot, e.g. '.pdf'.
+    - name (str): The name used to select the backend in the configuration.
+    - extractor (Extractor): Takes a path or seekable binary stream and the
+      extraction limits, and returns the text and its extraction metadata.
+    - default (bool): Whether to use this backend when none is configured.
+    """
+    for extension in extensions:
+        EXTRACTION_BACKENDS.setdefault(extension, {})[name] = extractor
+        if default or extension not in DEFAULT_BACKENDS:
+            DEFAULT_BACKENDS[extension] = name
+
+
+def get_backend(filename: str, backends: dict[str, str] | None = None) -> Extractor:
+    """
+    Look up the extraction backend for a file.
+
+    Parameters:
+    - filename (str): The file name or path, used to pick the format.
+    - backends (dict, optional): Backend name per extension, as in the
+      'extraction_backends' configuration key; extensions may omit the dot.
+
+    Returns:
+    - Extractor: The extraction function.
+
+    Raises:
+    - ValueError: If the file format or the configured backend is not supported.
+
+    Examples:
+    >>> get_backend("essay.pdf", {"pdf": "pypdf2"}).__name__
+    '_extract_pdf_pypdf2'
+    >>> get_backend("essay.pdf", {"pdf": "pdfminer"})
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown extraction backend for .pdf: pdfminer (available: pypdf, pypdf2)
+    """
+    _, file_extension = os.path.splitext(filename)
+    extension = file_extension.lower()
+    available = EXTRACTION_BACKENDS.get(extension)
+    if not available:
+        raise ValueError(f"Unsupported file format: {file_extension}")
+    configured = {
+        f".{key.lower().lstrip('.')}": value for key, value in (backends or {}).items()
+    }
+    name = configured.get(extension, DEFAULT_BACKENDS[extension])
+    if name not in available:
+        raise ValueError(
+            f"Unknown extraction backend for {extension}: {name} "
+            f"(available: {', '.join(sorted(available))})"
+        )
+    return available[name]
+
+
+def _extract_pdf_pypdf(
+    source: str | IO[bytes], limits: dict[str, Any] | None
+) -> tuple[str, dict[str, Any]]:
+    """Extract a PDF page by page with pypdf."""
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            return _extract_pdf_pypdf(file, limits)
+    reader = _pdf_reader(source)
+    pages = (page.extract_text() or "" for page in reader.pages)
+    return collect_text(pages, limits, total_pages=len(reader.pages))
+
+
+def _extract_pdf_pypdf2(
+    source: str | IO[bytes], limits: dict[str, Any] | None
+) -> tuple[str, dict[str, Any]]:
+    """Extract a PDF page by page with PyPDF2."""
+    try:
+        import PyPDF2
+    except ImportError:
+        raise ImportError("PyPDF2 is required for the pypdf2 extraction backend")
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            return _extract_pdf_pypdf2(file, limits)
+    reader = PyPDF2.PdfReader(source)
+    pages = (page.extract_text() or "" for page in reader.pages)
+    return collect_text(pages, limits, total_pages=len(reader.pages))
+
+
+def _extract_docx_stream(
+    source: str | IO[bytes], limits: dict[str, Any] | None
+) -> tuple[str, dict[str, Any]]:
+    """Extract a DOCX by streaming its XML, falling back to python-docx."""
+    # Paragraphs are not pages, so only the size and time limits apply.
+    paragraph_limits = {k: v for k, v in (limits or {}).items() if k != "max_pages"}
+    return collect_text(iter_docx_text(source), paragraph_limits, separator="\n")
+
+
+def _extract_docx_python_docx(
+    source: str | IO[bytes], limits: dict[str, Any] | None
+) -> tuple[str, dict[str, Any]]:
+    """Extract the body paragraphs of a DOCX with python-docx."""
+    try:
+        import docx
+    except ImportError:
+        raise ImportError("python-docx is required to load DOCX files")
+    paragraphs = (paragraph.text for paragraph in docx.Document(source).paragraphs)
+    paragraph_limits = {k: v for k, v in (limits or {}).items() if k != "max_pages"}
+    return collect_text(paragraphs, paragraph_limits, separator="\n")
+
+
+def _extract_text(
+    source: str | IO[bytes], limits: dict[str, Any] | None
+) -> tuple[str, dict[str, Any]]:
+    """Read a UTF-8 text file in full."""
+    if isinstance(source, str):
+        return collect_text([load_text(source)], limits, total_pages=1)
+    wrapper = io.TextIOWrapper(source, encoding="utf-8")
+    try:
+        text = wrapper.read()
+    finally:
+        # Leave the caller's stream open.
+        wrapper.detach()
+    return collect_text([text], limits, total_pages=1)
+
+
+def load_docx(file_path: str | IO[bytes]) -> str:
     """
     Load a DOCX file and return its text content as a string.
 
+    Paragraphs, table rows, footnotes, endnotes, headers and footers are each
+    put on their own line; see ``iter_docx_text``.
+
     Parameters:
-    - file_path (str): The path to the DOCX file.
+    - file_path (str | IO[bytes]): The path to the DOCX file, or a seekable binary stream.
 
     Returns:
     - str: The text content of the DOCX file.
 
-    Requires:
-    - python-docx package.
-
     Examples:
     >>> import docx
     >>> from tempfile import NamedTemporaryFile
@@ -103,19 +418,53 @@ def load_docx(file_path: str) -> str:
     'This is a test DOCX file.'
     >>> os.remove(docx_file.name)
     """
+    return "\n".join(iter_docx_text(file_path))
+
+
+def iter_docx_text(source: str | IO[bytes]) -> Iterator[str]:
+    """
+    Yield the text of a DOCX file paragraph by paragraph.
+
+    The package XML is streamed with ``iter_docx_paragraphs``. If that fails
+    because the package does not have the standard layout, the file is read
+    with python-docx instead, which only covers body paragraphs.
+
+    Parameters:
+    - source (str | IO[bytes]): The path to the DOCX file, or a seekable binary stream.
+
+    Yields:
+    - str: The text of each paragraph.
+
+    Requires:
+    - python-docx package, for the fallback only.
+    """
+    yielded = False
     try:
-        import docx
+        for text in iter_docx_paragraphs(source):
+            yielded = True
+            yield text
+        return
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        if yielded:
+            raise
+        logging.debug(f"Streaming DOCX extraction failed, using python-docx: {e}")
 
-        doc = docx.Document(file_path)
-        return " ".join(paragraph.text for paragraph in doc.paragraphs)
+    try:
+        import docx
     except ImportError:
         raise ImportError("python-docx is required to load DOCX files")
+    if not isinstance(source, str):
+        source.seek(0)
+    yield from (paragraph.text for paragraph in docx.Document(source).paragraphs)
 
 
 def load_code(file_path: str) -> str:
     """
     Load a code file and return its content as a string.
 
+    The file is read with the default extraction backend for its extension;
+    see ``get_backend``.
+
     Parameters:
     - file_path (str): The path to the code file.
 
@@ -124,21 +473,22 @@ def load_code(file_path: str) -> str:
 
     Examples:
     >>> from tempfile import NamedTemporaryFile
-    >>> with NamedTemporaryFile('w', delete=False) as temp_file:
+    >>> with NamedTemporaryFile('w', suffix='.py', delete=False) as temp_file:
     ...     temp_file.write("print('Hello, world!')")
     >>> load_code(temp_file.name)
     "print('Hello, world!')"
     >>> os.remove(temp_file.name)
     """
-    return load_text(file_path)
+    return extract_submission(file_path)[0]
 
 
-def load_submission(file_path: str) -> str:
+def load_submission(file_path: str, backends: dict[str, str] | None = None) -> str:
     """
     Load a submission file based on its extension and return its content as a string.
 
     Parameters:
     - file_path (str): The path to the submission file.
+    - backends (dict, optional): Backend name per file extension, see ``get_backend``.
 
     Returns:
     - str: The content of the submission file.
@@ -175,30 +525,26 @@ def load_submission(file_path: str) -> str:
     'Unsupported file format: .unsupported'
     >>> os.remove(temp_file.name)
     """
-    _, file_extension = os.path.splitext(file_path)
-    loaders = {
-        ".txt": load_text,
-        ".md": load_markdown,
-        ".pdf": load_pdf,
-        ".docx": load_docx,
-        ".py": load_code,
-        ".js": load_code,
-        ".css": load_code,
-        ".html": load_code,
-    }
-    loader = loaders.get(file_extension.lower())
-    if loader:
-        return loader(file_path)
-    else:
-        raise ValueError(f"Unsupported file format: {file_extension}")
+    return extract_submission(file_path, backends=backends)[0]
 
 
-def load_submissions(directory: str) -> dict[str, str]:
+def load_submissions(
+    directory: str,
+    duplicate_index: "DuplicateIndex | None" = None,
+    limits: dict[str, Any] | None = None,
+    extraction: dict[str, dict[str, Any]] | None = None,
+    backends: dict[str, str] | None = None,
+) -> dict[str, str]:
     """
     Load all submission files in a directory and return their contents as a dictionary.
 
     Parameters:
     - directory (str): The path to the directory containing submission files.
+    - duplicate_index (DuplicateIndex, optional): Index that each loaded submission is added to,
+      so exact and near duplicates can be detected without a second pass over the text.
+    - limits (dict, optional): Extraction limits applied to each file, see ``collect_text``.
+    - extraction (dict, optional): Filled with the extraction metadata of each file.
+    - backends (dict, optional): Backend name per file extension, see ``get_backend``.
 
     Returns:
     - dict: A dictionary where the keys are file names and the values are file contents.
@@ -227,8 +573,19 @@ def load_submissions(directory: str) -> dict[str, str]:
         file_path = os.path.join(directory, filename)
         if os.path.isfile(file_path):
             try:
-                content = load_submission(file_path)
+                content, metadata = extract_submission(file_path, limits, backends)
                 submissions[filename] = content
+                if extraction is not None:
+                    extraction[filename] = metadata
+                if duplicate_index is not None:
+                    duplicate_index.add(filename, content)
             except ValueError as e:
                 print(f"Skipping unsupported file: {filename} - {e}")
     return submissions
+
+
+register_backend([".pdf"], "pypdf", _extract_pdf_pypdf, default=True)
+register_backend([".pdf"], "pypdf2", _extract_pdf_pypdf2)
+register_backend([".docx"], "stream", _extract_docx_stream, default=True)
+register_backend([".docx"], "python-docx", _extract_docx_python_docx)
+register_backend(TEXT_EXTENSIONS, "text", _extract_text, default=True)
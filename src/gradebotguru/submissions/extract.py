@@ -1,7 +1,6 @@
 import os
 
-import docx
-import PyPDF2
+from gradebotguru.submission_loader import load_docx, load_submission
 
 
 def extract_text_from_pdf(pdf_path: str) -> str:
@@ -14,13 +13,7 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     Returns:
         str: Extracted text from the PDF.
     """
-    text = ""
-    with open(pdf_path, "rb") as pdf_file:
-        reader = PyPDF2.PdfReader(pdf_file)
-        for page_num in range(len(reader.pages)):
-            page = reader.pages[page_num]
-            text += page.extract_text()
-    return text
+    return load_submission(pdf_path)
 
 
 def extract_text_from_docx(docx_path: str) -> str:
@@ -33,11 +26,7 @@ def extract_text_from_docx(docx_path: str) -> str:
     Returns:
         str: Extracted text from the DOCX file.
     """
-    doc = docx.Document(docx_path)
-    text = []
-    for para in doc.paragraphs:
-        text.append(para.text)
-    return "\n".join(text)
+    return load_docx(docx_path)
 
 
 def process_files_in_folder(folder_path: str) -> None:
@@ -1,7 +1,15 @@
+import functools
+
 import textstat  # type: ignore[import-untyped]
 from nltk.sentiment import SentimentIntensityAnalyzer  # type: ignore[import-untyped]
 
 
+@functools.cache
+def _sentiment_analyzer() -> SentimentIntensityAnalyzer:
+    """Load the VADER lexicon once and share the analyzer between submissions."""
+    return SentimentIntensityAnalyzer()
+
+
 def analyze_sentiment(text: str) -> dict[str, float]:
     """
     Analyze the sentiment of the given text.
@@ -12,8 +20,7 @@ def analyze_sentiment(text: str) -> dict[str, float]:
     Returns:
         dict: A dictionary containing sentiment scores.
     """
-    sia = SentimentIntensityAnalyzer()
-    sentiment_scores = sia.polarity_scores(text)
+    sentiment_scores = _sentiment_analyzer().polarity_scores(text)
     # Type ignore for the return since nltk doesn't provide type hints
     return sentiment_scores  # type: ignore[no-any-return]
 
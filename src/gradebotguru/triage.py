@@ -0,0 +1,306 @@
+import logging
+import threading
+from collections.abc import Mapping
+from typing import Any
+
+from gradebotguru.grader import (
+    evaluate_submission,
+    finalize_submission,
+    grade_submission,
+)
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.llm_interface.factory import create_llms
+from gradebotguru.llm_interface.hedged_llm import HedgeBudget
+from gradebotguru.llm_interface.replay_llm import Cassette
+from gradebotguru.rubric import compile_rubric
+
+# Configuration sections that wrap the triage model like the other providers.
+WRAPPER_SECTIONS = ("hedging", "circuit_breaker", "replay")
+
+# Serve mode triages submissions on several threads that share one report.
+_stats_lock = threading.Lock()
+
+DEFAULT_TRIAGE_CONFIG: dict[str, Any] = {
+    "provider": {"provider": "ollama", "model": "llama3"},
+    "samples": 2,
+    "grade_boundaries": [50, 65, 75, 85],
+    "boundary_margin": 2.5,
+    "max_spread": 10.0,
+}
+
+
+def get_triage_config(config: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Read the triage settings from the configuration, filling in defaults.
+
+    Args:
+        config (Dict[str, Any]): The loaded configuration.
+
+    Returns:
+        Optional[Dict[str, Any]]: The triage settings, or None if triage is disabled.
+
+    Examples:
+        >>> get_triage_config({}) is None
+        True
+        >>> get_triage_config({"triage": {}})["samples"]
+        2
+        >>> get_triage_config({"triage": {"samples": 3}})["samples"]
+        3
+        >>> get_triage_config({"triage": {"samples": 3}})["boundary_margin"]
+        2.5
+    """
+    if config.get("triage") is None:
+        return None
+    return {**DEFAULT_TRIAGE_CONFIG, **config["triage"]}
+
+
+def create_triage_llm(
+    triage_config: dict[str, Any], config: dict[str, Any], llms: list[BaseLLM]
+) -> BaseLLM:
+    """
+    Create the cheap model used for the first grading pass.
+
+    It is wrapped like the expensive providers by the configuration's
+    hedging, circuit_breaker and replay sections, sharing their hedging
+    budget and replay cassette.
+
+    Args:
+        triage_config (Dict[str, Any]): Settings returned by ``get_triage_config``.
+        config (Dict[str, Any]): The loaded configuration.
+        llms (List[BaseLLM]): The expensive providers, from ``create_llms``.
+
+    Returns:
+        BaseLLM: The triage LLM instance.
+    """
+    settings = {key: config[key] for key in WRAPPER_SECTIONS if key in config}
+    settings["llm_providers"] = [triage_config["provider"]]
+    # Wrapper settings are read through to whichever wrapper holds them.
+    budget = getattr(llms[0], "budget", None) if llms else None
+    cassette = getattr(llms[0], "cassette", None) if llms else None
+    return create_llms(
+        settings,
+        budget=budget if isinstance(budget, HedgeBudget) else None,
+        cassette=cassette if isinstance(cassette, Cassette) else None,
+    )[0]
+
+
+def new_triage_stats() -> dict[str, int]:
+    """
+    Create an empty per-run triage report.
+
+    Returns:
+        Dict[str, int]: Counters updated by ``triage_submission``.
+    """
+    return {
+        "submissions": 0,
+        "escalated": 0,
+        "cheap_calls": 0,
+        "expensive_calls": 0,
+        "expensive_calls_saved": 0,
+    }
+
+
+def escalation_reasons(
+    responses: list[dict[str, Any]],
+    rubric: Mapping[str, Mapping[str, Any]],
+    triage_config: dict[str, Any],
+) -> list[str]:
+    """
+    Decide whether a cheap grade needs to be confirmed by the expensive providers.
+
+    A submission is escalated when any sample failed to parse into the rubric's
+    criteria, when the samples disagree by more than ``max_spread`` percentage
+    points, or when the mean grade lies within ``boundary_margin`` percentage
+    points of a grade boundary.
+
+    Args:
+        responses (List[Dict[str, Any]]): Individual responses from the cheap model.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        triage_config (Dict[str, Any]): Settings returned by ``get_triage_config``.
+
+    Returns:
+        List[str]: Reasons for escalating; empty if the cheap grade can stand.
+
+    Examples:
+        >>> rubric = {"Content": {"max_points": 10}}
+        >>> settings = get_triage_config({"triage": {}})
+        >>> def sample(grade):
+        ...     return {"criteria": [{"name": "Content", "grade": grade}]}
+        >>> escalation_reasons([sample(9), sample(9)], rubric, settings)
+        []
+        >>> escalation_reasons([sample(6.5), sample(6.5)], rubric, settings)
+        ['near grade boundary']
+        >>> escalation_reasons([sample(9), sample(3)], rubric, settings)
+        ['low self-consistency']
+        >>> escalation_reasons([{"criteria": []}, sample(9)], rubric, settings)
+        ['parse failure']
+    """
+    reasons = []
+    compiled = compile_rubric(rubric)
+    complete = []
+    for response in responses:
+        parsed = {
+            compiled.lookup(criterion.get("name", ""))
+            for criterion in response["criteria"]
+        }
+        if set(compiled.names) <= parsed:
+            complete.append(response)
+    if len(complete) < len(responses):
+        reasons.append("parse failure")
+
+    # Only compare samples that graded every criterion; a missing criterion
+    # would otherwise read as a disagreement.
+    out_of = compiled.max_total or 1
+    percentages = [
+        100 * sum(criterion["grade"] for criterion in response["criteria"]) / out_of
+        for response in complete
+    ]
+    if (
+        percentages
+        and max(percentages) - min(percentages) > triage_config["max_spread"]
+    ):
+        reasons.append("low self-consistency")
+
+    if percentages and "parse failure" not in reasons:
+        mean = sum(percentages) / len(percentages)
+        if any(
+            abs(mean - boundary) <= triage_config["boundary_margin"]
+            for boundary in triage_config["grade_boundaries"]
+        ):
+            reasons.append("near grade boundary")
+    return reasons
+
+
+def triage_submission(
+    submission_id: str,
+    submission: str,
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    num_repeats: int,
+    repeat_each_provider: bool,
+    aggregation_method: str,
+    bias_adjustments: dict[str, float] | None = None,
+    prompt_template: str = "Grade the following student submission based on the rubric provided. The rubric is as follows: \n\n {rubric}. \n\n The student submission is as follows: \n\n {submission}.",
+    summarize_feedback: bool = False,
+    chunked: bool = False,
+    repeat_strategy: str = "sequential",
+    quorum: Mapping[str, float] | None = None,
+    *,
+    triage_llm: BaseLLM,
+    triage_config: dict[str, Any],
+    stats: dict[str, int] | None = None,
+) -> dict[str, Any]:
+    """
+    Grade a submission with a cheap model first, escalating only when needed.
+
+    Takes the same arguments as ``grade_submission``; ``llms`` are the
+    expensive providers that are only called for escalated submissions.
+
+    Args:
+        submission_id (str): The ID of the student submission.
+        submission (str): The student submission text.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        llms (List[BaseLLM]): The expensive LLM providers.
+        num_repeats: Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+        aggregation_method (str): The method to aggregate grades.
+        bias_adjustments (Optional[Dict[str, float]]): Bias adjustments for specific providers.
+        prompt_template (str): Custom prompt template for LLMs.
+        summarize_feedback (bool): Whether to summarize feedback from all LLMs.
+        chunked (bool): Whether to grade over-long submissions section by section.
+        repeat_strategy (str): How repeats are requested, see ``run_evaluations``.
+        quorum (Optional[Dict[str, float]]): Quorum settings for escalated
+            submissions, see ``evaluate_quorum``.
+        triage_llm (BaseLLM): The cheap model used for the first pass.
+        triage_config (Dict[str, Any]): Settings returned by ``get_triage_config``.
+        stats (Optional[Dict[str, int]]): Run report from ``new_triage_stats`` to update.
+
+    Returns:
+        Dict[str, Any]: The grading result, with the routing decision under 'triage'.
+    """
+    samples = triage_config["samples"]
+    expensive_calls = len(llms) * (num_repeats if repeat_each_provider else 1)
+    try:
+        cheap_responses = evaluate_submission(
+            submission,
+            rubric,
+            [triage_llm],
+            samples,
+            True,
+            prompt_template,
+            chunked=chunked,
+            repeat_strategy=repeat_strategy,
+        )
+        reasons = escalation_reasons(cheap_responses, rubric, triage_config)
+    except Exception as e:
+        logging.warning(f"Triage model failed for {submission_id}: {e}")
+        cheap_responses, reasons = [], ["triage model error"]
+
+    if stats is not None:
+        with _stats_lock:
+            stats["submissions"] += 1
+            stats["cheap_calls"] += samples
+            if reasons:
+                stats["escalated"] += 1
+                stats["expensive_calls"] += expensive_calls
+            else:
+                stats["expensive_calls_saved"] += expensive_calls
+
+    if reasons:
+        logging.info(f"Escalating {submission_id}: {', '.join(reasons)}.")
+        result = grade_submission(
+            submission_id,
+            submission,
+            rubric,
+            llms,
+            num_repeats,
+            repeat_each_provider,
+            aggregation_method,
+            bias_adjustments,
+            prompt_template,
+            summarize_feedback,
+            chunked,
+            repeat_strategy,
+            quorum,
+        )
+    else:
+        result = finalize_submission(
+            submission_id,
+            submission,
+            rubric,
+            cheap_responses,
+            [triage_llm],
+            samples,
+            True,
+            aggregation_method,
+            summarize_feedback,
+        )
+    result["triage"] = {"escalated": bool(reasons), "reasons": reasons}
+    return result
+
+
+def format_triage_report(stats: dict[str, int]) -> str:
+    """
+    Summarise the escalation rate and provider calls saved in a run.
+
+    Args:
+        stats (Dict[str, int]): Run report from ``new_triage_stats``.
+
+    Returns:
+        str: A one-line report.
+
+    Examples:
+        >>> stats = {"submissions": 4, "escalated": 1, "cheap_calls": 8,
+        ...          "expensive_calls": 3, "expensive_calls_saved": 9}
+        >>> format_triage_report(stats)
+        'Triage: 1/4 submissions escalated (25.0%); 8 cheap calls, 3 expensive calls, 9 expensive calls saved (75.0%).'
+    """
+    submissions = stats["submissions"] or 1
+    total_expensive = stats["expensive_calls"] + stats["expensive_calls_saved"] or 1
+    return (
+        f"Triage: {stats['escalated']}/{stats['submissions']} submissions escalated "
+        f"({100 * stats['escalated'] / submissions:.1f}%); "
+        f"{stats['cheap_calls']} cheap calls, {stats['expensive_calls']} expensive calls, "
+        f"{stats['expensive_calls_saved']} expensive calls saved "
+        f"({100 * stats['expensive_calls_saved'] / total_expensive:.1f}%)."
+    )
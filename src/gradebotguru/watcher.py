@@ -0,0 +1,208 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Any
+
+# inotify event masks, see inotify(7).
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0x00000800
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def snapshot_directory(directory: str) -> dict[str, tuple[float, int]]:
+    """
+    Record the modification time and size of each file in a directory.
+
+    Args:
+        directory (str): The directory to inspect.
+
+    Returns:
+        Dict[str, Tuple[float, int]]: (mtime, size) keyed by file name.
+    """
+    snapshot = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_mtime, stat.st_size)
+    return snapshot
+
+
+class DirectoryWatcher:
+    """
+    Watch a directory for added or modified files across grading passes.
+
+    The watch is armed as soon as the watcher is created, so files uploaded
+    while a grading pass is running are reported by the next ``wait`` rather
+    than missed. Uses inotify on Linux so new uploads are picked up as soon
+    as they are fully written, and falls back to comparing snapshots of file
+    modification times elsewhere or if inotify is unavailable.
+
+    Args:
+        directory (str): The directory to watch.
+        poll_interval (float): Seconds between scans when polling.
+        settle_time (float): Quiet period to wait for before returning changes.
+    """
+
+    def __init__(
+        self, directory: str, poll_interval: float = 5.0, settle_time: float = 1.0
+    ) -> None:
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self._fd = _inotify_watch(directory)
+        self._baseline = snapshot_directory(directory) if self._fd is None else None
+
+    def wait(self, timeout: float | None = None) -> list[str]:
+        """
+        Block until files have changed since the watcher was created or last waited.
+
+        Changes are collected until the directory has been quiet for
+        ``settle_time`` seconds, so a batch of uploads triggers a single
+        grading pass.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait; None waits forever.
+
+        Returns:
+            List[str]: Names of the files that changed, empty on timeout.
+        """
+        if self._fd is not None:
+            return _read_inotify(self._fd, self.settle_time, timeout)
+        changed, self._baseline = _poll_for_changes(
+            self.directory,
+            self.poll_interval,
+            self.settle_time,
+            timeout,
+            self._baseline,
+        )
+        return changed
+
+    def close(self) -> None:
+        """Stop watching the directory."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "DirectoryWatcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def wait_for_changes(
+    directory: str,
+    poll_interval: float = 5.0,
+    settle_time: float = 1.0,
+    timeout: float | None = None,
+) -> list[str]:
+    """
+    Block until files in a directory are added or modified.
+
+    Only changes made after the call are seen; use ``DirectoryWatcher`` to
+    also catch changes made between calls.
+
+    Args:
+        directory (str): The directory to watch.
+        poll_interval (float): Seconds between scans when polling.
+        settle_time (float): Quiet period to wait for before returning.
+        timeout (Optional[float]): Maximum seconds to wait; None waits forever.
+
+    Returns:
+        List[str]: Names of the files that changed, empty on timeout.
+    """
+    with DirectoryWatcher(directory, poll_interval, settle_time) as watcher:
+        return watcher.wait(timeout)
+
+
+def _inotify_watch(directory: str) -> int | None:
+    """Open an inotify descriptor watching ``directory``, or None if unsupported."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK)
+        if fd < 0:
+            return None
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return None
+    except (OSError, AttributeError) as e:
+        logging.debug(f"inotify unavailable, falling back to polling: {e}")
+        return None
+    return int(fd)
+
+
+def _read_inotify(fd: int, settle_time: float, timeout: float | None) -> list[str]:
+    """Collect file names from inotify events until the directory settles."""
+    changed: list[str] = []
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        if changed:
+            wait = settle_time
+        elif deadline is None:
+            wait = None
+        else:
+            wait = max(0.0, deadline - time.monotonic())
+        ready, _, _ = select.select([fd], [], [], wait)
+        if not ready:
+            return changed
+        data = os.read(fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + name_length].rstrip(b"\0")
+            offset += name_length
+            if name and os.fsdecode(name) not in changed:
+                changed.append(os.fsdecode(name))
+
+
+def _poll_for_changes(
+    directory: str,
+    poll_interval: float,
+    settle_time: float,
+    timeout: float | None,
+    baseline: dict[str, tuple[float, int]] | None = None,
+) -> tuple[list[str], dict[str, tuple[float, int]]]:
+    """
+    Detect changes by comparing periodic directory snapshots.
+
+    Returns the changed file names and the snapshot to compare against next.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    if baseline is None:
+        baseline = snapshot_directory(directory)
+    while True:
+        current = snapshot_directory(directory)
+        changed = [
+            name for name, state in current.items() if baseline.get(name) != state
+        ]
+        if changed:
+            # Wait for uploads still in progress to finish before returning.
+            while True:
+                time.sleep(settle_time)
+                settled = snapshot_directory(directory)
+                if settled == current:
+                    break
+                changed += [
+                    name
+                    for name, state in settled.items()
+                    if current.get(name) != state and name not in changed
+                ]
+                current = settled
+            return changed, current
+        if deadline is None:
+            time.sleep(poll_interval)
+        elif time.monotonic() < deadline:
+            time.sleep(max(0.0, min(poll_interval, deadline - time.monotonic())))
+        else:
+            return [], current
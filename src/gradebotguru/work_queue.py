@@ -0,0 +1,576 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from gradebotguru.grader import finalize_submission, run_evaluation
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.rubric import compile_rubric
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    submission_id TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submission_id TEXT NOT NULL REFERENCES submissions(submission_id),
+    provider_index INTEGER NOT NULL,
+    iteration INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    settings_hash TEXT,
+    UNIQUE (submission_id, provider_index, iteration)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_expires);
+"""
+
+# Returns a job to pending under new grading settings (the first parameter).
+RESET_JOB = (
+    "status = 'pending', attempts = 0, worker = NULL, lease_expires = NULL, "
+    "result = NULL, error = NULL, settings_hash = ?"
+)
+
+# Metadata keys holding the settings workers grade with.
+SETTINGS_KEYS = ("rubric", "prompt_template", "chunked")
+
+
+class WorkQueue:
+    """
+    Durable SQLite-backed queue of grading jobs shared by a coordinator and workers.
+
+    Each job is one evaluation of a submission by one provider for one repeat.
+    Workers lease jobs for a limited time; a job whose lease expires (for
+    example because the worker died) becomes claimable again until it has
+    been attempted ``max_attempts`` times.
+
+    Args:
+        path (str): Path to the SQLite database file, typically on shared storage.
+        lease_seconds (float): How long a claimed job stays reserved for a worker.
+        max_attempts (int): Number of attempts before a job is marked as failed.
+    """
+
+    def __init__(
+        self, path: str, lease_seconds: float = 300.0, max_attempts: int = 3
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "settings_hash" not in columns:
+            # Queues created before jobs recorded the settings they were graded with.
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN settings_hash TEXT")
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def set_meta(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serialisable value shared with workers (e.g. the rubric).
+
+        Args:
+            key (str): The metadata key.
+            value (Any): The value to store.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """
+        Read a metadata value stored by the coordinator.
+
+        Args:
+            key (str): The metadata key.
+            default (Any): Value returned when the key is missing.
+
+        Returns:
+            Any: The decoded value.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def enqueue(
+        self,
+        submission_id: str,
+        submission: str,
+        jobs: list[tuple[int, int]],
+        settings_hash: str | None = None,
+    ) -> None:
+        """
+        Add a submission and its (provider_index, iteration) jobs to the queue.
+
+        Enqueuing is idempotent, so a restarted coordinator resumes the
+        existing queue rather than duplicating work. If the submission's text
+        has changed since it was first enqueued, or its jobs were graded with
+        other settings, its jobs are reset to pending so stale results are not
+        reused.
+
+        Args:
+            submission_id (str): The ID of the student submission.
+            submission (str): The student submission text.
+            jobs (List[Tuple[int, int]]): Provider index and iteration for each job.
+            settings_hash (Optional[str]): Hash of the grading settings from
+                ``publish_settings``, or None to leave settings unchecked.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT text FROM submissions WHERE submission_id = ?",
+                    (submission_id,),
+                ).fetchone()
+                if row is not None and row[0] != submission:
+                    logging.info(f"{submission_id} changed; requeuing its jobs.")
+                    self._conn.execute(
+                        f"UPDATE jobs SET {RESET_JOB} WHERE submission_id = ?",
+                        (settings_hash, submission_id),
+                    )
+                elif settings_hash is not None:
+                    cursor = self._conn.execute(
+                        f"UPDATE jobs SET {RESET_JOB} "
+                        "WHERE submission_id = ? AND settings_hash IS NOT ?",
+                        (settings_hash, submission_id, settings_hash),
+                    )
+                    if cursor.rowcount:
+                        logging.info(
+                            f"Grading settings changed; requeuing {submission_id}."
+                        )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO submissions (submission_id, text) VALUES (?, ?)",
+                    (submission_id, submission),
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (submission_id, provider_index, iteration, settings_hash) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (submission_id, index, iteration, settings_hash)
+                        for index, iteration in jobs
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def claim(self, worker_id: str) -> dict[str, Any] | None:
+        """
+        Lease the next available job for a worker.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker.
+
+        Returns:
+            Optional[Dict[str, Any]]: The job with its submission text, or None if
+            nothing is currently claimable.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose lease expired on their final attempt will never complete.
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired') "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT jobs.id, jobs.submission_id, jobs.provider_index, jobs.iteration, "
+                    "jobs.attempts, submissions.text, jobs.settings_hash FROM jobs "
+                    "JOIN submissions USING (submission_id) "
+                    "WHERE jobs.status = 'pending' "
+                    "OR (jobs.status = 'leased' AND jobs.lease_expires < ?) "
+                    "ORDER BY jobs.id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, "
+                    "worker = ?, lease_expires = ? WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return {
+            "id": row[0],
+            "submission_id": row[1],
+            "provider_index": row[2],
+            "iteration": row[3],
+            "attempt": row[4] + 1,
+            "submission": row[5],
+            "settings_hash": row[6],
+        }
+
+    def renew(self, job_id: int, worker_id: str) -> bool:
+        """
+        Extend the lease on a job that is still being worked on.
+
+        Args:
+            job_id (int): The job identifier.
+            worker_id (str): The worker holding the lease.
+
+        Returns:
+            bool: False if the lease was lost to another worker.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: dict[str, Any]) -> bool:
+        """
+        Push the result of a job back to the queue.
+
+        Args:
+            job_id (int): The job identifier.
+            worker_id (str): The worker holding the lease.
+            result (Dict[str, Any]): The individual response produced by the job.
+
+        Returns:
+            bool: False if the lease had already been reassigned, in which case
+            the result is discarded.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result), job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> None:
+        """
+        Release a job after an error so it can be retried.
+
+        Args:
+            job_id (int): The job identifier.
+            worker_id (str): The worker holding the lease.
+            error (str): Description of the error.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, worker = NULL, lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, error, job_id, worker_id),
+            )
+
+    def counts(self) -> dict[str, int]:
+        """
+        Count jobs by status.
+
+        Returns:
+            Dict[str, int]: Number of jobs in each of the pending, leased, done and
+            failed states.
+        """
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def submission_status(self) -> dict[str, dict[str, int]]:
+        """
+        Count jobs by status for each submission.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Status counts keyed by submission ID.
+        """
+        status: dict[str, dict[str, int]] = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT submission_id, status, COUNT(*) FROM jobs GROUP BY submission_id, status"
+            ).fetchall()
+        for submission_id, job_status, count in rows:
+            status.setdefault(submission_id, {})[job_status] = count
+        return status
+
+    def results(self, submission_id: str) -> list[dict[str, Any]]:
+        """
+        Fetch completed results for a submission.
+
+        Args:
+            submission_id (str): The ID of the student submission.
+
+        Returns:
+            List[Dict[str, Any]]: Individual responses ordered by provider, then
+            iteration, matching the order produced by ``evaluate_submission``.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM jobs WHERE submission_id = ? AND status = 'done' "
+                "ORDER BY provider_index, iteration",
+                (submission_id,),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+def plan_jobs(
+    num_providers: int, num_repeats: int, repeat_each_provider: bool
+) -> list[tuple[int, int]]:
+    """
+    List the (provider_index, iteration) jobs needed to grade one submission.
+
+    Args:
+        num_providers (int): Number of configured LLM providers.
+        num_repeats (int): Number of times to repeat the grading process.
+        repeat_each_provider (bool): Whether to repeat grading for each provider.
+
+    Returns:
+        List[Tuple[int, int]]: One entry per evaluation.
+
+    Examples:
+        >>> plan_jobs(2, 3, True)
+        [(0, 1), (0, 2), (0, 3), (1, 1), (1, 2), (1, 3)]
+        >>> plan_jobs(2, 3, False)
+        [(0, 1), (1, 1)]
+    """
+    repeats = num_repeats if repeat_each_provider else 1
+    return [
+        (index, iteration)
+        for index in range(num_providers)
+        for iteration in range(1, repeats + 1)
+    ]
+
+
+def publish_settings(
+    queue: WorkQueue, rubric: Mapping[str, Mapping[str, Any]], config: dict[str, Any]
+) -> str:
+    """
+    Store the settings workers grade with and return their hash.
+
+    Args:
+        queue (WorkQueue): The shared work queue.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        config (Dict[str, Any]): The loaded configuration.
+
+    Returns:
+        str: The hexadecimal digest, to pass to ``WorkQueue.enqueue``.
+    """
+    settings = {
+        "rubric": compile_rubric(rubric).to_dict(),
+        "prompt_template": config["llm_prompt_template"],
+        "chunked": config.get("chunked_grading", False),
+    }
+    encoded = json.dumps(settings, sort_keys=True)
+    digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    for key, value in settings.items():
+        queue.set_meta(key, value)
+    queue.set_meta("settings_hash", digest)
+    return digest
+
+
+def serve_queue(
+    queue: WorkQueue,
+    submissions: dict[str, str],
+    rubric: Mapping[str, Mapping[str, Any]],
+    llms: list[BaseLLM],
+    config: dict[str, Any],
+    poll_interval: float = 2.0,
+) -> dict[str, dict[str, Any]]:
+    """
+    Enqueue grading jobs, wait for workers to process them and aggregate results.
+
+    A submission is aggregated once none of its jobs are pending or leased.
+    If every one of its jobs failed it is left out of the results rather
+    than given a grade of 0.
+
+    Args:
+        queue (WorkQueue): The shared work queue.
+        submissions (Dict[str, str]): Submission texts keyed by submission ID.
+        rubric (Dict[str, Dict[str, Any]]): The grading rubric.
+        llms (List[BaseLLM]): LLM providers, used for weights and summaries.
+        config (Dict[str, Any]): The loaded configuration.
+        poll_interval (float): Seconds to wait between progress checks.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Final results keyed by submission ID, for the
+        submissions at least one job succeeded for.
+    """
+    num_repeats = config["number_of_repeats"]
+    repeat_each_provider = config["repeat_each_provider"]
+    settings_hash = publish_settings(queue, rubric, config)
+    queue.set_meta("num_providers", len(llms))
+
+    jobs = plan_jobs(len(llms), num_repeats, repeat_each_provider)
+    for submission_id, submission_text in submissions.items():
+        queue.enqueue(submission_id, submission_text, jobs, settings_hash)
+    logging.info(
+        f"Enqueued {len(jobs) * len(submissions)} jobs for {len(submissions)} submissions."
+    )
+
+    results: dict[str, dict[str, Any]] = {}
+    failed: list[str] = []
+    while len(results) + len(failed) < len(submissions):
+        for submission_id, status in queue.submission_status().items():
+            if submission_id in results or submission_id in failed:
+                continue
+            if submission_id not in submissions:
+                continue
+            if status.get("pending", 0) or status.get("leased", 0):
+                continue
+            if not status.get("done", 0):
+                logging.error(
+                    f"Could not grade {submission_id}: all {status.get('failed', 0)} "
+                    "job(s) failed"
+                )
+                failed.append(submission_id)
+                continue
+            if status.get("failed", 0):
+                logging.warning(
+                    f"{status['failed']} job(s) failed for {submission_id}; "
+                    "aggregating the responses that completed."
+                )
+            results[submission_id] = finalize_submission(
+                submission_id,
+                submissions[submission_id],
+                rubric,
+                queue.results(submission_id),
+                llms,
+                num_repeats,
+                repeat_each_provider,
+                config["aggregation_method"],
+                config.get("summarize_feedback", True),
+            )
+            logging.info(f"Aggregated results for {submission_id}.")
+        if len(results) + len(failed) < len(submissions):
+            time.sleep(poll_interval)
+
+    if failed:
+        logging.warning(
+            f"{len(failed)} submission(s) failed and were not graded: "
+            f"{', '.join(sorted(failed))}"
+        )
+    return results
+
+
+def run_worker(
+    queue: WorkQueue,
+    llms: list[BaseLLM],
+    worker_id: str | None = None,
+    wait: bool = False,
+    poll_interval: float = 2.0,
+) -> int:
+    """
+    Process jobs from the queue until it is drained.
+
+    A background heartbeat renews the lease while an evaluation is running so
+    long LLM calls are not mistaken for a dead worker.
+
+    Args:
+        queue (WorkQueue): The shared work queue.
+        llms (List[BaseLLM]): LLM providers, in the same order as the coordinator's
+            configuration.
+        worker_id (Optional[str]): Identifier for this worker. Defaults to host and PID.
+        wait (bool): Keep polling for new jobs after the queue is drained.
+        poll_interval (float): Seconds to wait when no job is claimable.
+
+    Returns:
+        int: Number of jobs completed by this worker.
+
+    Raises:
+        ValueError: If the worker's providers do not match the coordinator's.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    num_providers = queue.get_meta("num_providers")
+    if num_providers is not None and num_providers != len(llms):
+        raise ValueError(
+            f"Worker has {len(llms)} providers but the queue expects {num_providers}"
+        )
+
+    completed = 0
+    settings: dict[str, Any] = {}
+    while True:
+        job = queue.claim(worker_id)
+        if job is None:
+            counts = queue.counts()
+            if not wait and counts["pending"] == 0 and counts["leased"] == 0:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        if not settings or job["settings_hash"] != settings["settings_hash"]:
+            # The coordinator published new settings since they were last read.
+            settings = _read_settings(queue)
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_renew_lease,
+            args=(queue, job["id"], worker_id, stop),
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            result = run_evaluation(
+                llms[job["provider_index"]],
+                job["submission"],
+                settings["rubric"],
+                settings["prompt_template"],
+                job["iteration"],
+                settings["chunked"],
+            )
+        except Exception as e:
+            logging.error(f"Job {job['id']} failed on attempt {job['attempt']}: {e}")
+            queue.fail(job["id"], worker_id, str(e))
+        else:
+            if queue.complete(job["id"], worker_id, result):
+                completed += 1
+            else:
+                logging.warning(f"Lease on job {job['id']} was lost; result dropped.")
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    return completed
+
+
+def _read_settings(queue: WorkQueue) -> dict[str, Any]:
+    """Read the grading settings published by the coordinator."""
+    settings = {key: queue.get_meta(key) for key in SETTINGS_KEYS}
+    settings["chunked"] = settings["chunked"] or False
+    settings["settings_hash"] = queue.get_meta("settings_hash")
+    return settings
+
+
+def _renew_lease(
+    queue: WorkQueue, job_id: int, worker_id: str, stop: threading.Event
+) -> None:
+    """Renew a job lease periodically until ``stop`` is set."""
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.renew(job_id, worker_id):
+            return
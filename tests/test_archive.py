@@ -0,0 +1,103 @@
+import io
+import zipfile
+from typing import Any
+
+import docx
+
+from gradebotguru.archive import (
+    iter_archive,
+    load_archive,
+    submission_attempt,
+    submission_id_from_path,
+)
+
+
+def _docx_bytes(text: str) -> bytes:
+    document = docx.Document()
+    document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_load_archive_streams_nested_members(tmp_path: Any) -> None:
+    """
+    Test that folders, nested archives and DOCX members are read from a ZIP.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w") as archive:
+        archive.writestr("extra/notes.md", "# Notes")
+
+    path = tmp_path / "export.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("smithjane_12345_67890_essay.docx", _docx_bytes("Essay"))
+        archive.writestr("group-a/doejohn_LATE_222_333_answer-2.txt", "Answer")
+        archive.writestr("bundle.zip", inner.getvalue())
+        archive.writestr("__MACOSX/._essay.docx", b"\0")
+        archive.writestr("image.png", b"\x89PNG")
+
+    extraction: dict[str, dict[str, Any]] = {}
+    submissions = load_archive(str(path), extraction=extraction)
+
+    assert submissions == {
+        "12345/essay.docx": "Essay",
+        "group-a/222/answer.txt": "Answer",
+        "bundle.zip/extra/notes.md": "# Notes",
+    }
+    assert extraction["12345/essay.docx"]["archive_member"] == (
+        "smithjane_12345_67890_essay.docx"
+    )
+    assert not (tmp_path / "smithjane_12345_67890_essay.docx").exists()
+
+
+def test_latest_canvas_resubmission_is_kept(tmp_path: Any) -> None:
+    """
+    Test that the latest Canvas resubmission is kept whatever the archive order.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    path = tmp_path / "export.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("smithjane_LATE_12345_67892_essay-2.txt", "Third")
+        archive.writestr("smithjane_12345_67891_essay-1.txt", "Second")
+        archive.writestr("smithjane_12345_67890_essay.txt", "First")
+
+    extraction: dict[str, dict[str, Any]] = {}
+    submissions = load_archive(str(path), extraction=extraction)
+
+    assert submissions == {"12345/essay.txt": "Third"}
+    assert extraction["12345/essay.txt"]["archive_member"] == (
+        "smithjane_LATE_12345_67892_essay-2.txt"
+    )
+    assert submission_attempt("essay.txt") < submission_attempt(
+        "smithjane_12345_67890_essay.txt"
+    )
+
+
+def test_iter_archive_applies_extraction_limits(tmp_path: Any) -> None:
+    """
+    Test that extraction limits are applied to archive members.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    path = tmp_path / "export.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("essay.txt", "x" * 100)
+
+    [(_, _, text, metadata)] = iter_archive(str(path), {"max_chars": 10})
+
+    assert text == "x" * 10
+    assert metadata["truncated"]
+
+
+def test_moodle_folders_map_to_participant_ids() -> None:
+    """
+    Test that Moodle per-student folders map to stable participant IDs.
+    """
+    member = "Jane Smith_4021_assignsubmission_file_/drafts/essay.pdf"
+    assert submission_id_from_path(member) == "4021/drafts/essay.pdf"
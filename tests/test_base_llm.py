@@ -1,4 +1,14 @@
-from tests.test_utils import MockLLM
+import threading
+from types import SimpleNamespace
+
+import pytest
+from pytest_mock import MockerFixture
+
+from gradebotguru.grader import run_evaluations
+from gradebotguru.llm_interface.openai_llm import OpenAILLM
+from tests.test_utils import GradingMockLLM, MockLLM
+
+GRADED = "Criterion: Content\nGrade: 7\nFeedback: Fine."
 
 
 def test_generate_text() -> None:
@@ -23,3 +33,134 @@ def test_get_model_info() -> None:
     llm = MockLLM()
     info = llm.get_model_info()
     assert info == {"model_name": "mock-model", "version": "1.0"}
+
+
+def test_get_responses_falls_back_to_individual_requests() -> None:
+    """
+    Test the default get_responses, which sends the prompt once per sample.
+    """
+    llm = GradingMockLLM({"Content": 8})
+
+    responses = llm.get_responses("Grade this.", 3)
+
+    assert len(responses) == 3
+    assert llm.calls == 3
+
+
+def test_openai_get_responses_requests_all_samples_at_once(
+    mocker: MockerFixture,
+) -> None:
+    """
+    Test that OpenAILLM requests several samples with one call using ``n``.
+    """
+    llm = OpenAILLM(api_key="test-key")
+    choices = [
+        SimpleNamespace(message=SimpleNamespace(content=f" Sample {i} "))
+        for i in range(3)
+    ]
+    create = mocker.patch.object(
+        llm.client.chat.completions,
+        "create",
+        return_value=SimpleNamespace(choices=choices),
+    )
+
+    responses = llm.get_responses("Grade this.", 3)
+
+    assert responses == ["Sample 0", "Sample 1", "Sample 2"]
+    create.assert_called_once()
+    assert create.call_args.kwargs["n"] == 3
+
+
+def test_batched_repeat_strategy(mocker: MockerFixture) -> None:
+    """
+    Test that the batched repeat strategy asks for all repeats in one call.
+    """
+    rubric = {"Content": {"description": "Quality.", "max_points": 10}}
+    llm = GradingMockLLM({"Content": 8})
+    get_responses = mocker.spy(llm, "get_responses")
+
+    responses, grades = run_evaluations(
+        llm,
+        "Essay",
+        rubric,
+        3,
+        True,
+        "{rubric} {submission}",
+        None,
+        repeat_strategy="batched",
+    )
+
+    get_responses.assert_called_once()
+    assert get_responses.call_args.args[1] == 3
+    assert [response["iteration"] for response in responses] == [1, 2, 3]
+    assert grades == [8, 8, 8]
+    with pytest.raises(ValueError):
+        run_evaluations(
+            llm,
+            "Essay",
+            rubric,
+            3,
+            True,
+            "{rubric} {submission}",
+            None,
+            repeat_strategy="parallel",
+        )
+
+
+def test_failed_batched_samples_are_not_aggregated(mocker: MockerFixture) -> None:
+    """
+    Test that an API error or an empty sample yields no evaluation rather than
+    a zero grade.
+    """
+    rubric = {"Content": {"description": "Quality.", "max_points": 10}}
+    llm = OpenAILLM(api_key="test-key")
+    create = mocker.patch.object(
+        llm.client.chat.completions, "create", side_effect=RuntimeError("HTTP 500")
+    )
+    assert llm.get_responses("Grade this.", 3) == []
+
+    create.side_effect = None
+    create.return_value = SimpleNamespace(
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(content=GRADED)),
+            SimpleNamespace(message=SimpleNamespace(content="")),
+        ]
+    )
+    responses, grades = run_evaluations(
+        llm,
+        "Essay",
+        rubric,
+        3,
+        True,
+        "{rubric} {submission}",
+        None,
+        repeat_strategy="batched",
+    )
+    assert len(responses) == 1
+    assert grades == [7]
+
+
+def test_last_usage_is_kept_per_thread() -> None:
+    """
+    Test that concurrent requests to one provider each read their own usage.
+    """
+    llm = MockLLM()
+    barrier = threading.Barrier(2)
+    seen: dict[int, dict[str, int] | None] = {}
+
+    def request(tokens: int) -> None:
+        llm.last_usage = {"prompt_tokens": tokens, "completion_tokens": 0}
+        barrier.wait()
+        seen[tokens] = llm.last_usage
+
+    threads = [threading.Thread(target=request, args=(n,)) for n in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {
+        1: {"prompt_tokens": 1, "completion_tokens": 0},
+        2: {"prompt_tokens": 2, "completion_tokens": 0},
+    }
+    assert llm.last_usage is None
@@ -0,0 +1,113 @@
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import gradebotguru
+from gradebotguru.batch import grade_submissions
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {"Content": {"description": "Quality of content.", "max_points": 10}}
+
+
+class DelayedMockLLM(GradingMockLLM):
+    """A grading mock that is slow, or fails, for submissions it recognises."""
+
+    def __init__(self, delays: dict[str, float], failing: str = "") -> None:
+        super().__init__({"Content": 7})
+        self.delays = delays
+        self.failing = failing
+
+    def get_response(self, prompt: str) -> str:
+        if self.failing and self.failing in prompt:
+            raise ValueError("malformed submission")
+        for text, delay in self.delays.items():
+            if text in prompt:
+                time.sleep(delay)
+        return super().get_response(prompt)
+
+
+def test_results_arrive_as_they_complete() -> None:
+    """
+    Test that a fast submission is yielded before a slow one given first,
+    and that callbacks and the summary cover every submission.
+    """
+    llms: list[BaseLLM] = [DelayedMockLLM({"slow essay": 0.2})]
+    seen: list[str] = []
+    progress: list[tuple[int, int | None]] = []
+
+    run = grade_submissions(
+        {"slow.txt": "A slow essay.", "fast.txt": "A fast essay."},
+        RUBRIC,
+        llms,
+        1,
+        False,
+        "simple_average",
+        max_workers=2,
+        on_result=lambda result: seen.append(result["submission_id"]),
+        progress=lambda done, total: progress.append((done, total)),
+        summarize_feedback=False,
+    )
+    results = [result["submission_id"] for result in run]
+
+    assert results == ["fast.txt", "slow.txt"]
+    assert seen == results
+    assert progress == [(1, 2), (2, 2)]
+    assert run.summary["graded"] == 2
+    assert run.summary["failed"] == 0
+    assert run.summary["throughput"] > 0
+    assert run.summary["latency"]["p99"] > run.summary["latency"]["p50"]
+
+
+def test_failures_are_reported_and_the_rest_graded() -> None:
+    """
+    Test that a failing submission goes to on_error and the run carries on.
+    """
+    llms: list[BaseLLM] = [DelayedMockLLM({}, failing="broken")]
+    errors: list[tuple[str, str]] = []
+
+    summary = grade_submissions(
+        [("a.txt", "Fine."), ("b.txt", "A broken essay."), ("c.txt", "Fine too.")],
+        RUBRIC,
+        llms,
+        1,
+        False,
+        "simple_average",
+        on_error=lambda submission_id, e: errors.append((submission_id, str(e))),
+        summarize_feedback=False,
+    ).run()
+
+    assert errors == [("b.txt", "malformed submission")]
+    assert summary["submissions"] == 3
+    assert summary["graded"] == 2
+    assert summary["errors"] == {"b.txt": "malformed submission"}
+
+
+def test_generator_input_is_read_as_workers_free_up() -> None:
+    """
+    Test that a generator of submissions is not read far ahead of the workers.
+    """
+    read: list[int] = []
+
+    def submissions() -> Iterator[tuple[str, str]]:
+        for index in range(10):
+            read.append(index)
+            yield f"essay{index}.txt", "An essay."
+
+    llm = GradingMockLLM({"Content": 5})
+    run = gradebotguru.grade_submissions(
+        submissions(),
+        RUBRIC,
+        [llm],
+        1,
+        False,
+        "simple_average",
+        max_workers=1,
+        max_pending=2,
+        summarize_feedback=False,
+    )
+    first: dict[str, Any] = next(iter(run))
+
+    assert first["grade"] == 5
+    assert len(read) <= 3
+    assert run.summary["submissions"] <= 3
@@ -0,0 +1,23 @@
+from typing import Any
+
+from gradebotguru.benchmark import benchmark_backends, format_benchmark
+
+
+def test_benchmark_reports_each_backend(tmp_path: Any) -> None:
+    """
+    Test that every backend for a format in the corpus gets a row with metrics.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "essay.txt").write_text("An essay about grading.")
+    (tmp_path / "notes.bin").write_bytes(b"\0")
+
+    rows = benchmark_backends(str(tmp_path), repeats=1)
+
+    assert [(row["format"], row["backend"]) for row in rows] == [(".txt", "text")]
+    assert rows[0]["files"] == 1
+    assert rows[0]["agreement"] == 1.0
+    assert rows[0]["error"] is None
+    assert "pages/s" in format_benchmark(rows)
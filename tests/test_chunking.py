@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+from pytest_mock import MockerFixture
+
+from gradebotguru.chunking import (
+    chunk_budget,
+    context_length,
+    estimate_tokens,
+    split_into_chunks,
+)
+from gradebotguru.grader import grade_submission
+from gradebotguru.llm_interface.factory import create_llms
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Clarity": {"description": "Clarity of expression.", "max_points": 10},
+}
+TEMPLATE = "Rubric: {rubric}\nSubmission: {submission}"
+
+
+def test_split_into_chunks_respects_budget_and_order() -> None:
+    """
+    Test that sections stay within the token budget and keep the text in order.
+    """
+    paragraphs = [f"Paragraph {i} " + "word " * 40 for i in range(10)]
+    text = "\n\n".join(paragraphs)
+
+    chunks = split_into_chunks(text, 120)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_context_length_prefers_configured_value() -> None:
+    """
+    Test that a configured context length overrides the model-name lookup.
+    """
+    llm = GradingMockLLM({}, name="gpt-4o-2024-05-13")
+    assert context_length(llm) == 128000
+
+    llm.context_length = 4096  # type: ignore[attr-defined]
+    assert context_length(llm) == 4096
+
+
+def test_ollama_context_length_is_sent_as_num_ctx(mocker: MockerFixture) -> None:
+    """
+    Test that Ollama models are budgeted at the server's default window unless
+    a context length is configured, and that a configured one is sent.
+    """
+    default, configured = create_llms(
+        {
+            "llm_providers": [
+                {"provider": "ollama", "model": "llama3"},
+                {"provider": "ollama", "model": "llama3", "context_length": 8192},
+            ]
+        }
+    )
+    assert context_length(default) == 2048
+    assert context_length(configured) == 8192
+
+    chat = mocker.patch.object(
+        configured.client,  # type: ignore[attr-defined]
+        "chat",
+        return_value=SimpleNamespace(message=SimpleNamespace(content="ok")),
+    )
+    configured.get_response("Grade this.")
+    assert chat.call_args.kwargs["options"] == {"num_ctx": 8192}
+
+
+def test_long_submission_is_graded_map_reduce() -> None:
+    """
+    Test that a submission over the context window is graded section by section.
+    """
+    llm = GradingMockLLM({"Content": 7, "Clarity": 8})
+    llm.context_length = 1024  # type: ignore[attr-defined]
+    submission = "\n\n".join("A sentence about the topic. " * 30 for _ in range(20))
+    sections = len(split_into_chunks(submission, chunk_budget(llm, RUBRIC, TEMPLATE)))
+
+    result = grade_submission(
+        "s1",
+        submission,
+        RUBRIC,
+        [llm],
+        1,
+        False,
+        "simple_average",
+        prompt_template=TEMPLATE,
+        chunked=True,
+    )
+
+    assert sections > 1
+    assert llm.calls == sections + 1
+    assert result["grade"] == 15
+    assert result["individual_responses"][0]["sections"] == sections
+
+
+def test_short_submission_uses_a_single_prompt() -> None:
+    """
+    Test that chunked grading leaves submissions that fit the window unchanged.
+    """
+    llm = GradingMockLLM({"Content": 7, "Clarity": 8})
+
+    result = grade_submission(
+        "s1",
+        "A short essay.",
+        RUBRIC,
+        [llm],
+        1,
+        False,
+        "simple_average",
+        prompt_template=TEMPLATE,
+        chunked=True,
+    )
+
+    assert llm.calls == 1
+    assert "sections" not in result["individual_responses"][0]
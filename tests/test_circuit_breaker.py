@@ -0,0 +1,156 @@
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from gradebotguru.grader import grade_submission
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.llm_interface.circuit_breaker import (
+    CircuitBreakerLLM,
+    ProviderUnavailableError,
+    format_health_report,
+)
+from gradebotguru.llm_interface.factory import create_llms
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {"Content": {"description": "Quality of content.", "max_points": 10}}
+
+
+class FlakyMockLLM(GradingMockLLM):
+    """A grading mock that fails while ``down`` is set."""
+
+    def __init__(self, grade: float, name: str, weight: float = 1.0) -> None:
+        super().__init__({"Content": grade}, name)
+        self.weight = weight
+        self.down = False
+
+    def get_response(self, prompt: str) -> str:
+        if self.down:
+            self.calls += 1
+            raise ConnectionError("server unreachable")
+        return super().get_response(prompt)
+
+    def get_model_info(self) -> dict[str, Any]:
+        return {"model_name": self.name, "version": "1.0", "weight": self.weight}
+
+
+def test_breaker_opens_and_sheds_calls() -> None:
+    """
+    Test that consecutive failures open the breaker and later calls fail fast.
+    """
+    llm = FlakyMockLLM(8, "ollama-a")
+    llm.down = True
+    breaker = CircuitBreakerLLM(llm, failure_threshold=2, cooldown=60)
+
+    for _ in range(4):
+        with pytest.raises(ProviderUnavailableError):
+            breaker.get_response("Grade this.")
+
+    assert llm.calls == 2
+    assert breaker.state == "open"
+    assert breaker.shed_calls == 2
+    assert breaker.health.error_rate() == 1.0
+
+
+def test_breaker_closes_after_successful_trial(mocker: MockerFixture) -> None:
+    """
+    Test that after the cooldown one trial call is let through and closes it.
+    """
+    clock = mocker.patch(
+        "gradebotguru.llm_interface.circuit_breaker.time.monotonic", return_value=0.0
+    )
+    llm = FlakyMockLLM(8, "ollama-a")
+    llm.down = True
+    breaker = CircuitBreakerLLM(llm, failure_threshold=1, cooldown=30)
+    with pytest.raises(ProviderUnavailableError):
+        breaker.get_response("Grade this.")
+    assert breaker.state == "open"
+
+    llm.down = False
+    clock.return_value = 31.0
+    assert "Grade: 8" in breaker.get_response("Grade this.")
+    assert breaker.state == "closed"
+    assert "ollama-a: closed" in str(format_health_report([breaker]))
+
+
+def test_empty_response_counts_as_failure() -> None:
+    """
+    Test that an empty response, as OpenAILLM returns on API errors, is a failure.
+    """
+    llm = FlakyMockLLM(8, "gpt")
+    llm.get_response = lambda prompt: ""  # type: ignore[method-assign]
+    breaker = CircuitBreakerLLM(llm)
+
+    with pytest.raises(ProviderUnavailableError, match="empty response"):
+        breaker.get_response("Grade this.")
+    assert breaker.health.consecutive_failures == 1
+
+
+def test_grading_renormalizes_weights_over_answering_providers() -> None:
+    """
+    Test that a shed provider is skipped and weights cover the others only.
+    """
+    down = FlakyMockLLM(0, "down", weight=5.0)
+    down.down = True
+    llms: list[BaseLLM] = [
+        CircuitBreakerLLM(down),
+        CircuitBreakerLLM(FlakyMockLLM(9, "heavy", weight=3.0)),
+        CircuitBreakerLLM(FlakyMockLLM(5, "light", weight=1.0)),
+    ]
+
+    result = grade_submission(
+        "essay.txt", "An essay.", RUBRIC, llms, 1, False, "weighted_average"
+    )
+
+    assert result["grade"] == 8.0
+    assert len(result["individual_responses"]) == 2
+
+
+def test_grading_fails_when_no_provider_answers() -> None:
+    """
+    Test that a submission is not given a grade when every provider is down.
+    """
+    down = FlakyMockLLM(0, "down")
+    down.down = True
+
+    with pytest.raises(ProviderUnavailableError, match="No LLM provider answered"):
+        grade_submission(
+            "essay.txt",
+            "An essay.",
+            RUBRIC,
+            [CircuitBreakerLLM(down)],
+            1,
+            False,
+            "simple_average",
+        )
+
+
+def test_factory_wraps_providers_in_breakers() -> None:
+    """
+    Test that the circuit_breaker configuration wraps every provider.
+    """
+    config = {
+        "llm_providers": [{"provider": "ollama", "model": "llama3"}],
+        "circuit_breaker": {"failure_threshold": 5, "cooldown": 10},
+    }
+    (llm,) = create_llms(config)
+
+    assert isinstance(llm, CircuitBreakerLLM)
+    assert llm.failure_threshold == 5
+    assert llm.cooldown == 10
+    assert llm.model == "llama3"
+
+
+def test_empty_circuit_breaker_section_uses_defaults() -> None:
+    """
+    Test that an empty circuit_breaker section turns breakers on with the defaults.
+    """
+    config: dict[str, Any] = {
+        "llm_providers": [{"provider": "ollama", "model": "llama3"}],
+        "circuit_breaker": {},
+    }
+    (llm,) = create_llms(config)
+
+    assert isinstance(llm, CircuitBreakerLLM)
+    assert llm.failure_threshold == 3
+    assert llm.cooldown == 30.0
@@ -0,0 +1,193 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import openai
+import pytest
+from pytest_mock import MockerFixture
+
+from gradebotguru.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    deadline_after,
+    propagate_deadline,
+    request_timeout,
+)
+from gradebotguru.grader import evaluate_quorum, grade_submission
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.llm_interface.circuit_breaker import CircuitBreakerLLM
+from gradebotguru.llm_interface.local_llm import OllamaLLM
+from gradebotguru.llm_interface.openai_llm import OpenAILLM
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {"Content": {"description": "Quality of content.", "max_points": 10}}
+
+
+class SlowGradingLLM(GradingMockLLM):
+    """A grading mock that takes a fixed time per call."""
+
+    def __init__(self, name: str, delay: float) -> None:
+        super().__init__({"Content": 7}, name)
+        self.delay = delay
+        self.started = 0
+
+    def get_response(self, prompt: str) -> str:
+        self.started += 1
+        time.sleep(self.delay)
+        # Like a provider whose request timed out at the deadline.
+        check_deadline()
+        return super().get_response(prompt)
+
+
+def test_nested_deadline_never_extends_outer() -> None:
+    """
+    Test that an inner deadline is capped by the outer one.
+    """
+    with deadline_after(1.0) as outer:
+        with deadline_after(60.0) as inner:
+            assert inner is outer
+            timeout = request_timeout(30.0)
+            assert timeout is not None and timeout <= 1.0
+        with deadline_after(None) as kept:
+            assert kept is outer
+    assert current_deadline() is None
+    assert request_timeout(30.0) == 30.0
+
+
+def test_deadline_reaches_worker_threads() -> None:
+    """
+    Test that calls submitted to an executor run under the caller's deadline.
+    """
+    seen = []
+    with deadline_after(5.0) as deadline:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(
+                executor.map(
+                    propagate_deadline(lambda _: seen.append(current_deadline())),
+                    range(2),
+                )
+            )
+    assert seen == [deadline, deadline]
+
+
+def test_grading_stops_at_deadline() -> None:
+    """
+    Test that grade_submission raises once its deadline passes, without
+    calling the remaining providers.
+    """
+    slow = [SlowGradingLLM(name, 0.2) for name in ("a", "b", "c")]
+    llms: list[BaseLLM] = list(slow)
+
+    with pytest.raises(DeadlineExceeded):
+        grade_submission(
+            "essay.txt",
+            "An essay.",
+            RUBRIC,
+            llms,
+            1,
+            False,
+            "simple_average",
+            deadline=0.3,
+        )
+
+    assert [llm.started for llm in slow] == [1, 1, 0]
+
+
+def test_quorum_stops_waiting_at_deadline() -> None:
+    """
+    Test that a quorum that cannot be reached in time is abandoned.
+    """
+    llms: list[BaseLLM] = [SlowGradingLLM("a", 0.0), SlowGradingLLM("b", 1.0)]
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        grade_submission(
+            "essay.txt",
+            "An essay.",
+            RUBRIC,
+            llms,
+            1,
+            False,
+            "simple_average",
+            quorum={"size": 2},
+            deadline=0.1,
+        )
+    assert time.perf_counter() - started < 0.5
+
+
+def test_quorum_wait_timeout_is_reported_as_deadline(mocker: MockerFixture) -> None:
+    """
+    Test that as_completed timing out becomes DeadlineExceeded, also where its
+    TimeoutError is not the builtin one, as before Python 3.11.
+    """
+
+    class FuturesTimeoutError(Exception):
+        """Stands in for concurrent.futures.TimeoutError on Python 3.10."""
+
+    def as_completed(*args: Any, **kwargs: Any) -> Any:
+        assert kwargs["timeout"] is not None
+        raise FuturesTimeoutError
+
+    mocker.patch("gradebotguru.grader.FuturesTimeoutError", FuturesTimeoutError)
+    mocker.patch("gradebotguru.grader.as_completed", as_completed)
+    llms: list[BaseLLM] = [GradingMockLLM({"Content": 7})]
+
+    with deadline_after(5), pytest.raises(DeadlineExceeded):
+        evaluate_quorum(
+            "An essay.", RUBRIC, llms, 1, False, "{rubric} {submission}", {}
+        )
+
+
+def test_deadline_does_not_trip_circuit_breaker() -> None:
+    """
+    Test that running out of time is not counted against a provider.
+    """
+    breaker = CircuitBreakerLLM(SlowGradingLLM("a", 0.05), failure_threshold=1)
+
+    with deadline_after(0.01), pytest.raises(DeadlineExceeded):
+        breaker.get_response("Grade this.")
+
+    assert breaker.state == "closed"
+    assert len(breaker.health) == 0
+
+
+def test_ollama_request_timeout_capped_by_deadline(mocker: MockerFixture) -> None:
+    """
+    Test that Ollama requests get the configured timeouts, capped by the deadline.
+    """
+    client = mocker.patch("gradebotguru.llm_interface.local_llm.Client")
+    llm = OllamaLLM("ollama", "http://gpu1:11434", connect_timeout=2, read_timeout=120)
+    assert client.call_args.kwargs["timeout"].read == 120
+    assert client.call_args.kwargs["timeout"].connect == 2
+
+    with deadline_after(10.0):
+        llm.generate_text("Grade this.")
+
+    timeout = client.call_args.kwargs["timeout"]
+    assert timeout.read is not None and timeout.read <= 10.0
+    assert timeout.connect == 2
+
+
+def test_openai_retries_within_deadline(mocker: MockerFixture) -> None:
+    """
+    Test that under a deadline each retry gets the time left and no SDK retries.
+    """
+    llm = OpenAILLM("test", read_timeout=60, max_retries=2)
+    scoped = mocker.patch.object(llm.client, "with_options")
+    create = scoped.return_value.chat.completions.create
+    message = mocker.Mock(content="Grade: 8")
+    create.side_effect = [
+        openai.APIConnectionError(request=mocker.Mock()),
+        mocker.Mock(choices=[mocker.Mock(message=message)], usage=None),
+    ]
+    sleep = mocker.patch("gradebotguru.llm_interface.openai_llm.time.sleep")
+
+    with deadline_after(30.0):
+        assert llm.get_response("Grade this.") == "Grade: 8"
+
+    assert create.call_count == 2
+    sleep.assert_called_once()
+    for call in scoped.call_args_list:
+        assert call.kwargs["max_retries"] == 0
+        assert call.kwargs["timeout"].read <= 30.0
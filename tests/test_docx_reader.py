@@ -0,0 +1,64 @@
+import io
+import zipfile
+from typing import Any
+
+import docx
+
+from gradebotguru.docx_reader import iter_docx_paragraphs
+from gradebotguru.submission_loader import load_docx
+
+
+def _sample_document() -> Any:
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Student 12345"
+    document.add_paragraph("Introduction.")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Name"
+    table.cell(0, 1).text = "Score"
+    table.cell(1, 0).text = "Alice"
+    table.cell(1, 1).text = "9"
+    document.add_paragraph("Conclusion.")
+    return document
+
+
+def test_stream_covers_tables_and_headers(tmp_path: Any) -> None:
+    """
+    Test that tables and headers are extracted in document order.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    path = tmp_path / "essay.docx"
+    _sample_document().save(path)
+
+    assert list(iter_docx_paragraphs(str(path))) == [
+        "Introduction.",
+        "Name\tScore",
+        "Alice\t9",
+        "Conclusion.",
+        "Student 12345",
+    ]
+
+
+def test_load_docx_falls_back_to_python_docx(tmp_path: Any) -> None:
+    """
+    Test that a package without word/document.xml is read with python-docx.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    buffer = io.BytesIO()
+    document = docx.Document()
+    document.add_paragraph("Renamed main part.")
+    document.save(buffer)
+
+    path = tmp_path / "renamed.docx"
+    with zipfile.ZipFile(buffer) as source, zipfile.ZipFile(path, "w") as target:
+        for item in source.infolist():
+            data = source.read(item)
+            if item.filename in ("_rels/.rels", "[Content_Types].xml"):
+                data = data.replace(b"word/document.xml", b"word/main.xml")
+            name = item.filename.replace("word/document.xml", "word/main.xml")
+            target.writestr(name, data)
+
+    assert load_docx(str(path)) == "Renamed main part."
@@ -0,0 +1,102 @@
+from typing import Any
+
+from gradebotguru.duplicates import (
+    DuplicateIndex,
+    flag_near_duplicates,
+    reuse_duplicate_result,
+)
+from gradebotguru.submission_loader import load_submissions
+
+ESSAY = (
+    "Data is a collection of raw facts and figures. Information is data that has "
+    "been processed and given context so that it becomes meaningful. Knowledge is "
+    "the understanding gained from information through experience and learning. "
+    "In information security these distinctions matter because the value of an "
+    "asset, and therefore the controls used to protect it, depends on how it is used "
+    "by the organisation and what harm its disclosure could cause."
+)
+
+
+def test_exact_duplicates_ignore_formatting() -> None:
+    """
+    Test that whitespace and case differences still count as exact duplicates.
+    """
+    index = DuplicateIndex()
+    index.add("essay.docx", ESSAY)
+    index.add("essay.pdf", ESSAY.upper().replace(" ", "\n  "))
+    index.add("other.txt", "A completely different submission about firewalls.")
+
+    assert index.canonical("essay.pdf") == "essay.docx"
+    assert index.canonical("other.txt") == "other.txt"
+    assert index.clusters() == [["essay.docx", "essay.pdf"]]
+
+
+def test_near_duplicates_are_detected() -> None:
+    """
+    Test that a lightly edited copy is found as a near duplicate but not an exact one.
+    """
+    index = DuplicateIndex(threshold=0.6)
+    index.add("original.txt", ESSAY)
+    index.add("edited.txt", ESSAY.replace("raw facts", "unprocessed facts"))
+    index.add("other.txt", "A completely different submission about firewalls.")
+
+    matches = index.near_duplicates("edited.txt")
+    assert [other for other, _ in matches] == ["original.txt"]
+    assert 0.6 <= matches[0][1] < 1.0
+    assert index.canonical("edited.txt") == "edited.txt"
+
+
+def test_duplicate_results_are_shared_and_flagged() -> None:
+    """
+    Test that an exact duplicate reuses a result and both results are flagged.
+    """
+    index = DuplicateIndex()
+    index.add("a.txt", ESSAY)
+    index.add("b.txt", ESSAY)
+    results: dict[str, dict[str, Any]] = {
+        "a.txt": {"submission_id": "a.txt", "grade": 15}
+    }
+    flag_near_duplicates(index, "a.txt", results)
+
+    reused = reuse_duplicate_result(index, "b.txt", results)
+    assert reused is not None
+    assert reused["grade"] == 15
+    assert reused["duplicate_of"] == "a.txt"
+    results["b.txt"] = reused
+    flag_near_duplicates(index, "b.txt", results)
+
+    assert results["a.txt"]["near_duplicates"] == [
+        {"submission_id": "b.txt", "similarity": 1.0}
+    ]
+    assert results["b.txt"]["near_duplicates"] == [
+        {"submission_id": "a.txt", "similarity": 1.0}
+    ]
+    assert reuse_duplicate_result(index, "a.txt", results) is None
+
+
+def test_blank_submissions_are_not_duplicates() -> None:
+    """
+    Test that submissions with no extracted text are not matched or reused.
+    """
+    index = DuplicateIndex()
+    index.add("scan1.pdf", "")
+    index.add("scan2.pdf", "  \n\t ")
+    results: dict[str, dict[str, Any]] = {
+        "scan1.pdf": {"submission_id": "scan1.pdf", "grade": 0}
+    }
+
+    assert index.canonical("scan2.pdf") == "scan2.pdf"
+    assert index.near_duplicates("scan2.pdf") == []
+    assert reuse_duplicate_result(index, "scan2.pdf", results) is None
+    assert index.clusters() == []
+
+
+def test_load_submissions_builds_index(tmp_path: Any) -> None:
+    """
+    Test that load_submissions adds every loaded file to the index.
+    """
+    (tmp_path / "a.txt").write_text(ESSAY)
+    (tmp_path / "b.md").write_text(ESSAY)
+    index = DuplicateIndex()
+    load_submissions(str(tmp_path), index)
+    assert sorted(index.clusters()[0]) == ["a.txt", "b.md"]
@@ -0,0 +1,129 @@
+import json
+import urllib.error
+import urllib.request
+from typing import Any
+
+import pytest
+
+from gradebotguru.fake_server import FakeLLMServer, parse_latency
+from gradebotguru.llm_interface.factory import create_llms
+from gradebotguru.llm_interface.local_llm import OllamaLLM
+from gradebotguru.llm_interface.openai_llm import OpenAILLM
+from gradebotguru.load_test import fake_server_config, run_load_test
+
+RUBRIC = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Clarity": {"description": "Clarity of expression.", "max_points": 5},
+}
+TEMPLATE = "Rubric: {rubric}\nSubmission: {submission}"
+
+
+def post(url: str, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+    """Send a JSON request and return the status and decoded body."""
+    request = urllib.request.Request(
+        url, json.dumps(body).encode(), {"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_clients_get_canned_grading_responses() -> None:
+    """
+    Test that the OpenAI and Ollama clients work against the fake server.
+
+    Grading prompts get a response for every rubric criterion, and OpenAI's
+    ``n`` returns several samples with token usage.
+    """
+    prompt = TEMPLATE.format(
+        rubric="- Content: Quality. (Max Points: 10)", submission=""
+    )
+    with FakeLLMServer(seed=1) as server:
+        openai_llm = OpenAILLM("fake", base_url=f"{server.url}/v1")
+        ollama_llm = OllamaLLM("ollama", server.url, "llama3")
+
+        samples = openai_llm.get_responses(prompt, 3)
+        response = ollama_llm.get_response(prompt)
+
+    assert len(samples) == 3
+    assert all(sample.startswith("Criterion: Content\nGrade: ") for sample in samples)
+    assert openai_llm.last_usage is not None
+    assert response.startswith("Criterion: Content")
+    assert server.stats == {"requests": 2, "ok": 2, "errors": 0, "throttled": 0}
+
+
+def test_error_and_rate_limit_injection() -> None:
+    """
+    Test injected 500s and 429s, and the token-rate limit.
+    """
+    body = {"model": "m", "messages": [{"role": "user", "content": "Hello"}]}
+    with FakeLLMServer(error_rate=1.0) as server:
+        assert post(f"{server.url}/v1/chat/completions", body)[0] == 500
+    with FakeLLMServer(throttle_rate=1.0) as server:
+        assert post(f"{server.url}/api/chat", body)[0] == 429
+    with FakeLLMServer(tokens_per_minute=40) as server:
+        statuses = [post(f"{server.url}/api/chat", body)[0] for _ in range(3)]
+    assert statuses[0] == 200
+    assert statuses[-1] == 429
+    with pytest.raises(ValueError):
+        parse_latency("gaussian:1")
+
+
+def test_load_test_reports_throughput_and_percentiles() -> None:
+    """
+    Test a load test of the full grading pipeline against the fake server.
+    """
+    config = {
+        "llm_providers": [
+            {"provider": "openai", "model": "gpt-4o-mini"},
+            {"provider": "ollama", "model": "llama3"},
+        ]
+    }
+    submissions = {f"essay{i}.txt": f"Essay number {i}." for i in range(6)}
+    with FakeLLMServer(latency="uniform:0:0.01", seed=3) as server:
+        llms = create_llms(fake_server_config(config, server.url))
+        report = run_load_test(
+            submissions,
+            {
+                "rubric": RUBRIC,
+                "llms": llms,
+                "num_repeats": 2,
+                "repeat_each_provider": True,
+                "aggregation_method": "simple_average",
+                "prompt_template": TEMPLATE,
+            },
+            concurrency=3,
+        )
+
+    assert report["failed"] == 0
+    assert report["requests"] == server.stats["ok"] == 6 * 2 * 2
+    assert report["throughput"] > 0
+    assert 0 <= report["latency"]["p50"] <= report["latency"]["p99"]
+    assert report["request_latency"]["p95"] <= report["request_latency"]["p99"]
+
+
+def test_load_test_counts_error_responses_as_failures() -> None:
+    """
+    Test that API errors reported as empty responses count as failed requests
+    and leave their submissions failed.
+    """
+    config = {"llm_providers": [{"provider": "openai", "model": "gpt-4o-mini"}]}
+    submissions = {f"essay{i}.txt": f"Essay number {i}." for i in range(3)}
+    with FakeLLMServer(error_rate=1.0) as server:
+        llms = create_llms(fake_server_config(config, server.url))
+        report = run_load_test(
+            submissions,
+            {
+                "rubric": RUBRIC,
+                "llms": llms,
+                "num_repeats": 1,
+                "repeat_each_provider": False,
+                "aggregation_method": "simple_average",
+                "prompt_template": TEMPLATE,
+            },
+        )
+
+    assert report["failed"] == 3
+    assert report["failed_requests"] == report["requests"] == 3
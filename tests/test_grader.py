@@ -0,0 +1,134 @@
+import time
+from typing import Any
+
+from gradebotguru.grader import aggregate_responses, evaluate_quorum, grade_submission
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {"Content": {"description": "Quality of content.", "max_points": 10}}
+
+
+class WeightedMockLLM(GradingMockLLM):
+    """A grading mock with a weight and a fixed delay per call."""
+
+    def __init__(
+        self, grade: float, name: str, weight: float = 1.0, delay: float = 0.0
+    ) -> None:
+        super().__init__({"Content": grade}, name)
+        self.weight = weight
+        self.delay = delay
+
+    def get_response(self, prompt: str) -> str:
+        time.sleep(self.delay)
+        return super().get_response(prompt)
+
+    def get_model_info(self) -> dict[str, Any]:
+        return {"model_name": self.name, "version": "1.0", "weight": self.weight}
+
+
+def test_quorum_finalizes_without_stragglers() -> None:
+    """
+    Test that agreeing evaluations are used without waiting for a slow provider.
+    """
+    llms: list[BaseLLM] = [
+        WeightedMockLLM(8, "fast-a"),
+        WeightedMockLLM(2, "slow", delay=1.0),
+        WeightedMockLLM(8, "fast-b"),
+    ]
+
+    started = time.perf_counter()
+    result = grade_submission(
+        "essay.txt",
+        "An essay.",
+        RUBRIC,
+        llms,
+        1,
+        False,
+        "simple_average",
+        quorum={"size": 2, "tolerance": 10},
+    )
+
+    assert time.perf_counter() - started < 0.5
+    assert result["grade"] == 8
+    used = [r["provider_info"]["model_name"] for r in result["individual_responses"]]
+    assert used == ["fast-a", "fast-b"]
+    assert result["quorum"]["reached"]
+    assert result["quorum"]["dropped_evaluations"] == [
+        {"provider_info": llms[1].get_model_info(), "iteration": 1}
+    ]
+
+
+def test_quorum_is_reached_despite_an_early_outlier() -> None:
+    """
+    Test that an outlier returned first does not keep agreeing evaluations
+    from forming a quorum, and is reported as dropped.
+    """
+    llms: list[BaseLLM] = [
+        WeightedMockLLM(2, "outlier"),
+        WeightedMockLLM(8, "a", delay=0.05),
+        WeightedMockLLM(8, "b", delay=0.1),
+        WeightedMockLLM(8, "slow", delay=1.5),
+    ]
+
+    started = time.perf_counter()
+    responses, report = evaluate_quorum(
+        "An essay.",
+        RUBRIC,
+        llms,
+        1,
+        False,
+        "{rubric} {submission}",
+        {"size": 2, "tolerance": 10},
+    )
+
+    assert time.perf_counter() - started < 1.0
+    used = [response["provider_info"]["model_name"] for response in responses]
+    assert used == ["a", "b"]
+    assert report == {
+        "size": 2,
+        "reached": True,
+        "dropped_evaluations": [
+            {
+                "provider_info": llms[0].get_model_info(),
+                "iteration": 1,
+                "outlier": True,
+            },
+            {"provider_info": llms[3].get_model_info(), "iteration": 1},
+        ],
+    }
+
+
+def test_quorum_waits_for_all_when_evaluations_disagree() -> None:
+    """
+    Test that every evaluation is used when no quorum agrees within tolerance.
+    """
+    llms: list[BaseLLM] = [
+        WeightedMockLLM(9, "a"),
+        WeightedMockLLM(3, "b"),
+        WeightedMockLLM(6, "c", delay=0.05),
+    ]
+
+    responses, report = evaluate_quorum(
+        "An essay.", RUBRIC, llms, 1, False, "{rubric} {submission}", {"tolerance": 10}
+    )
+
+    assert [response["criteria"][0]["grade"] for response in responses] == [9, 3, 6]
+    assert report == {"size": 2, "reached": False, "dropped_evaluations": []}
+
+
+def test_weighted_average_uses_weights_of_responses_present() -> None:
+    """
+    Test that weights follow each response's provider when some are missing.
+    """
+    heavy = WeightedMockLLM(9, "heavy", weight=3.0)
+    light = WeightedMockLLM(5, "light", weight=1.0)
+    dropped = WeightedMockLLM(0, "dropped", weight=10.0)
+    responses, _ = evaluate_quorum(
+        "An essay.", RUBRIC, [heavy, light], 1, False, "{rubric} {submission}", {}
+    )
+
+    aggregated = aggregate_responses(
+        responses, "weighted_average", [dropped, heavy, light], 1, False, False
+    )
+
+    assert aggregated["criteria"][0]["grade"] == 8.0
@@ -0,0 +1,180 @@
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from gradebotguru.llm_interface.factory import create_llms
+from gradebotguru.llm_interface.hedged_llm import (
+    HedgeBudget,
+    HedgedLLM,
+    LatencyTracker,
+    find_hedge_budget,
+    format_hedging_report,
+)
+from gradebotguru.llm_interface.local_llm import OllamaLLM
+from tests.test_utils import MockLLM
+
+
+class SlowMockLLM(MockLLM):
+    """A mock LLM that takes a scripted number of seconds for each call."""
+
+    def __init__(self, delays: list[float], response: str = "Grade: 8") -> None:
+        self.delays = delays
+        self.response = response
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_response(self, prompt: str) -> str:
+        with self._lock:
+            delay = self.delays[min(self.calls, len(self.delays) - 1)]
+            self.calls += 1
+        time.sleep(delay)
+        if self.response == "error":
+            raise RuntimeError("provider failed")
+        return self.response
+
+
+def warmed_tracker(seconds: float = 0.01) -> LatencyTracker:
+    """A tracker whose p95 is already known and barely moved by a few more calls."""
+    tracker = LatencyTracker(min_samples=5)
+    for _ in range(100):
+        tracker.record(seconds)
+    return tracker
+
+
+def test_no_hedging_before_min_samples() -> None:
+    """
+    Test that requests are not hedged until enough latencies are observed.
+    """
+    llm = SlowMockLLM([0.05])
+    budget = HedgeBudget()
+    hedged = HedgedLLM(llm, budget, tracker=LatencyTracker(min_samples=5))
+
+    assert hedged.get_response("Grade this.") == "Grade: 8"
+    assert llm.calls == 1
+    assert budget.stats["hedged"] == 0
+
+
+def test_slow_request_is_hedged_to_alternate() -> None:
+    """
+    Test that a request slower than p95 is duplicated and the faster answer used.
+    """
+    primary = SlowMockLLM([1.0], response="Grade: 3")
+    alternate = SlowMockLLM([0.0], response="Grade: 9")
+    budget = HedgeBudget()
+    hedged = HedgedLLM(primary, budget, [alternate], warmed_tracker())
+
+    started = time.perf_counter()
+    assert hedged.get_response("Grade this.") == "Grade: 9"
+    assert time.perf_counter() - started < 0.5
+    assert alternate.calls == 1
+    assert budget.stats["hedged"] == 1
+    assert budget.stats["hedge_wins"] == 1
+    assert budget.stats["extra_prompt_tokens"] > 0
+
+
+def test_only_the_unused_response_counts_as_extra_tokens() -> None:
+    """
+    Test that extra completion tokens are those of the response not used,
+    counted when it arrives, and that closing does not wait for it.
+    """
+    primary = SlowMockLLM([0.3], response="x" * 400)
+    alternate = SlowMockLLM([0.0], response="Grade: 9")
+    budget = HedgeBudget()
+    hedged = HedgedLLM(primary, budget, [alternate], warmed_tracker())
+
+    assert hedged.get_response("Grade this.") == "Grade: 9"
+    assert budget.stats["extra_completion_tokens"] == 0
+    started = time.perf_counter()
+    hedged.close()
+    assert time.perf_counter() - started < 0.1
+
+    time.sleep(0.5)
+    assert budget.stats["extra_completion_tokens"] == 100
+
+
+def test_failed_duplicate_falls_back_to_original() -> None:
+    """
+    Test that a duplicate that fails does not replace a slower original.
+    """
+    primary = SlowMockLLM([0.2], response="Grade: 3")
+    alternate = SlowMockLLM([0.0], response="error")
+    budget = HedgeBudget()
+    hedged = HedgedLLM(primary, budget, [alternate], warmed_tracker())
+
+    assert hedged.get_response("Grade this.") == "Grade: 3"
+    assert budget.stats["hedge_wins"] == 0
+
+
+def test_budget_caps_extra_requests() -> None:
+    """
+    Test that no more duplicates are sent once the run's cap is reached.
+    """
+    primary = SlowMockLLM([0.05])
+    budget = HedgeBudget(max_extra_requests=1)
+    hedged = HedgedLLM(primary, budget, tracker=warmed_tracker())
+
+    for _ in range(3):
+        hedged.get_response("Grade this.")
+
+    assert primary.calls == 4
+    assert budget.stats["hedged"] == 1
+    assert budget.stats["budget_exhausted"] == 2
+    assert "cap of 1 reached" in format_hedging_report(budget)
+
+
+def test_factory_wraps_providers_with_shared_budget() -> None:
+    """
+    Test that the hedging configuration wraps every provider with one budget.
+    """
+    config: dict[str, Any] = {
+        "llm_providers": [
+            {
+                "provider": "ollama",
+                "model": "llama3",
+                "server_url": "http://gpu1:11434",
+                "hedge_urls": ["http://gpu2:11434"],
+            },
+            {"provider": "openai", "api_key": "test", "model": "gpt-4o-mini"},
+        ],
+        "hedging": {"max_extra_requests": 5, "percentile": 90},
+    }
+    llms = create_llms(config)
+
+    assert all(isinstance(llm, HedgedLLM) for llm in llms)
+    ollama, openai = llms
+    assert isinstance(ollama, HedgedLLM) and isinstance(openai, HedgedLLM)
+    assert ollama.budget is openai.budget
+    assert find_hedge_budget(llms) is ollama.budget
+    assert ollama.tracker.percentile == 90
+    assert isinstance(ollama.alternates[0], OllamaLLM)
+    assert ollama.alternates[0].server_url == "http://gpu2:11434"
+    assert openai.alternates == [openai.llm]
+    assert find_hedge_budget(create_llms({"llm_providers": []})) is None
+
+
+def test_empty_hedging_section_uses_defaults() -> None:
+    """
+    Test that an empty hedging section turns hedging on with the default settings.
+    """
+    config: dict[str, Any] = {
+        "llm_providers": [{"provider": "ollama", "model": "llama3"}],
+        "hedging": {},
+    }
+    (llm,) = create_llms(config)
+
+    assert isinstance(llm, HedgedLLM)
+    assert llm.budget.max_extra_requests == 100
+    assert llm.tracker.percentile == 95
+
+
+@pytest.mark.parametrize("percentile, expected", [(50, 2.0), (95, 4.0), (0, 1.0)])
+def test_latency_tracker_percentile(percentile: float, expected: float) -> None:
+    """
+    Test the nearest-rank percentile of observed latencies.
+    """
+    tracker = LatencyTracker(percentile=percentile, min_samples=1)
+    for seconds in (4.0, 1.0, 3.0, 2.0):
+        tracker.record(seconds)
+    assert tracker.threshold() == expected
@@ -0,0 +1,147 @@
+from typing import Any
+
+from gradebotguru.grader import grade_submission
+from gradebotguru.incremental import (
+    config_hash,
+    diff_rubrics,
+    load_results,
+    plan_directory,
+    regrade_submission,
+    save_results,
+)
+from tests.test_utils import GradingMockLLM
+
+OLD_RUBRIC = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Clarity": {"description": "Clarity of expression.", "max_points": 5},
+    "Grammar": {"description": "Use of grammar.", "max_points": 5},
+}
+
+NEW_RUBRIC = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Clarity": {"description": "Clarity of expression.", "max_points": 10},
+    "Evidence": {"description": "Use of evidence.", "max_points": 5},
+}
+
+
+def test_diff_rubrics() -> None:
+    """
+    Test that added, removed, edited and untouched criteria are detected.
+    """
+    diff = diff_rubrics(OLD_RUBRIC, NEW_RUBRIC)
+    assert diff == {
+        "added": ["Evidence"],
+        "removed": ["Grammar"],
+        "changed": ["Clarity"],
+        "unchanged": ["Content"],
+    }
+
+
+def test_regrade_only_changed_criteria() -> None:
+    """
+    Test that regrading prompts only for changed criteria and reuses the rest.
+
+    The new LLM would give Content a different grade, so the cached grade must
+    survive the merge for the regrade to count as incremental.
+    """
+    old_llm = GradingMockLLM({"Content": 8, "Clarity": 4, "Grammar": 5})
+    previous = grade_submission(
+        "s1", "essay", OLD_RUBRIC, [old_llm], 1, False, "simple_average"
+    )
+
+    new_llm = GradingMockLLM({"Clarity": 9, "Evidence": 3})
+    result = regrade_submission(
+        previous,
+        diff_rubrics(OLD_RUBRIC, NEW_RUBRIC),
+        "s1",
+        "essay",
+        NEW_RUBRIC,
+        [new_llm],
+        1,
+        False,
+        "simple_average",
+    )
+
+    grades = {c["name"]: c["grade"] for c in result["aggregated_response"]["criteria"]}
+    assert grades == {"Content": 8, "Clarity": 9, "Evidence": 3}
+    assert list(grades) == list(NEW_RUBRIC)
+    assert result["grade"] == 20
+    assert result["out_of"] == 25
+    assert result["regraded_criteria"] == ["Evidence", "Clarity"]
+    assert new_llm.calls == 1
+
+
+def test_unchanged_rubric_makes_no_calls() -> None:
+    """
+    Test that an unchanged rubric reuses the cached result without LLM calls.
+    """
+    llm = GradingMockLLM({"Content": 8, "Clarity": 4, "Grammar": 5})
+    previous = grade_submission("s1", "essay", OLD_RUBRIC, [llm], 1, False, "median")
+
+    result = regrade_submission(
+        previous,
+        diff_rubrics(OLD_RUBRIC, OLD_RUBRIC),
+        "s1",
+        "essay",
+        OLD_RUBRIC,
+        [llm],
+        1,
+        False,
+        "median",
+    )
+    assert llm.calls == 1
+    assert result["grade"] == previous["grade"]
+
+
+def test_save_and_load_results(tmp_path: Any) -> None:
+    """
+    Test that results round-trip through the results file.
+    """
+    path = str(tmp_path / "results.json")
+    assert load_results(path) == {"rubric": {}, "results": {}, "manifest": {}}
+    save_results(path, OLD_RUBRIC, {"s1": {"grade": 17}})
+    assert load_results(path) == {
+        "rubric": OLD_RUBRIC,
+        "results": {"s1": {"grade": 17}},
+        "manifest": {},
+    }
+
+
+def test_plan_directory_skips_unchanged_files(tmp_path: Any) -> None:
+    """
+    Test that only new or modified files are planned for grading.
+
+    Files are reused only when both the content hash and the config hash match.
+    """
+    (tmp_path / "a.txt").write_text("first")
+    (tmp_path / "b.txt").write_text("second")
+    config_a = config_hash({"number_of_repeats": 1})
+
+    to_grade, reused, manifest = plan_directory(
+        str(tmp_path), {"results": {}, "manifest": {}}, config_a
+    )
+    assert to_grade == ["a.txt", "b.txt"] and reused == []
+
+    previous = {"results": {"a.txt": {}, "b.txt": {}}, "manifest": manifest}
+    (tmp_path / "b.txt").write_text("second, edited")
+    (tmp_path / "c.txt").write_text("third")
+    to_grade, reused, _ = plan_directory(str(tmp_path), previous, config_a)
+    assert to_grade == ["b.txt", "c.txt"]
+    assert reused == ["a.txt"]
+
+    config_b = config_hash({"number_of_repeats": 3})
+    to_grade, reused, _ = plan_directory(str(tmp_path), previous, config_b)
+    assert reused == []
+
+
+def test_config_hash_covers_triage_and_quorum() -> None:
+    """
+    Test that turning on triage or quorum invalidates cached results.
+    """
+    base = {"number_of_repeats": 1}
+    hashes = {
+        config_hash(base),
+        config_hash({**base, "triage": {}}),
+        config_hash({**base, "quorum": {"size": 2}}),
+    }
+    assert len(hashes) == 3
@@ -1,8 +1,11 @@
+import json
 import logging
+import logging.handlers
+from pathlib import Path
 
 from pytest_mock import MockerFixture
 
-from gradebotguru.logging_config import setup_logging
+from gradebotguru.logging_config import log_response, setup_logging, stop_logging
 
 
 def test_setup_logging_custom_level(mocker: MockerFixture) -> None:
@@ -26,3 +29,58 @@ def test_setup_logging_custom_format(mocker: MockerFixture) -> None:
     setup_logging(format=custom_format)
     logger = logging.getLogger("")
     assert any(handler.formatter and handler.formatter._fmt == custom_format for handler in logger.handlers)
+
+
+def test_setup_logging_single_console_handler() -> None:
+    """
+    Test that console logging installs exactly one handler.
+
+    Ensures messages are not written twice when no log file exists.
+    """
+    setup_logging(filename=None)
+    assert len(logging.getLogger("").handlers) == 1
+
+
+def test_queued_logging_writes_from_listener(tmp_path: Path) -> None:
+    """
+    Test queued JSON-lines logging.
+
+    Ensures records pass through a QueueHandler, are written by the listener
+    once it is stopped, and carry their ``extra`` fields as JSON.
+    """
+    log_file = tmp_path / "gradebotguru.log"
+    log_file.touch()
+    setup_logging(filename=str(log_file), queued=True, json_lines=True)
+    try:
+        assert isinstance(
+            logging.getLogger("").handlers[0], logging.handlers.QueueHandler
+        )
+        logging.info("Graded %s", "essay.txt", extra={"model": "llama3"})
+    finally:
+        stop_logging()
+
+    entry = json.loads(log_file.read_text().splitlines()[-1])
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "Graded essay.txt"
+    assert entry["model"] == "llama3"
+
+
+def test_log_response_is_capped(tmp_path: Path) -> None:
+    """
+    Test size-capped response logging.
+
+    Ensures long LLM responses are truncated in the log, and that nothing is
+    logged when DEBUG is disabled.
+    """
+    log_file = tmp_path / "gradebotguru.log"
+    log_file.touch()
+    setup_logging(level=logging.DEBUG, filename=str(log_file), max_response_chars=10)
+    log_response("OpenAI", "x" * 25)
+    logging.getLogger("").setLevel(logging.INFO)
+    log_response("OpenAI", "hidden")
+    for handler in logging.getLogger("").handlers:
+        handler.flush()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert lines[0].endswith("Response from OpenAI: xxxxxxxxxx... [15 more characters]")
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from gradebotguru.grader import grade_submission
+from gradebotguru.llm_interface.circuit_breaker import CircuitBreakerLLM
+from gradebotguru.llm_interface.factory import create_llms
+from gradebotguru.llm_interface.hedged_llm import HedgeBudget, HedgedLLM
+from gradebotguru.llm_interface.local_llm import OllamaLLM
+from gradebotguru.llm_interface.replay_llm import Cassette, ReplayLLM
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {"Content": {"description": "Quality of content.", "max_points": 10}}
+
+
+class UsageMockLLM(GradingMockLLM):
+    """A grading mock that reports a different response and token usage per call."""
+
+    def get_response(self, prompt: str) -> str:
+        self.last_usage = {"prompt_tokens": len(prompt), "completion_tokens": 10}
+        return super().get_response(prompt) + f"\nCall {self.calls}."
+
+
+def test_record_then_replay(tmp_path: Path) -> None:
+    """
+    Test that a recorded cassette replays the same responses without the provider.
+
+    Repeated prompts are served in the order they were recorded, along with
+    their token usage.
+    """
+    path = str(tmp_path / "run.jsonl.gz")
+    recorder = ReplayLLM(UsageMockLLM({"Content": 8}), Cassette(path, "record"))
+    recorded = [recorder.get_response("Grade this.") for _ in range(2)]
+    assert recorded[0] != recorded[1]
+
+    provider = UsageMockLLM({"Content": 8})
+    replayer = ReplayLLM(provider, Cassette(path))
+
+    assert [replayer.get_response("Grade this.") for _ in range(2)] == recorded
+    assert replayer.last_usage == {"prompt_tokens": 11, "completion_tokens": 10}
+    assert provider.calls == 0
+    with pytest.raises(LookupError):
+        replayer.get_response("A prompt that was never sent.")
+
+
+def test_replayed_grading_matches_recorded_run(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """
+    Test replaying grade_submission offline, with the recorded latency injected.
+    """
+    path = str(tmp_path / "run.jsonl")
+    recorder = ReplayLLM(GradingMockLLM({"Content": 8}), Cassette(path, "record"))
+    recorded = grade_submission(
+        "a.txt", "Essay.", RUBRIC, [recorder], 3, True, "median"
+    )
+    sleep = mocker.patch("gradebotguru.llm_interface.replay_llm.time.sleep")
+
+    replayer = ReplayLLM(GradingMockLLM({"Content": 8}), Cassette(path), True)
+    replayed = grade_submission(
+        "a.txt", "Essay.", RUBRIC, [replayer], 3, True, "median"
+    )
+
+    assert replayed == recorded
+    assert sleep.call_count == len(Cassette(path)) == 3
+
+
+def test_factory_wraps_providers_for_replay(tmp_path: Path) -> None:
+    """
+    Test that the replay setting wraps every provider around one shared cassette.
+    """
+    config = {
+        "llm_providers": [
+            {"provider": "openai", "api_key": "test_key"},
+            {"provider": "ollama", "model": "llama3"},
+        ],
+        "replay": {"cassette": str(tmp_path / "run.jsonl"), "mode": "record"},
+    }
+
+    llms = create_llms(config)
+
+    assert all(isinstance(llm, ReplayLLM) for llm in llms)
+    assert llms[0].cassette is llms[1].cassette  # type: ignore[attr-defined]
+    assert llms[1].get_model_info()["model_name"] == "llama3"
+
+
+def test_concurrent_calls_record_their_own_usage(tmp_path: Path) -> None:
+    """
+    Test that each recorded call keeps its own token usage, through other
+    wrappers and with calls made concurrently.
+    """
+    path = str(tmp_path / "run.jsonl")
+    provider = UsageMockLLM({"Content": 8})
+    recorder = ReplayLLM(
+        CircuitBreakerLLM(HedgedLLM(provider, HedgeBudget())),
+        Cassette(path, "record"),
+    )
+    prompts = ["x" * length for length in range(1, 41)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(recorder.get_response, prompts))
+
+    replayer = ReplayLLM(UsageMockLLM({"Content": 8}), Cassette(path))
+    for prompt in prompts:
+        replayer.get_response(prompt)
+        assert replayer.last_usage == {
+            "prompt_tokens": len(prompt),
+            "completion_tokens": 10,
+        }
+
+
+def test_settings_are_set_on_the_wrapped_provider(tmp_path: Path) -> None:
+    """
+    Test that changing a provider setting through the wrapper changes the provider.
+    """
+    provider = OllamaLLM("ollama", "http://localhost:11434", "llama3")
+    recorder = ReplayLLM(provider, Cassette(str(tmp_path / "run.jsonl"), "record"))
+
+    recorder.keep_alive = "1h"
+
+    assert provider.keep_alive == "1h"
+    assert "keep_alive" not in vars(recorder)
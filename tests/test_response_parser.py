@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from gradebotguru.grader import run_evaluation
+from gradebotguru.response_parser import parse_response
+from tests.test_utils import MockLLM
+
+CORPUS = Path(__file__).parent / "data" / "responses"
+EXPECTED = json.loads((CORPUS / "expected.json").read_text())
+
+
+class FixedResponseLLM(MockLLM):
+    """A mock LLM that always gives the same response."""
+
+    def __init__(self, response: str) -> None:
+        self.response = response
+
+    def get_response(self, prompt: str) -> str:
+        return self.response
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_parse_response_corpus(name: str) -> None:
+    """
+    Test parsing the corpus of LLM responses.
+
+    Ensures markdown-formatted, numbered, fractional, "x/y" and CRLF responses
+    are parsed into the expected criteria and overall feedback.
+    """
+    text = (CORPUS / name).read_bytes().decode("utf-8")
+
+    criteria, overall = parse_response(text)
+
+    assert criteria == EXPECTED[name]["criteria"]
+    assert overall == {"overall": EXPECTED[name]["overall"]}
+
+
+def test_corpus_has_expected_results() -> None:
+    """
+    Test that every response in the corpus has expected results, and vice versa.
+    """
+    assert sorted(path.name for path in CORPUS.glob("*.txt")) == sorted(EXPECTED)
+
+
+def test_grades_out_of_another_maximum_are_rescaled() -> None:
+    """
+    Test that "x/y" grades are scaled to the rubric's maximum points.
+    """
+    rubric = {
+        "Content": {"description": "Quality.", "max_points": 10},
+        "Clarity": {"description": "Clarity.", "max_points": 5},
+    }
+    llm = FixedResponseLLM(
+        "Criterion: Content\nGrade: 4/5\nFeedback: Good.\n\n"
+        "Criterion: Clarity\nGrade: 4.5/5\nFeedback: Clear.\nOverall: Fine."
+    )
+
+    response = run_evaluation(llm, "Essay", rubric, "{rubric} {submission}")
+
+    assert [(c["name"], c["grade"]) for c in response["criteria"]] == [
+        ("Content", 8.0),
+        ("Clarity", 4.5),
+    ]
+    assert all("out_of" not in criterion for criterion in response["criteria"])
@@ -0,0 +1,121 @@
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from gradebotguru.grader import grade_submission
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.main import main
+from gradebotguru.results_db import AGGREGATED, ResultsDB
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Clarity": {"description": "Clarity of expression.", "max_points": 5},
+}
+
+
+def grade(submission_id: str, llms: list[BaseLLM]) -> dict[str, Any]:
+    """Grade a short submission with the given providers."""
+    return grade_submission(
+        submission_id,
+        "An essay.",
+        RUBRIC,
+        llms,
+        1,
+        False,
+        "simple_average",
+        summarize_feedback=False,
+    )
+
+
+def record_runs(path: Path) -> None:
+    """Record three runs in which provider 'a' grades Content 6, 7 then 8."""
+    with ResultsDB(str(path)) as db:
+        for content in (6, 7, 8):
+            run_id = db.start_run(RUBRIC, "config")
+            llms: list[BaseLLM] = [
+                GradingMockLLM({"Content": content, "Clarity": 4}, "a"),
+                GradingMockLLM({"Content": 4, "Clarity": 2}, "b"),
+            ]
+            for submission_id in ("s1.txt", "s2.txt"):
+                db.add_result(run_id, grade(submission_id, llms))
+            db.finish_run(run_id)
+
+
+def test_results_are_written_in_batches(tmp_path: Path) -> None:
+    """
+    Test that results are buffered until the batch is full or flushed.
+    """
+    path = tmp_path / "results.db"
+    db = ResultsDB(str(path), batch_size=3)
+    run_id = db.start_run(RUBRIC)
+    llms: list[BaseLLM] = [GradingMockLLM({"Content": 7, "Clarity": 3}, "a")]
+    reader = sqlite3.connect(path)
+
+    def stored() -> int:
+        return int(reader.execute("SELECT COUNT(*) FROM submissions").fetchone()[0])
+
+    db.add_result(run_id, grade("s1.txt", llms))
+    db.add_result(run_id, grade("s2.txt", llms))
+    assert stored() == 0
+    db.add_result(run_id, grade("s3.txt", llms))
+    assert stored() == 3
+    db.add_result(run_id, grade("s4.txt", llms))
+    db.close()
+    assert stored() == 4
+    criterion_rows = reader.execute("SELECT COUNT(*) FROM criterion_grades")
+    # Two aggregated and two individual criterion grades per submission.
+    assert criterion_rows.fetchone()[0] == 16
+
+
+def test_provider_criterion_across_recent_runs(tmp_path: Path) -> None:
+    """
+    Test how one provider scored one criterion over the last runs.
+    """
+    path = tmp_path / "results.db"
+    record_runs(path)
+
+    with ResultsDB(str(path)) as db:
+        stats = db.criterion_stats("Content", "a", last=2)
+        aggregated = db.criterion_stats("Content", AGGREGATED, last=1)
+        history = db.submission_history("s1.txt")
+        runs = db.runs()
+
+    assert [(row["run_id"], row["mean"], row["count"]) for row in stats] == [
+        (3, 8.0, 2),
+        (2, 7.0, 2),
+    ]
+    assert aggregated[0]["provider"] == AGGREGATED
+    assert aggregated[0]["mean"] == 6.0
+    assert [entry["criteria"]["Content"] for entry in history] == [6.0, 5.5, 5.0]
+    assert [run["submissions"] for run in runs] == [2, 2, 2]
+    assert all(run["finished_at"] is not None for run in runs)
+
+
+def test_query_command(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """
+    Test the query subcommand's reports.
+    """
+    path = tmp_path / "results.db"
+    record_runs(path)
+
+    main(["query", "--db", str(path), "criteria", "--provider", "b", "--last", "1"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == [
+        "run_id",
+        "provider",
+        "criterion",
+        "count",
+        "mean",
+        "min",
+        "max",
+    ]
+    assert lines[1].split() == ["3", "b", "Clarity", "2", "2.00", "2.00", "2.00"]
+
+    main(["query", "--db", str(path), "submission", "s2.txt"])
+    assert "Content 6, Clarity 3" in capsys.readouterr().out
+
+    main(["query", "--db", str(path), "submission", "missing.txt"])
+    assert capsys.readouterr().out.strip() == "No matching results."
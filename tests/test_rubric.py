@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+
+from gradebotguru.grader import create_result_dict
+from gradebotguru.prompts import generate_user_prompt
+from gradebotguru.rubric import Rubric, compile_rubric
+
+CRITERIA = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Use of Evidence": {"description": "Support for claims.", "max_points": 5},
+}
+
+
+def test_rubric_is_immutable_and_compares_to_dict() -> None:
+    """
+    Test that a compiled rubric cannot be modified and still equals the plain dict.
+    """
+    rubric = Rubric(CRITERIA)
+
+    assert rubric == CRITERIA
+    assert list(rubric) == ["Content", "Use of Evidence"]
+    with pytest.raises(TypeError):
+        rubric["Content"]["max_points"] = 20  # type: ignore[index]
+    with pytest.raises(TypeError):
+        rubric["Clarity"] = {"max_points": 5}  # type: ignore[index]
+
+
+def test_rubric_precomputes_prompt_total_and_hash() -> None:
+    """
+    Test the precomputed prompt rendering, total, name lookup and content hash.
+    """
+    rubric = Rubric(CRITERIA)
+
+    template = "{rubric}|{submission}"
+    assert generate_user_prompt(rubric, "Essay", template) == generate_user_prompt(
+        CRITERIA, "Essay", template
+    )
+    assert rubric.max_total == 15
+    assert rubric.lookup("use of evidence:") == "Use of Evidence"
+    assert rubric.lookup("Grammar") is None
+    assert rubric.content_hash == Rubric(dict(CRITERIA)).content_hash
+    assert rubric.content_hash != rubric.subset(["Content"]).content_hash
+    assert compile_rubric(rubric) is rubric
+    assert json.loads(json.dumps(rubric.to_dict())) == CRITERIA
+
+
+def test_result_out_of_uses_max_total(mocker: MockerFixture) -> None:
+    """
+    Test that results report the rubric's precomputed total.
+    """
+    mocker.patch("gradebotguru.grader.analyze_sentiment", return_value={})
+    mocker.patch(
+        "gradebotguru.grader.analyze_style",
+        return_value={"word_count": 1, "readability": 0},
+    )
+    result = create_result_dict("s1", "Essay", Rubric(CRITERIA), 12, {}, set(), [])
+    assert result["out_of"] == 15
@@ -0,0 +1,239 @@
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from pytest_mock import MockerFixture
+
+from gradebotguru.deadline import check_deadline
+from gradebotguru.grader import grade_submission
+from gradebotguru.llm_interface.circuit_breaker import CircuitBreakerLLM
+from gradebotguru.llm_interface.hedged_llm import HedgeBudget, HedgedLLM
+from gradebotguru.llm_interface.local_llm import OllamaLLM
+from gradebotguru.main import grade_directory
+from gradebotguru.scheduler import grade_by_model, group_by_model
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {"Content": {"description": "Quality of content.", "max_points": 10}}
+SUBMISSIONS = {"a.txt": "First essay.", "b.txt": "Second essay.", "c.txt": "Third."}
+
+
+class RecordingLLM(GradingMockLLM):
+    """A grading mock that records the order in which models are called."""
+
+    def __init__(self, grade: float, name: str, log: list[str]) -> None:
+        super().__init__({"Content": grade}, name)
+        self.log = log
+
+    def get_response(self, prompt: str) -> str:
+        self.log.append(self.name)
+        return super().get_response(prompt)
+
+
+def test_grade_by_model_runs_each_model_in_one_batch() -> None:
+    """
+    Test that all evaluations for one model finish before the next model starts.
+
+    Providers sharing a model are grouped even when they are not adjacent.
+    """
+    log: list[str] = []
+    llms = [
+        RecordingLLM(8, "llama3", log),
+        RecordingLLM(6, "mistral", log),
+        RecordingLLM(7, "llama3", log),
+    ]
+
+    grade_by_model(SUBMISSIONS, RUBRIC, llms, 2, True, "simple_average")
+
+    assert group_by_model(llms) == {("", "llama3"): [0, 2], ("", "mistral"): [1]}
+    assert log == ["llama3"] * 12 + ["mistral"] * 6
+
+
+def test_grade_by_model_matches_grade_submission() -> None:
+    """
+    Test that grouping by model leaves each submission's aggregated result unchanged.
+    """
+    llms = [GradingMockLLM({"Content": 8}, "a"), GradingMockLLM({"Content": 5}, "b")]
+
+    results = grade_by_model(SUBMISSIONS, RUBRIC, llms, 2, True, "simple_average")
+
+    for submission_id, text in SUBMISSIONS.items():
+        expected = grade_submission(
+            submission_id, text, RUBRIC, llms, 2, True, "simple_average"
+        )
+        assert results[submission_id] == expected
+
+
+def test_grade_by_model_keeps_ollama_models_loaded_then_unloads(
+    mocker: MockerFixture,
+) -> None:
+    """
+    Test keep_alive handling for Ollama models sharing a server.
+
+    Requests in a batch carry the batch keep_alive, a model is unloaded when
+    another model on its server is next, and the provider's own keep_alive is
+    restored afterwards.
+    """
+    response = SimpleNamespace(
+        message=SimpleNamespace(content="Criterion: Content\nGrade: 7\nOverall: Ok.")
+    )
+    llms = [
+        OllamaLLM("ollama", "http://gpu:11434", "llama3", keep_alive="5m"),
+        OllamaLLM("ollama", "http://gpu:11434", "mistral"),
+    ]
+    clients = [mocker.patch.object(llm, "client") for llm in llms]
+    for client in clients:
+        client.chat.return_value = response
+
+    grade_by_model(
+        SUBMISSIONS, RUBRIC, llms, 1, False, "simple_average", keep_alive="1h"
+    )
+
+    for client in clients:
+        assert {call.kwargs["keep_alive"] for call in client.chat.call_args_list} == {
+            "1h"
+        }
+    clients[0].generate.assert_called_once_with(model="llama3", keep_alive=0)
+    clients[1].generate.assert_not_called()
+    assert [llm.keep_alive for llm in llms] == ["5m", None]
+
+
+def test_grade_by_model_manages_wrapped_ollama_models(mocker: MockerFixture) -> None:
+    """
+    Test that keep_alive and unloading reach Ollama models behind provider wrappers.
+    """
+    response = SimpleNamespace(
+        message=SimpleNamespace(content="Criterion: Content\nGrade: 7\nOverall: Ok.")
+    )
+    ollamas = [
+        OllamaLLM("ollama", "http://gpu:11434", "llama3", keep_alive="5m"),
+        OllamaLLM("ollama", "http://gpu:11434", "mistral"),
+    ]
+    clients = [mocker.patch.object(llm, "client") for llm in ollamas]
+    for client in clients:
+        client.chat.return_value = response
+    llms = [
+        CircuitBreakerLLM(ollamas[0]),
+        HedgedLLM(CircuitBreakerLLM(ollamas[1]), HedgeBudget()),
+    ]
+
+    grade_by_model(
+        SUBMISSIONS, RUBRIC, llms, 1, False, "simple_average", keep_alive="1h"
+    )
+
+    for client in clients:
+        assert {call.kwargs["keep_alive"] for call in client.chat.call_args_list} == {
+            "1h"
+        }
+    clients[0].generate.assert_called_once_with(model="llama3", keep_alive=0)
+    clients[1].generate.assert_not_called()
+    assert [llm.keep_alive for llm in ollamas] == ["5m", None]
+
+
+def test_grade_by_model_leaves_unanswered_submissions_ungraded() -> None:
+    """
+    Test that submissions no provider answered get no result instead of a 0.
+    """
+    breaker = CircuitBreakerLLM(GradingMockLLM({"Content": 7}), cooldown=60)
+    breaker.state = "open"
+    breaker._opened_at = time.monotonic()
+
+    results = grade_by_model(SUBMISSIONS, RUBRIC, [breaker], 1, False, "simple_average")
+
+    assert results == {}
+    assert breaker.shed_calls == len(SUBMISSIONS)
+
+
+class SlowOnLLM(GradingMockLLM):
+    """A grading mock that takes a second for submissions containing a word."""
+
+    def __init__(self, word: str) -> None:
+        super().__init__({"Content": 7})
+        self.word = word
+
+    def get_response(self, prompt: str) -> str:
+        if self.word in prompt:
+            time.sleep(1.0)
+            check_deadline()
+        return super().get_response(prompt)
+
+
+def test_grade_by_model_applies_submission_deadline() -> None:
+    """
+    Test that a submission that misses its deadline is left ungraded while the
+    rest of the batch is graded.
+    """
+    results = grade_by_model(
+        SUBMISSIONS,
+        RUBRIC,
+        [SlowOnLLM("Second")],
+        1,
+        False,
+        "simple_average",
+        prompt_template="{rubric} {submission}",
+        submission_deadline=0.2,
+    )
+
+    assert sorted(results) == ["a.txt", "c.txt"]
+
+
+def test_keep_loaded_applies_only_to_its_own_grading(mocker: MockerFixture) -> None:
+    """
+    Test that keep_alive set for one batch is not sent by requests made
+    concurrently elsewhere, nor changed on the provider.
+    """
+    llm = OllamaLLM("ollama", "http://gpu:11434", "llama3", keep_alive="5m")
+    client = mocker.patch.object(llm, "client")
+    client.chat.return_value = SimpleNamespace(message=SimpleNamespace(content="Ok."))
+    entered, done = threading.Event(), threading.Event()
+
+    def batch() -> None:
+        with llm.keep_loaded("1h"):
+            llm.generate_text("In the batch.")
+            entered.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=batch)
+    thread.start()
+    entered.wait(5)
+    llm.generate_text("Elsewhere.")
+    done.set()
+    thread.join()
+
+    sent = [call.kwargs["keep_alive"] for call in client.chat.call_args_list]
+    assert sent == ["1h", "5m"]
+    assert llm.keep_alive == "5m"
+
+
+def test_model_affinity_applies_with_results_file(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """
+    Test that grading with a results file still grades one model at a time.
+    """
+    essays = tmp_path / "essays"
+    essays.mkdir()
+    for name, text in SUBMISSIONS.items():
+        (essays / name).write_text(text)
+    config = {
+        "number_of_repeats": 1,
+        "repeat_each_provider": False,
+        "aggregation_method": "simple_average",
+        "llm_prompt_template": "{rubric} {submission}",
+        "summarize_feedback": False,
+        "model_affinity": True,
+    }
+    by_model = mocker.patch(
+        "gradebotguru.main.grade_by_model", side_effect=grade_by_model
+    )
+
+    results = grade_directory(
+        str(essays),
+        config,
+        [GradingMockLLM({"Content": 7})],
+        RUBRIC,
+        str(tmp_path / "results.json"),
+    )
+
+    assert sorted(by_model.call_args.args[0]) == sorted(SUBMISSIONS)
+    assert sorted(results) == sorted(SUBMISSIONS)
@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+from gradebotguru.deadline import check_deadline
+from gradebotguru.grader import grade_submission
+from gradebotguru.rubric_loader import load_rubric
+from gradebotguru.server import GradingServer
+from tests.test_utils import GradingMockLLM
+
+RUBRIC_CSV = "criterion,description,max_points\nContent,Quality of content.,10\n"
+
+
+class ConcurrencyMockLLM(GradingMockLLM):
+    """A grading mock that records how many calls run at once."""
+
+    def __init__(self, grades: dict[str, float], delay: float) -> None:
+        super().__init__(grades)
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_response(self, prompt: str) -> str:
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return super().get_response(prompt)
+
+
+class DeadlineMockLLM(ConcurrencyMockLLM):
+    """A slow grading mock that gives up once the deadline has passed."""
+
+    def get_response(self, prompt: str) -> str:
+        response = super().get_response(prompt)
+        check_deadline()
+        return response
+
+
+def make_server(tmp_path: Path, llm: GradingMockLLM, **kwargs: Any) -> GradingServer:
+    """Create a grading server over a rubric file in ``tmp_path``."""
+    rubric_path = tmp_path / "rubric.csv"
+    rubric_path.write_text(RUBRIC_CSV)
+    options = {
+        "rubric": load_rubric(str(rubric_path)),
+        "llms": [llm],
+        "num_repeats": 1,
+        "repeat_each_provider": False,
+        "aggregation_method": "simple_average",
+        "summarize_feedback": False,
+    }
+    return GradingServer(
+        grade_submission, options, rubric_path=str(rubric_path), **kwargs
+    )
+
+
+def post(url: str, body: dict[str, Any]) -> tuple[int, str, bytes]:
+    """Send a JSON request and return the status, content type and raw body."""
+    request = urllib.request.Request(
+        url, json.dumps(body).encode(), {"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers["Content-Type"], response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers["Content-Type"], e.read()
+
+
+def test_grades_one_submission(tmp_path: Path) -> None:
+    """
+    Test that a single submission is graded and returned as JSON.
+    """
+    with make_server(tmp_path, GradingMockLLM({"Content": 8})) as server:
+        status, content_type, body = post(
+            f"{server.url}/grade",
+            {"submission_id": "essay.txt", "submission": "An essay."},
+        )
+
+    assert status == 200
+    assert content_type == "application/json"
+    result = json.loads(body)
+    assert result["submission_id"] == "essay.txt"
+    assert result["grade"] == 8
+    assert server.stats == {"graded": 1, "failed": 0, "in_flight": 0}
+
+
+def test_batch_streams_results_within_worker_limit(tmp_path: Path) -> None:
+    """
+    Test that a batch streams one JSON line per submission and that no more
+    submissions than the worker limit are graded at once.
+    """
+    llm = ConcurrencyMockLLM({"Content": 6}, delay=0.05)
+    submissions = [
+        {"submission_id": f"essay{index}.txt", "submission": "An essay."}
+        for index in range(6)
+    ]
+    with make_server(tmp_path, llm, max_workers=2) as server:
+        status, content_type, body = post(
+            f"{server.url}/grade", {"submissions": submissions}
+        )
+
+    assert status == 200
+    assert content_type == "application/x-ndjson"
+    results = [json.loads(line) for line in body.decode().splitlines()]
+    assert sorted(result["submission_id"] for result in results) == [
+        f"essay{index}.txt" for index in range(6)
+    ]
+    assert all(result["grade"] == 6 for result in results)
+    assert llm.peak == 2
+
+
+def test_request_rubric_and_rubric_reload(tmp_path: Path) -> None:
+    """
+    Test that a rubric sent with a request is used, and that the configured
+    rubric is reloaded when its file changes.
+    """
+    llm = GradingMockLLM({"Content": 4, "Style": 3})
+    request_rubric = {
+        "Content": {"description": "Quality.", "max_points": 10},
+        "Style": {"description": "Style.", "max_points": 5},
+    }
+    with make_server(tmp_path, llm) as server:
+        _, _, body = post(
+            f"{server.url}/grade",
+            {"submission_id": "a.txt", "submission": "Text.", "rubric": request_rubric},
+        )
+        assert json.loads(body)["out_of"] == 15
+
+        rubric_path = tmp_path / "rubric.csv"
+        rubric_path.write_text(RUBRIC_CSV + "Style,Style.,20\n")
+        os.utime(rubric_path, (time.time() + 5, time.time() + 5))
+        _, _, body = post(
+            f"{server.url}/grade", {"submission_id": "b.txt", "submission": "Text."}
+        )
+        assert json.loads(body)["out_of"] == 30
+
+
+def test_invalid_rubric_edit_keeps_previous_rubric(tmp_path: Path) -> None:
+    """
+    Test that a rubric file that fails to load, e.g. mid-edit, leaves the
+    previous rubric in use.
+    """
+    with make_server(tmp_path, GradingMockLLM({"Content": 8})) as server:
+        previous = server.rubric()
+        rubric_path = tmp_path / "rubric.csv"
+        rubric_path.write_text("criterion,description,max_po\nContent,Quality.,10\n")
+        os.utime(rubric_path, (time.time() + 5, time.time() + 5))
+
+        status, _, body = post(
+            f"{server.url}/grade", {"submission_id": "a.txt", "submission": "Text."}
+        )
+        assert status == 200
+        assert json.loads(body)["out_of"] == 10
+        with urllib.request.urlopen(f"{server.url}/health") as response:
+            assert json.load(response)["status"] == "ok"
+        assert server.rubric() is previous
+
+
+def test_path_submissions_are_confined_to_submissions_dir(tmp_path: Path) -> None:
+    """
+    Test that submissions sent by path are read only from the submissions
+    directory, and refused when the server has none.
+    """
+    essays = tmp_path / "essays"
+    essays.mkdir()
+    (essays / "a.txt").write_text("An essay.")
+    (tmp_path / "secret.txt").write_text("Not a submission.")
+    llm = GradingMockLLM({"Content": 8})
+
+    with make_server(tmp_path, llm, submissions_dir=str(essays)) as server:
+        status, _, body = post(f"{server.url}/grade", {"path": "a.txt"})
+        assert status == 200
+        assert json.loads(body)["submission_id"] == "a.txt"
+        for path in ("../secret.txt", str(tmp_path / "secret.txt")):
+            status, _, body = post(f"{server.url}/grade", {"path": path})
+            assert status == 400
+            assert "outside the submissions directory" in json.loads(body)["error"]
+
+    with make_server(tmp_path, llm) as server:
+        status, _, body = post(f"{server.url}/grade", {"path": str(essays / "a.txt")})
+        assert status == 400
+    assert llm.calls == 1
+
+
+def test_affinity_batches_apply_the_submission_deadline(tmp_path: Path) -> None:
+    """
+    Test that batches graded one model at a time still honour the deadline.
+    """
+    llm = DeadlineMockLLM({"Content": 8}, delay=1.0)
+    with make_server(tmp_path, llm, deadline=0.2, affinity={}) as server:
+        status, _, body = post(
+            f"{server.url}/grade",
+            {"submissions": [{"submission_id": "a.txt", "submission": "Text."}]},
+        )
+
+    assert status == 200
+    assert json.loads(body) == {
+        "submission_id": "a.txt",
+        "error": "No LLM provider answered in time",
+    }
+
+
+def test_malformed_requests_and_health(tmp_path: Path) -> None:
+    """
+    Test that malformed requests get a 400 and the health endpoint reports
+    the rubric and providers.
+    """
+    with make_server(tmp_path, GradingMockLLM({"Content": 8})) as server:
+        status, _, body = post(f"{server.url}/grade", {"submission": "No ID."})
+        assert status == 400
+        assert "submission_id" in json.loads(body)["error"]
+        status, _, _ = post(f"{server.url}/grade", {"submissions": []})
+        assert status == 400
+
+        with urllib.request.urlopen(f"{server.url}/health") as response:
+            health = json.load(response)
+
+    assert health["status"] == "ok"
+    assert health["rubric"] == server.rubric().content_hash  # type: ignore[attr-defined]
+    assert health["providers"][0]["model_name"] == "mock-model"
+    assert health["jobs"]["graded"] == 0
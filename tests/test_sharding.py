@@ -0,0 +1,114 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from gradebotguru.incremental import load_results
+from gradebotguru.llm_interface.base_llm import BaseLLM
+from gradebotguru.main import grade_directory, main
+from gradebotguru.sharding import (
+    ShardError,
+    cohort_stats,
+    merge_shards,
+    parse_shard,
+    shard_of,
+)
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {"Content": {"description": "Quality of content.", "max_points": 10}}
+
+CONFIG: dict[str, Any] = {
+    "number_of_repeats": 1,
+    "repeat_each_provider": False,
+    "aggregation_method": "simple_average",
+    "llm_prompt_template": "{rubric} {submission}",
+    "summarize_feedback": False,
+}
+
+
+def grade_shards(tmp_path: Path, count: int) -> list[str]:
+    """Grade a directory of ten essays as ``count`` shards."""
+    submissions = tmp_path / "essays"
+    submissions.mkdir(exist_ok=True)
+    for index in range(10):
+        (submissions / f"essay{index}.txt").write_text(f"Essay number {index}.")
+    llms: list[BaseLLM] = [GradingMockLLM({"Content": 7})]
+    paths = []
+    for index in range(1, count + 1):
+        path = str(tmp_path / f"shard{index}.json")
+        grade_directory(
+            str(submissions), CONFIG, llms, RUBRIC, path, shard=(index, count)
+        )
+        paths.append(path)
+    return paths
+
+
+def test_parse_shard() -> None:
+    """
+    Test that shards are written i/n and counted from 1.
+    """
+    assert parse_shard("1/3") == (1, 3)
+    for spec in ("0/3", "4/3", "2", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_shards_partition_submissions_stably() -> None:
+    """
+    Test that every submission falls in exactly one shard, the same one each
+    time, and that shards are roughly balanced.
+    """
+    names = [f"student{index}.pdf" for index in range(400)]
+    shards = [shard_of(name, 4) for name in names]
+
+    assert shards == [shard_of(name, 4) for name in names]
+    assert set(shards) == {1, 2, 3, 4}
+    assert all(60 < shards.count(index) < 140 for index in range(1, 5))
+
+
+def test_sharded_runs_merge_into_the_whole_cohort(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """
+    Test that each shard grades only its own files and that the merge has
+    every submission and reports cohort statistics.
+    """
+    paths = grade_shards(tmp_path, 3)
+    capsys.readouterr()
+    for index, path in enumerate(paths, start=1):
+        data = load_results(path)
+        assert data["shard"]["index"] == index
+        assert all(shard_of(sid, 3) == index for sid in data["results"])
+
+    output = tmp_path / "merged.json"
+    main(["merge", *paths, "--output", str(output)])
+
+    merged = load_results(str(output))
+    assert sorted(merged["results"]) == sorted(f"essay{i}.txt" for i in range(10))
+    assert "shard" not in merged
+    report = capsys.readouterr().out
+    assert "Cohort: 10 submission(s)" in report
+    assert cohort_stats(merged["results"])["grade"]["mean"] == 7
+
+
+def test_merge_checks_completeness(tmp_path: Path) -> None:
+    """
+    Test that missing shards are refused and submissions without a result
+    are reported.
+    """
+    paths = grade_shards(tmp_path, 2)
+    with pytest.raises(ShardError, match="Missing shard"):
+        merge_shards(paths[:1])
+    with pytest.raises(ShardError, match="both shard"):
+        merge_shards([paths[0], paths[0]])
+
+    data = load_results(paths[1])
+    dropped = sorted(data["results"])[0]
+    del data["results"][dropped]
+    Path(paths[1]).write_text(json.dumps(data))
+
+    _, missing = merge_shards(paths)
+    assert missing == [dropped]
+    with pytest.raises(SystemExit, match="incomplete"):
+        main(["merge", *paths, "--output", str(tmp_path / "merged.json")])
@@ -5,6 +5,9 @@ import pytest
 from pytest_mock import MockerFixture
 
 from gradebotguru.submission_loader import (
+    collect_text,
+    extract_submission,
+    get_backend,
     load_code,
     load_docx,
     load_markdown,
@@ -170,5 +173,71 @@ def test_load_submissions(mocker: MockerFixture) -> None:
     assert submissions == mock_files
 
 
+def test_extract_submission_stops_at_page_limit(tmp_path: Any) -> None:
+    """
+    Test that PDF extraction stops at the page limit and records the truncation.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    from pypdf import PdfWriter
+
+    pdf_file = tmp_path / "long.pdf"
+    writer = PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=72, height=72)
+    with open(pdf_file, "wb") as f:
+        writer.write(f)
+
+    _, metadata = extract_submission(str(pdf_file), {"max_pages": 2})
+    assert metadata["pages_read"] == 2
+    assert metadata["total_pages"] == 5
+    assert metadata["truncation_reason"] == "max_pages"
+
+    _, metadata = extract_submission(str(pdf_file), {"max_pages": 5})
+    assert not metadata["truncated"]
+
+
+def test_collect_text_stops_pulling_pages_at_token_budget() -> None:
+    """
+    Test that pages after the token budget is reached are never extracted.
+    """
+    extracted = []
+
+    def pages() -> Any:
+        for number in range(100):
+            extracted.append(number)
+            yield "x" * 40
+
+    text, metadata = collect_text(pages(), {"max_tokens": 25})
+
+    assert len(text) == 100
+    assert len(extracted) == 3
+    assert metadata["truncated"] and metadata["truncation_reason"] == "max_chars"
+
+
+def test_configured_backend_is_used_per_format(tmp_path: Any) -> None:
+    """
+    Test that PDF backends can be switched in configuration and agree on the text.
+
+    Parameters:
+    - tmp_path (Any): A temporary directory provided by pytest.
+    """
+    from pypdf import PdfWriter
+
+    pdf_file = tmp_path / "test.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    with open(pdf_file, "wb") as f:
+        writer.write(f)
+
+    default = extract_submission(str(pdf_file))
+    pypdf2 = extract_submission(str(pdf_file), backends={"pdf": "pypdf2"})
+    assert default == pypdf2
+
+    with pytest.raises(ValueError, match="Unknown extraction backend"):
+        get_backend("essay.docx", {".docx": "missing"})
+
+
 if __name__ == "__main__":
     pytest.main()
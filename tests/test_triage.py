@@ -0,0 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from gradebotguru.llm_interface.circuit_breaker import CircuitBreakerLLM
+from gradebotguru.llm_interface.factory import create_llms
+from gradebotguru.llm_interface.hedged_llm import HedgedLLM, close_hedged_llms
+from gradebotguru.llm_interface.replay_llm import ReplayLLM
+from gradebotguru.triage import (
+    DEFAULT_TRIAGE_CONFIG,
+    create_triage_llm,
+    escalation_reasons,
+    get_triage_config,
+    new_triage_stats,
+    triage_submission,
+)
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Clarity": {"description": "Clarity of expression.", "max_points": 10},
+}
+SETTINGS = get_triage_config({"triage": {"samples": 2}})
+
+
+def test_confident_cheap_grade_is_not_escalated() -> None:
+    """
+    Test that a consistent grade away from boundaries is taken from the cheap model.
+    """
+    cheap = GradingMockLLM({"Content": 9, "Clarity": 9}, name="cheap")
+    expensive = GradingMockLLM({"Content": 5, "Clarity": 5}, name="expensive")
+    stats = new_triage_stats()
+
+    result = triage_submission(
+        "s1",
+        "essay",
+        RUBRIC,
+        [expensive],
+        3,
+        True,
+        "simple_average",
+        triage_llm=cheap,
+        triage_config=SETTINGS,
+        stats=stats,
+    )
+
+    assert result["grade"] == 18
+    assert result["triage"] == {"escalated": False, "reasons": []}
+    assert cheap.calls == 2 and expensive.calls == 0
+    assert stats["expensive_calls_saved"] == 3
+
+
+def test_boundary_grade_is_escalated() -> None:
+    """
+    Test that a grade near a boundary is regraded by the expensive providers.
+    """
+    cheap = GradingMockLLM({"Content": 7, "Clarity": 6}, name="cheap")
+    expensive = GradingMockLLM({"Content": 8, "Clarity": 8}, name="expensive")
+    stats = new_triage_stats()
+
+    result = triage_submission(
+        "s1",
+        "essay",
+        RUBRIC,
+        [expensive],
+        1,
+        False,
+        "simple_average",
+        triage_llm=cheap,
+        triage_config=SETTINGS,
+        stats=stats,
+    )
+
+    assert result["grade"] == 16
+    assert result["triage"] == {"escalated": True, "reasons": ["near grade boundary"]}
+    assert stats == {
+        "submissions": 1,
+        "escalated": 1,
+        "cheap_calls": 2,
+        "expensive_calls": 1,
+        "expensive_calls_saved": 0,
+    }
+
+
+def test_missing_criterion_counts_as_parse_failure() -> None:
+    """
+    Test that a response missing a rubric criterion triggers escalation.
+    """
+    responses = [{"criteria": [{"name": "Content", "grade": 9}]}]
+    assert escalation_reasons(responses, RUBRIC, SETTINGS) == ["parse failure"]
+
+
+def test_empty_triage_section_uses_defaults() -> None:
+    """
+    Test that an empty triage section turns triage on with the default settings.
+    """
+    assert get_triage_config({"triage": {}}) == DEFAULT_TRIAGE_CONFIG
+    assert get_triage_config({}) is None
+
+
+def test_triage_llm_is_wrapped_like_other_providers(tmp_path: Path) -> None:
+    """
+    Test that the cheap model gets the configured wrappers and shares the
+    run's hedging budget and replay cassette.
+    """
+    config: dict[str, Any] = {
+        "llm_providers": [{"provider": "ollama", "model": "llama3:70b"}],
+        "hedging": {},
+        "circuit_breaker": {},
+        "replay": {"cassette": str(tmp_path / "run.jsonl"), "mode": "record"},
+        "triage": {},
+    }
+    llms = create_llms(config)
+    triage_llm = create_triage_llm(get_triage_config(config), config, llms)
+    try:
+        assert isinstance(triage_llm, ReplayLLM)
+        assert isinstance(triage_llm.llm, CircuitBreakerLLM)
+        assert isinstance(triage_llm.llm.llm, HedgedLLM)
+        assert triage_llm.model == "llama3"
+        assert triage_llm.cassette is llms[0].cassette  # type: ignore[attr-defined]
+        assert triage_llm.budget is llms[0].budget  # type: ignore[attr-defined]
+    finally:
+        close_hedged_llms([*llms, triage_llm])
+
+
+def test_concurrent_triage_counts_every_submission() -> None:
+    """
+    Test that submissions triaged on several threads are all counted.
+    """
+    cheap = GradingMockLLM({"Content": 9, "Clarity": 9}, name="cheap")
+    expensive = GradingMockLLM({"Content": 5, "Clarity": 5}, name="expensive")
+    stats = new_triage_stats()
+
+    def triage(index: int) -> dict[str, Any]:
+        return triage_submission(
+            f"s{index}",
+            "essay",
+            RUBRIC,
+            [expensive],
+            1,
+            False,
+            "simple_average",
+            triage_llm=cheap,
+            triage_config=SETTINGS,
+            stats=stats,
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(triage, range(200)))
+
+    assert stats["submissions"] == 200
+    assert stats["cheap_calls"] == 400
+    assert stats["expensive_calls_saved"] == 200
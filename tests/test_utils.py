@@ -44,3 +44,44 @@ class MockLLM(BaseLLM):
             Dict[str, Any]: A dictionary containing mock model information.
         """
         return {"model_name": "mock-model", "version": "1.0"}
+
+
+class GradingMockLLM(MockLLM):
+    """
+    A mock LLM that answers in the criterion format expected by the response parser.
+
+    Args:
+        grades (Dict[str, float]): Grade to return for each criterion.
+        name (str): Model name reported in the provider information.
+    """
+
+    def __init__(self, grades: dict[str, float], name: str = "mock-model") -> None:
+        self.grades = grades
+        self.name = name
+        self.calls = 0
+
+    def get_response(self, prompt: str) -> str:
+        """
+        Simulate a grading response covering every configured criterion.
+
+        Args:
+            prompt (str): The input prompt for the LLM.
+
+        Returns:
+            str: A response in the Criterion/Grade/Feedback format.
+        """
+        self.calls += 1
+        lines = []
+        for criterion, grade in self.grades.items():
+            lines += [f"Criterion: {criterion}", f"Grade: {grade}", "Feedback: Fine."]
+        lines.append("Overall: Good work.")
+        return "\n".join(lines)
+
+    def get_model_info(self) -> dict[str, Any]:
+        """
+        Get mock model information.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing mock model information.
+        """
+        return {"model_name": self.name, "version": "1.0"}
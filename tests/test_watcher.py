@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Any
+
+from gradebotguru.watcher import (
+    DirectoryWatcher,
+    _poll_for_changes,
+    snapshot_directory,
+    wait_for_changes,
+)
+
+
+def _write_later(path: Any, delay: float) -> threading.Thread:
+    thread = threading.Timer(delay, path.write_text, args=("new submission",))
+    thread.start()
+    return thread
+
+
+def test_wait_for_changes_detects_new_file(tmp_path: Any) -> None:
+    """
+    Test that a file landing in the watched directory is reported.
+    """
+    writer = _write_later(tmp_path / "late.txt", 0.1)
+    changed = wait_for_changes(
+        str(tmp_path), poll_interval=0.05, settle_time=0.1, timeout=5
+    )
+    writer.join()
+    assert changed == ["late.txt"]
+
+
+def test_polling_fallback_detects_new_file(tmp_path: Any) -> None:
+    """
+    Test the polling fallback used where inotify is unavailable.
+    """
+    writer = _write_later(tmp_path / "late.txt", 0.1)
+    changed, _ = _poll_for_changes(str(tmp_path), 0.05, 0.1, timeout=5)
+    writer.join()
+    assert changed == ["late.txt"]
+
+
+def test_changes_before_waiting_are_reported(tmp_path: Any) -> None:
+    """
+    Test that files written after the watch is armed but before waiting, e.g.
+    during a grading pass, are reported by both inotify and polling.
+    """
+    with DirectoryWatcher(str(tmp_path), poll_interval=0.05, settle_time=0.1) as w:
+        (tmp_path / "during.txt").write_text("uploaded while grading")
+        assert w.wait(timeout=5) == ["during.txt"]
+        assert w.wait(timeout=0.2) == []
+
+    baseline = snapshot_directory(str(tmp_path))
+    (tmp_path / "polled.txt").write_text("uploaded while grading")
+    changed, _ = _poll_for_changes(str(tmp_path), 0.05, 0.1, 5, baseline)
+    assert changed == ["polled.txt"]
+
+
+def test_wait_for_changes_times_out(tmp_path: Any) -> None:
+    """
+    Test that an idle directory returns no changes once the timeout passes.
+    """
+    start = time.monotonic()
+    assert wait_for_changes(str(tmp_path), poll_interval=0.05, timeout=0.2) == []
+    assert time.monotonic() - start < 2
@@ -0,0 +1,201 @@
+import time
+from typing import Any
+
+import pytest
+
+from gradebotguru.grader import run_evaluation
+from gradebotguru.work_queue import (
+    WorkQueue,
+    plan_jobs,
+    publish_settings,
+    run_worker,
+    serve_queue,
+)
+from tests.test_utils import GradingMockLLM
+
+RUBRIC = {
+    "Content": {"description": "Quality of content.", "max_points": 10},
+    "Clarity": {"description": "Clarity of expression.", "max_points": 5},
+}
+
+CONFIG: dict[str, Any] = {
+    "number_of_repeats": 2,
+    "repeat_each_provider": True,
+    "aggregation_method": "simple_average",
+    "llm_prompt_template": "{rubric} {submission}",
+    "summarize_feedback": False,
+}
+
+
+def test_claim_complete_and_results(tmp_path: Any) -> None:
+    """
+    Test the basic job lifecycle.
+
+    Jobs are claimed in order, and completed results are returned ordered by
+    provider and iteration.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("s1", "text", plan_jobs(1, 2, True))
+
+    first = queue.claim("w1")
+    second = queue.claim("w2")
+    assert first is not None and second is not None
+    assert queue.claim("w3") is None
+
+    assert queue.complete(second["id"], "w2", {"iteration": 2})
+    assert queue.complete(first["id"], "w1", {"iteration": 1})
+    assert queue.results("s1") == [{"iteration": 1}, {"iteration": 2}]
+    assert queue.counts()["done"] == 2
+
+
+def test_expired_lease_is_retried(tmp_path: Any) -> None:
+    """
+    Test that a job held by a dead worker is handed to another worker.
+
+    The stale worker can no longer complete the job once its lease is reassigned.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.01, max_attempts=2)
+    queue.enqueue("s1", "text", [(0, 1)])
+
+    job = queue.claim("dead-worker")
+    assert job is not None
+    time.sleep(0.02)
+
+    retry = queue.claim("w2")
+    assert retry is not None
+    assert retry["id"] == job["id"]
+    assert retry["attempt"] == 2
+    assert not queue.complete(job["id"], "dead-worker", {})
+    assert queue.complete(retry["id"], "w2", {"ok": True})
+
+
+def test_failed_job_exhausts_attempts(tmp_path: Any) -> None:
+    """
+    Test that a job is marked failed after reaching the attempt limit.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.enqueue("s1", "text", [(0, 1)])
+
+    for _ in range(2):
+        job = queue.claim("w1")
+        assert job is not None
+        queue.fail(job["id"], "w1", "boom")
+
+    assert queue.claim("w1") is None
+    assert queue.counts()["failed"] == 1
+
+
+def test_changed_submission_is_requeued(tmp_path: Any) -> None:
+    """
+    Test that re-enqueuing keeps finished jobs for unchanged text and resets
+    them when the submission's text has changed.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("s1", "first draft", [(0, 1)])
+    job = queue.claim("w1")
+    assert job is not None
+    queue.complete(job["id"], "w1", {"draft": 1})
+
+    queue.enqueue("s1", "first draft", [(0, 1)])
+    assert queue.counts()["done"] == 1
+
+    queue.enqueue("s1", "second draft", [(0, 1)])
+    assert queue.results("s1") == []
+    retry = queue.claim("w1")
+    assert retry is not None
+    assert retry["submission"] == "second draft"
+    assert retry["attempt"] == 1
+
+
+def test_coordinator_aggregates_worker_results(tmp_path: Any) -> None:
+    """
+    Test a full coordinator/worker round trip.
+
+    A worker drains the queue, after which the coordinator aggregates each
+    submission without calling any provider itself.
+    """
+    path = str(tmp_path / "queue.db")
+    coordinator_llms = [GradingMockLLM({"Content": 8, "Clarity": 4})]
+    worker_llms = [GradingMockLLM({"Content": 8, "Clarity": 4})]
+    submissions = {"s1": "first essay", "s2": "second essay"}
+
+    queue = WorkQueue(path)
+    settings_hash = publish_settings(queue, RUBRIC, CONFIG)
+    queue.set_meta("num_providers", 1)
+    for submission_id, text in submissions.items():
+        queue.enqueue(submission_id, text, plan_jobs(1, 2, True), settings_hash)
+
+    assert run_worker(WorkQueue(path), worker_llms) == 4
+    results = serve_queue(
+        queue, submissions, RUBRIC, coordinator_llms, CONFIG, poll_interval=0.01
+    )
+
+    assert set(results) == {"s1", "s2"}
+    assert results["s1"]["grade"] == 12
+    assert len(results["s1"]["individual_responses"]) == 2
+    assert coordinator_llms[0].calls == 0
+    assert worker_llms[0].calls == 4
+
+
+class PromptRecordingLLM(GradingMockLLM):
+    """A grading mock that records the prompts it is sent."""
+
+    def __init__(self, grades: dict[str, float]) -> None:
+        super().__init__(grades)
+        self.prompts: list[str] = []
+
+    def get_response(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return super().get_response(prompt)
+
+
+def test_changed_settings_requeue_finished_jobs(tmp_path: Any) -> None:
+    """
+    Test that finished jobs are reset when the rubric or prompt changes, and
+    that workers pick up the new settings.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    settings_hash = publish_settings(queue, RUBRIC, CONFIG)
+    queue.enqueue("s1", "text", [(0, 1)], settings_hash)
+    assert run_worker(queue, [GradingMockLLM({"Content": 8, "Clarity": 4})]) == 1
+
+    queue.enqueue("s1", "text", [(0, 1)], publish_settings(queue, RUBRIC, CONFIG))
+    assert queue.counts()["done"] == 1
+
+    config = {**CONFIG, "llm_prompt_template": "Grade: {rubric} {submission}"}
+    queue.enqueue("s1", "text", [(0, 1)], publish_settings(queue, RUBRIC, config))
+    assert queue.counts()["pending"] == 1
+
+    rubric = {"Content": RUBRIC["Content"]}
+    llm = PromptRecordingLLM({"Content": 6})
+    queue.enqueue("s1", "text", [(0, 1)], publish_settings(queue, rubric, config))
+    assert run_worker(queue, [llm]) == 1
+    assert "Grade: - Content" in llm.prompts[0]
+    assert "Clarity" not in llm.prompts[0]
+
+
+def test_submission_with_only_failed_jobs_is_not_graded(
+    tmp_path: Any, caplog: pytest.LogCaptureFixture
+) -> None:
+    """
+    Test that a submission whose jobs all failed is reported instead of graded 0.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.db"), max_attempts=1)
+    settings_hash = publish_settings(queue, RUBRIC, CONFIG)
+    submissions = {"s1": "first essay", "s2": "second essay"}
+    for submission_id, text in submissions.items():
+        queue.enqueue(submission_id, text, [(0, 1)], settings_hash)
+    job = queue.claim("w1")
+    assert job is not None and job["submission_id"] == "s1"
+    queue.fail(job["id"], "w1", "boom")
+    job = queue.claim("w1")
+    assert job is not None
+    llms = [GradingMockLLM({"Content": 8, "Clarity": 4})]
+    result = run_evaluation(llms[0], job["submission"], RUBRIC, "{rubric} {submission}")
+    queue.complete(job["id"], "w1", result)
+
+    config = {**CONFIG, "number_of_repeats": 1}
+    results = serve_queue(queue, submissions, RUBRIC, llms, config, poll_interval=0.01)
+
+    assert list(results) == ["s2"]
+    assert "failed and were not graded: s1" in caplog.text